@@ -43,7 +43,8 @@ export const boardsAPI = {
   create: (data) => api.post('/boards/', data),
   update: (id, data) => api.patch(`/boards/${id}/`, data),
   delete: (id) => api.delete(`/boards/${id}/`),
-  duplicate: (id) => api.post(`/boards/${id}/duplicate/`)
+  duplicate: (id) => api.post(`/boards/${id}/duplicate/`),
+  changes: (id, since, version) => api.get(`/boards/${id}/changes/`, { params: { since, version } })
 }
 
 export const listsAPI = {
@@ -57,7 +58,7 @@ export const listsAPI = {
 
 export const cardsAPI = {
   getAll: () => api.get('/cards/'),
-  get: (id) => api.get(`/cards/${id}/`),
+  get: (id, params) => api.get(`/cards/${id}/`, { params }),
   create: (data) => api.post('/cards/', data),
   update: (id, data) => api.patch(`/cards/${id}/`, data),
   delete: (id) => api.delete(`/cards/${id}/`),
@@ -78,4 +79,26 @@ export const usersAPI = {
   getAll: () => api.get('/users/')
 }
 
+// Board events are pushed over a WebSocket next to the API (ws:// or wss://)
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws').replace(/\/api$/, '/ws')
+
+// Connections are authenticated with a short-lived single-use ticket, never the access token
+const streamTicket = async () => {
+  const response = await api.post('/auth/stream_ticket/')
+  return encodeURIComponent(response.data.ticket)
+}
+
+export const openBoardSocket = async (boardId) => {
+  return new WebSocket(`${WS_BASE_URL}/boards/${boardId}/?ticket=${await streamTicket()}`)
+}
+
+export const openNotificationSocket = async () => {
+  return new WebSocket(`${WS_BASE_URL}/notifications/?ticket=${await streamTicket()}`)
+}
+
+// Server-sent events fallback when WebSockets are blocked
+export const openNotificationStream = async () => {
+  return new EventSource(`${API_BASE_URL}/notifications/stream/?ticket=${await streamTicket()}`)
+}
+
 export default api
\ No newline at end of file
@@ -1,10 +1,15 @@
 import { defineStore } from 'pinia'
-import { boardsAPI, listsAPI, cardsAPI, commentsAPI } from '../services/api'
+import { boardsAPI, listsAPI, cardsAPI, commentsAPI, openBoardSocket } from '../services/api'
+
+const SOCKET_RETRY_MS = 3000
 
 export const useKanbanStore = defineStore('kanban', {
   state: () => ({
     boards: [],
     currentBoard: null,
+    syncedAt: null,
+    boardVersion: null,
+    socket: null,
     loading: false,
     error: null
   }),
@@ -47,6 +52,9 @@ export const useKanbanStore = defineStore('kanban', {
       try {
         const response = await boardsAPI.get(id)
         this.currentBoard = response.data
+        // Sync cursor from the server clock, never the client's
+        this.syncedAt = response.data.synced_at
+        this.boardVersion = response.data.version
         return response.data
       } catch (error) {
         this.error = error.response?.data?.message || 'Failed to fetch board'
@@ -57,6 +65,115 @@ export const useKanbanStore = defineStore('kanban', {
       }
     },
 
+    async syncBoard() {
+      // Pull only what changed since the last sync instead of refetching the board
+      if (!this.currentBoard || !this.syncedAt) return
+      const boardId = this.currentBoard.id
+      try {
+        const response = await boardsAPI.changes(boardId, this.syncedAt, this.boardVersion)
+        const changes = response.data
+        if (!this.currentBoard || this.currentBoard.id !== boardId) return
+        if (changes.full_refresh) {
+          await this.fetchBoard(boardId)
+          return
+        }
+        this.applyBoardChanges(changes)
+        this.syncedAt = changes.synced_at
+        this.boardVersion = changes.version
+      } catch (error) {
+        console.error('Error syncing board:', error)
+      }
+    },
+
+    async connectBoard(boardId) {
+      // Live card and list events from other viewers of the board
+      this.disconnectBoard()
+      let socket
+      try {
+        socket = await openBoardSocket(boardId)
+      } catch (error) {
+        console.error('Error opening board socket:', error)
+        return
+      }
+      if (this.socket) {
+        // Another connection was opened while the ticket was being issued
+        socket.close()
+        return
+      }
+      socket.onmessage = (message) => this.applyBoardEvent(JSON.parse(message.data))
+      socket.onclose = () => {
+        if (this.socket !== socket) return
+        // Dropped connection: reconnect and catch up on what was missed
+        this.socket = null
+        setTimeout(() => {
+          if (!this.socket && this.currentBoard?.id === boardId) {
+            this.connectBoard(boardId)
+            this.syncBoard()
+          }
+        }, SOCKET_RETRY_MS)
+      }
+      this.socket = socket
+    },
+
+    disconnectBoard() {
+      const socket = this.socket
+      this.socket = null
+      if (socket) {
+        socket.close()
+      }
+    },
+
+    applyBoardEvent(event) {
+      if (!this.currentBoard) return
+      const [kind, action] = event.type.split('.')
+      if (kind !== 'card' && kind !== 'list') return
+      const changes = { lists: [], cards: [], deleted: { lists: [], cards: [] } }
+      if (action === 'deleted') {
+        changes.deleted[`${kind}s`].push(event.data.id)
+      } else {
+        changes[`${kind}s`].push(event.data)
+      }
+      this.applyBoardChanges(changes)
+    },
+
+    applyBoardChanges(changes) {
+      const board = this.currentBoard
+      if (changes.board_fields) {
+        Object.assign(board, changes.board_fields)
+      }
+
+      const deletedLists = new Set(changes.deleted.lists)
+      const deletedCards = new Set(changes.deleted.cards)
+      const changedCards = new Map(changes.cards.map(card => [card.id, card]))
+      board.lists = board.lists.filter(l => !deletedLists.has(l.id))
+
+      for (const listData of changes.lists) {
+        const list = board.lists.find(l => l.id === listData.id)
+        if (list) {
+          Object.assign(list, listData)
+        } else {
+          board.lists.push({ ...listData, cards: [] })
+        }
+      }
+
+      for (const list of board.lists) {
+        list.cards = list.cards.filter(c => !deletedCards.has(c.id) && !changedCards.has(c.id))
+      }
+      for (const card of changedCards.values()) {
+        const list = board.lists.find(l => l.id === card.list)
+        if (list) {
+          list.cards.push(card)
+        }
+      }
+
+      const byRank = (a, b) => (a.rank < b.rank ? -1 : a.rank > b.rank ? 1 : a.id - b.id)
+      board.lists.sort(byRank)
+      for (const list of board.lists) {
+        list.cards.sort(byRank)
+        list.cards_count = list.cards.length
+      }
+    },
+
     async createBoard(boardData) {
       this.loading = true
       this.error = null
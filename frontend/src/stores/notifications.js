@@ -1,12 +1,15 @@
 import { defineStore } from 'pinia'
 import axios from 'axios'
+import { openNotificationSocket, openNotificationStream } from '../services/api'
 
 const API_BASE_URL = 'http://localhost:8000/api'
+const SOCKET_RETRY_MS = 3000
 
 export const useNotificationsStore = defineStore('notifications', {
   state: () => ({
     notifications: [],
     unreadCount: 0,
+    connection: null,
     loading: false,
     error: null,
     
@@ -64,6 +67,100 @@ export const useNotificationsStore = defineStore('notifications', {
       }
     },
 
+    async connectLive() {
+      // New notifications and unread count changes are pushed by the server
+      this.disconnectLive()
+      if (!('WebSocket' in window)) {
+        this.connectStream()
+        return
+      }
+      let socket
+      try {
+        socket = await openNotificationSocket()
+      } catch (error) {
+        console.error('Error opening notification socket:', error)
+        return
+      }
+      if (this.connection) {
+        // Another connection was opened while the ticket was being issued
+        socket.close()
+        return
+      }
+      let opened = false
+      socket.onopen = () => {
+        opened = true
+      }
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data)
+        this.applyLiveEvent(event.type, event.data)
+      }
+      socket.onclose = () => {
+        if (this.connection !== socket) return
+        this.connection = null
+        if (!opened) {
+          // The socket never opened (blocked by a proxy): use server-sent events
+          this.connectStream()
+          return
+        }
+        setTimeout(() => {
+          if (!this.connection) {
+            this.connectLive()
+          }
+        }, SOCKET_RETRY_MS)
+      }
+      this.connection = socket
+    },
+
+    async connectStream() {
+      // The stream replays the unread count on connect
+      let source
+      try {
+        source = await openNotificationStream()
+      } catch (error) {
+        console.error('Error opening notification stream:', error)
+        return
+      }
+      if (this.connection) {
+        source.close()
+        return
+      }
+      const handle = (message) => this.applyLiveEvent(message.type, JSON.parse(message.data))
+      source.addEventListener('unread_count', handle)
+      source.addEventListener('notification.created', handle)
+      source.onerror = () => {
+        // Tickets are single-use, so reconnect with a new one instead of letting EventSource retry
+        if (this.connection !== source) return
+        source.close()
+        this.connection = null
+        setTimeout(() => {
+          if (!this.connection) {
+            this.connectStream()
+          }
+        }, SOCKET_RETRY_MS)
+      }
+      this.connection = source
+    },
+
+    disconnectLive() {
+      const connection = this.connection
+      this.connection = null
+      if (connection) {
+        connection.close()
+      }
+    },
+
+    applyLiveEvent(type, data) {
+      if (type === 'unread_count') {
+        this.unreadCount = data.unread_count
+      } else if (type === 'notification.created') {
+        this.notifications.unshift(data)
+        this.showBrowserNotification(data.title, {
+          body: data.message,
+          tag: `notification-${data.id}`
+        })
+      }
+    },
+
     async markAsRead(notificationId) {
       try {
         await axios.post(`${API_BASE_URL}/notifications/${notificationId}/mark_read/`)
@@ -185,33 +282,11 @@ export const useNotificationsStore = defineStore('notifications', {
     },
 
     scheduleReminderNotifications() {
-      // Check for due soon tasks every hour
-      setInterval(() => {
-        this.checkDueSoonTasks()
-      }, 60 * 60 * 1000) // 1 hour
-
-      // Daily reminder at specified time
+      // Due-soon and overdue reminders are sent by the server (run_reminders)
+      // and arrive through the live connection
       this.scheduleDailyReminder()
     },
 
-    async checkDueSoonTasks() {
-      if (!this.preferences.dueDateReminders) return
-
-      try {
-        // Get cards that are due within 24 hours
-        const response = await axios.get(`${API_BASE_URL}/cards/?due_date=due_soon`)
-        const dueSoonCards = response.data.results || response.data
-
-        dueSoonCards.forEach(card => {
-          if (!card.completed) {
-            this.createDueDateNotification(card)
-          }
-        })
-      } catch (error) {
-        console.error('Error checking due soon tasks:', error)
-      }
-    },
-
     scheduleDailyReminder() {
       const now = new Date()
       const [hours, minutes] = this.preferences.reminderTime.split(':')
@@ -195,6 +195,17 @@ export const usePomodoroStore = defineStore('pomodoro', {
       }
     },
 
+    // Daily buckets between two YYYY-MM-DD dates (inclusive), for reports
+    async fetchStatsRange(start, end) {
+      try {
+        const response = await axios.get(`${API_BASE_URL}/pomodoro/get_stats/`, { params: { start, end } })
+        return response.data.range
+      } catch (error) {
+        console.error('Failed to fetch Pomodoro stats range:', error)
+        return null
+      }
+    },
+
     // Timer management
     startTimer() {
       this.timer = setInterval(() => {
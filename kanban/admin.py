@@ -44,16 +44,16 @@ class BoardAdmin(admin.ModelAdmin):
 
 @admin.register(List)
 class ListAdmin(admin.ModelAdmin):
-    list_display = ['title', 'board', 'position', 'created_at']
+    list_display = ['title', 'board', 'rank', 'created_at']
     list_filter = ['board', 'created_at']
     search_fields = ['title']
     readonly_fields = ['created_at', 'updated_at']
-    ordering = ['board', 'position']
+    ordering = ['board', 'rank']
 
 
 @admin.register(Card)
 class CardAdmin(admin.ModelAdmin):
-    list_display = ['title', 'list', 'assignee', 'priority', 'position', 'completed', 'due_date']
+    list_display = ['title', 'list', 'assignee', 'priority', 'rank', 'completed', 'due_date']
     list_filter = ['priority', 'completed', 'list__board', 'created_at', 'labels']
     search_fields = ['title', 'description']
     readonly_fields = ['created_at', 'updated_at', 'completed_at']
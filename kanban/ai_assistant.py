@@ -109,7 +109,7 @@ class KanbanAIAssistant:
         
         # Get user's tasks and patterns
         pending_cards = Card.objects.filter(
-            list__board__owner=user,
+            owner=user,
             completed=False
         ).order_by('due_date', 'priority')
         
@@ -208,13 +208,13 @@ class KanbanAIAssistant:
         
         # Get data for the period
         completed_cards = Card.objects.filter(
-            list__board__owner=user,
+            owner=user,
             completed=True,
             completed_at__date__range=[start_date, end_date]
         )
         
         created_cards = Card.objects.filter(
-            list__board__owner=user,
+            owner=user,
             created_at__date__range=[start_date, end_date]
         )
         
@@ -302,7 +302,7 @@ class KanbanAIAssistant:
         
         # Get user's pending tasks
         pending_cards = Card.objects.filter(
-            list__board__owner=user,
+            owner=user,
             completed=False
         ).order_by('created_at')
         
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class KanbanConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kanban'
+
+    def ready(self):
+        # Connect the search index, dashboard cache, notification, goal and statistics counter
+        # signal handlers, and register the background job handlers
+        from . import search, dashboard, notifications, goals, statistics, duplication, importer  # noqa: F401
@@ -0,0 +1,189 @@
+"""
+Stampede-safe read-through cache.
+
+``get_or_compute`` replaces the plain get/compute/set pattern:
+
+- single flight: on a miss, one caller (in any process) takes a lock made
+  with ``cache.add`` and computes; the others wait up to
+  ``CACHE_LOCK_WAIT_SECONDS`` for its result instead of computing as well;
+- stale-while-revalidate: entries outlive their timeout by
+  ``CACHE_STALE_SECONDS``; once expired, the lock holder recomputes while
+  every other caller keeps getting the old value;
+- probabilistic early expiration: shortly before expiry a read may refresh
+  the entry early, with a probability growing as expiry nears and with the
+  time the value took to compute (``CACHE_EARLY_EXPIRY_BETA``), so hot keys
+  are rarely seen expired at all;
+- negative caching: ``None`` is a cacheable result, kept for
+  ``CACHE_NEGATIVE_TIMEOUT`` seconds;
+- per-process hit, stale hit, miss and recompute time counters per key
+  namespace (the first segment of the key), see ``cache_stats``.
+
+``cached`` is the decorator form. Deleting a key still invalidates it
+immediately: the next read is a miss, never served stale.
+"""
+import functools
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_POLL_SECONDS = 0.05
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+    'hits': 0,
+    'stale_hits': 0,
+    'misses': 0,
+    'waits': 0,
+    'early_refreshes': 0,
+    'recomputes': 0,
+    'recompute_ms_total': 0.0,
+    'recompute_ms_max': 0.0,
+})
+
+
+def _count(key: str, counter: str, amount: float = 1):
+    with _stats_lock:
+        _stats[key.split(':', 1)[0]][counter] += amount
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    """Counters of this process per key namespace"""
+    with _stats_lock:
+        return {namespace: dict(counters) for namespace, counters in _stats.items()}
+
+
+def reset_cache_stats():
+    """Zero the counters of this process"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def _lock_key(key: str) -> str:
+    return f'{key}:lock'
+
+
+def _acquire(key: str) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if cache.add(_lock_key(key), token, settings.CACHE_LOCK_SECONDS):
+        return token
+    return None
+
+
+def _release(key: str, token: str):
+    # Only drop our own lock; an expired one may have been taken over since
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def _recompute(key: str, compute: Callable, timeout: int, stale_timeout: int, negative_timeout: int):
+    started = time.monotonic()
+    value = compute()
+    elapsed = time.monotonic() - started
+    ttl = negative_timeout if value is None else timeout
+    # (value, soft expiry, compute time): kept past the soft expiry to be served stale
+    cache.set(key, (value, time.time() + ttl, elapsed), ttl + stale_timeout)
+
+    elapsed_ms = elapsed * 1000
+    with _stats_lock:
+        counters = _stats[key.split(':', 1)[0]]
+        counters['recomputes'] += 1
+        counters['recompute_ms_total'] += elapsed_ms
+        counters['recompute_ms_max'] = max(counters['recompute_ms_max'], elapsed_ms)
+    return value
+
+
+def _wait_for(key: str):
+    """Entry computed by the lock holder, or None if it gave up or took too long"""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(_lock_key(key)) is None:
+            return None
+    return None
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: int = 300, stale_timeout: Optional[int] = None,
+                   negative_timeout: Optional[int] = None, beta: Optional[float] = None):
+    """
+    Get a value from the cache, computing it at most once at a time across processes.
+
+    Args:
+        key: Cache key
+        compute: Function returning the value (``None`` is cached too)
+        timeout: Seconds the value is fresh
+        stale_timeout: Seconds an expired value may still be served during a recompute
+            (default: ``CACHE_STALE_SECONDS``)
+        negative_timeout: Seconds a ``None`` result is cached (default: ``CACHE_NEGATIVE_TIMEOUT``)
+        beta: Early expiration eagerness, 0 to disable (default: ``CACHE_EARLY_EXPIRY_BETA``)
+
+    Returns:
+        Cached or computed value
+    """
+    stale_timeout = settings.CACHE_STALE_SECONDS if stale_timeout is None else stale_timeout
+    negative_timeout = settings.CACHE_NEGATIVE_TIMEOUT if negative_timeout is None else negative_timeout
+    beta = settings.CACHE_EARLY_EXPIRY_BETA if beta is None else beta
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at, compute_seconds = entry
+        now = time.time()
+        # XFetch: refresh early with probability rising as expiry nears (-log(u) >= 0)
+        if now - compute_seconds * beta * math.log(1.0 - random.random()) < expires_at:
+            _count(key, 'hits')
+            return value
+        token = _acquire(key)
+        if token is None:
+            _count(key, 'stale_hits')
+            return value
+        if now < expires_at:
+            _count(key, 'early_refreshes')
+        try:
+            return _recompute(key, compute, timeout, stale_timeout, negative_timeout)
+        finally:
+            _release(key, token)
+
+    _count(key, 'misses')
+    token = _acquire(key)
+    if token is None:
+        entry = _wait_for(key)
+        if entry is not None:
+            _count(key, 'waits')
+            return entry[0]
+        # The lock holder failed or is too slow: compute without the lock
+        return _recompute(key, compute, timeout, stale_timeout, negative_timeout)
+    try:
+        return _recompute(key, compute, timeout, stale_timeout, negative_timeout)
+    finally:
+        _release(key, token)
+
+
+def cached(key: Callable[..., str], timeout: Union[int, str] = 300, **options):
+    """
+    Decorator caching a function's result with ``get_or_compute``.
+
+    Args:
+        key: Function building the cache key from the decorated function's arguments
+        timeout: Seconds, or the name of a setting holding them (read at call time)
+        **options: ``stale_timeout``, ``negative_timeout`` and ``beta``
+
+    Returns:
+        The decorator; the wrapped function keeps the original as ``uncached``
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            seconds = getattr(settings, timeout) if isinstance(timeout, str) else timeout
+            return get_or_compute(key(*args, **kwargs), lambda: func(*args, **kwargs), seconds, **options)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,69 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .models import Board
+from .notifications import get_unread_count
+from .realtime import board_group_name, user_group_name
+
+
+class BoardConsumer(AsyncJsonWebsocketConsumer):
+    """Streams card and list events of one board to a connected client"""
+    
+    group_name = None
+    
+    async def connect(self):
+        self.board_id = self.scope['url_route']['kwargs']['board_id']
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated or not await self.can_view_board(user):
+            await self.close()
+            return
+        
+        self.group_name = board_group_name(self.board_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+    
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+    
+    async def receive_json(self, content, **kwargs):
+        # Clients only listen; answer keep-alive pings so proxies don't drop idle sockets
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+    
+    async def group_event(self, event):
+        await self.send_json({'type': event['event'], 'data': event['data']})
+    
+    @database_sync_to_async
+    def can_view_board(self, user):
+        return Board.objects.filter(id=self.board_id, owner=user, is_active=True).exists()
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes new notifications and unread count changes to the connected user"""
+    
+    group_name = None
+    
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+        
+        self.group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        # Initial badge value; later changes arrive as events
+        unread_count = await database_sync_to_async(get_unread_count)(user.id)
+        await self.send_json({'type': 'unread_count', 'data': {'unread_count': unread_count}})
+    
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+    
+    async def receive_json(self, content, **kwargs):
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+    
+    async def group_event(self, event):
+        await self.send_json({'type': event['event'], 'data': event['data']})
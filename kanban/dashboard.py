@@ -0,0 +1,41 @@
+"""
+Per-user dashboard statistics cache.
+
+The dashboard is the first request of every session, so its result is kept
+in the cache for a short time. Writes that change a number on the dashboard
+(cards, boards, activities, pomodoro sessions) delete the owner's entry;
+the TTL bounds staleness from bulk ``update()`` calls that skip signals and
+from time-based figures such as "due soon".
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Board, Card, CardActivity, PomodoroSession
+from .utils import calculate_cache_key
+
+
+def get_dashboard_key(user_id: int) -> str:
+    """Cache key of the dashboard statistics of a user"""
+    return calculate_cache_key('dashboard', user_id)
+
+
+def invalidate_dashboard(user_id: int):
+    """Drop the cached dashboard statistics of a user"""
+    cache.delete(get_dashboard_key(user_id))
+
+
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Card)
+@receiver(post_save, sender=CardActivity)
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def invalidate_dashboard_on_owner_write(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_dashboard(instance.owner_id)
+
+
+@receiver(post_save, sender=PomodoroSession)
+def invalidate_dashboard_on_session_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_dashboard(instance.user_id)
@@ -0,0 +1,145 @@
+"""
+Board copying for duplication and template instantiation.
+
+The copy is written with ``bulk_create`` in batches of
+``BOARD_COPY_BATCH_SIZE`` cards: one INSERT for the lists, then per batch one
+INSERT each for the cards, their label through-rows, checklist items and
+search index terms. Signals are bypassed, so the denormalized board/owner
+columns and the search terms are written here explicitly.
+
+The new board stays inactive (hidden from every listing) until the last
+batch is in, and is deleted if the copy fails, so no transaction has to
+span the whole copy. Boards with more than ``BOARD_COPY_SYNC_LIMIT`` cards
+are copied by the ``run_jobs`` worker instead of in the request.
+"""
+from typing import Callable, Dict, List as TypingList, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from .jobs import register_job
+from .models import Board, Card, CardSearchTerm, List, TaskChecklist
+from .search import index_cards
+
+CARD_COPY_FIELDS = ['id', 'list_id', 'title', 'description', 'priority', 'rank', 'due_date', 'estimated_hours']
+
+
+def _with_pks(created: TypingList, queryset) -> TypingList:
+    """
+    Objects returned by ``bulk_create`` with their primary keys.
+
+    Backends that cannot return ids from a bulk insert (MySQL) leave them
+    unset; the rows are then re-read, relying on ids being assigned in
+    insertion order within the new (still private) board.
+    """
+    if all(obj.pk is not None for obj in created):
+        return created
+    return list(queryset.order_by('-id')[:len(created)])[::-1]
+
+
+def needs_background_copy(board: Board) -> bool:
+    """Whether a board is too large to copy within a request"""
+    return Card.objects.filter(board=board).count() > settings.BOARD_COPY_SYNC_LIMIT
+
+
+def copy_board(source: Board, title: str, owner=None, progress: Optional[Callable] = None) -> Board:
+    """
+    Copy a board with its lists, cards, labels and checklist items.
+
+    Args:
+        source: Board to copy
+        title: Title of the new board
+        owner: Owner of the new board (default: the source owner)
+        progress: Optional callable receiving ``(cards_copied, cards_total)``
+
+    Returns:
+        The new, active board
+    """
+    owner = owner or source.owner
+    batch_size = settings.BOARD_COPY_BATCH_SIZE
+    # Labels belong to a user; they can only be kept when the owner stays the same
+    copy_labels = owner.id == source.owner_id
+
+    board = Board.objects.create(
+        title=title,
+        description=source.description,
+        owner=owner,
+        background_color=source.background_color,
+        is_active=False,
+    )
+    try:
+        source_lists = list(source.lists.order_by('rank', 'id'))
+        new_lists = _with_pks(List.objects.bulk_create([
+            List(title=list_obj.title, board=board, owner=owner, rank=list_obj.rank)
+            for list_obj in source_lists
+        ]), List.objects.filter(board=board))
+        list_map = {old.id: new.id for old, new in zip(source_lists, new_lists)}
+
+        cards = Card.objects.filter(board=source).order_by('id').values(*CARD_COPY_FIELDS)
+        total = cards.count()
+        copied, last_id = 0, 0
+        if progress:
+            progress(0, total)
+        # Keyset batches: no cursor is held open while the copies are written
+        while True:
+            batch = list(cards.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            _copy_card_batch(batch, board, owner, list_map, copy_labels)
+            copied += len(batch)
+            last_id = batch[-1]['id']
+            if progress:
+                progress(copied, total)
+    except Exception:
+        board.delete()
+        raise
+
+    board.is_active = True
+    board.save(update_fields=['is_active', 'updated_at'])
+    return board
+
+
+def _copy_card_batch(batch: TypingList[dict], board: Board, owner, list_map: Dict[int, int], copy_labels: bool):
+    with transaction.atomic():
+        new_cards = _with_pks(Card.objects.bulk_create([
+            Card(
+                list_id=list_map[card['list_id']],
+                board=board,
+                owner=owner,
+                **{field: card[field] for field in CARD_COPY_FIELDS if field not in ('id', 'list_id')},
+            )
+            for card in batch
+        ]), Card.objects.filter(board=board))
+        card_map = {card['id']: new.id for card, new in zip(batch, new_cards)}
+        source_ids = list(card_map)
+
+        TaskChecklist.objects.bulk_create([
+            TaskChecklist(card_id=card_map[item['card_id']], title=item['title'], position=item['position'])
+            for item in TaskChecklist.objects.filter(card_id__in=source_ids).values('card_id', 'title', 'position')
+        ])
+
+        if copy_labels:
+            through = Card.labels.through
+            through.objects.bulk_create([
+                through(card_id=card_map[card_id], label_id=label_id)
+                for card_id, label_id in through.objects.filter(
+                    card_id__in=source_ids
+                ).values_list('card_id', 'label_id')
+            ])
+            # Same text and labels, same search terms
+            CardSearchTerm.objects.bulk_create([
+                CardSearchTerm(user_id=owner.id, card_id=card_map[card_id], term=term, weight=weight)
+                for card_id, term, weight in CardSearchTerm.objects.filter(
+                    card_id__in=source_ids
+                ).values_list('card_id', 'term', 'weight')
+            ])
+        else:
+            index_cards(card_map.values())
+
+
+@register_job('board_copy')
+def copy_board_job(job, progress):
+    """Job handler: ``params`` holds ``board_id`` and ``title``"""
+    source = Board.objects.get(id=job.params['board_id'], owner=job.user)
+    board = copy_board(source, job.params['title'], owner=job.user, progress=progress)
+    return {'board_id': board.id}
@@ -0,0 +1,226 @@
+"""
+Streaming board and account export.
+
+Every table is read with ``.iterator(chunk_size=EXPORT_CHUNK_SIZE)`` and
+encoded line by line, and output is handed to ``StreamingHttpResponse`` in
+blocks of about ``EXPORT_BLOCK_BYTES``, so memory stays flat whatever the
+size of the board. Two formats are produced:
+
+- JSON Lines: one ``{"type": ..., ...}`` object per line, for the board(s),
+  labels, lists, cards (with label ids), checklist items, comments and
+  activities, in that order;
+- CSV: one row per card, flattened with its board, list and label names.
+
+Output can be gzip-compressed on the fly.
+"""
+import csv
+import json
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+
+from .models import Board, Card, CardActivity, Comment, Label, List, TaskChecklist
+
+FORMATS = {
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv'),
+}
+
+CSV_COLUMNS = [
+    'board', 'list', 'title', 'description', 'priority', 'labels', 'assignee',
+    'due_date', 'estimated_hours', 'completed', 'completed_at', 'created_at',
+]
+
+
+class ExportScope:
+    """Rows exported for one board or for every active board of an account"""
+
+    def __init__(self, user, board: Optional[Board] = None):
+        self.user = user
+        self.board = board
+
+    def boards(self):
+        if self.board is not None:
+            return Board.objects.filter(id=self.board.id)
+        return Board.objects.filter(owner=self.user, is_active=True)
+
+    def filter(self, queryset, board_path: str):
+        """Restrict a queryset to the scope through the given path to its board"""
+        if self.board is not None:
+            return queryset.filter(**{board_path: self.board})
+        return queryset.filter(**{f'{board_path}__owner': self.user, f'{board_path}__is_active': True})
+
+    def labels(self):
+        labels = Label.objects.filter(user=self.user)
+        if self.board is not None:
+            labels = labels.filter(cards__board=self.board).distinct()
+        return labels
+
+    def cards(self):
+        return self.filter(Card.objects.all(), 'board').select_related('assignee').prefetch_related(
+            Prefetch('labels', queryset=Label.objects.only('id', 'name'))
+        ).order_by('board_id', 'id')
+
+
+def _chunked(queryset):
+    return queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def iter_records(scope: ExportScope) -> Iterator[Tuple[str, dict]]:
+    """
+    Walk the exported tables, parents before children.
+
+    Yields:
+        ``(type, fields)`` pairs
+    """
+    for row in _chunked(scope.boards().values(
+        'id', 'title', 'description', 'background_color', 'is_template', 'created_at', 'updated_at'
+    ).order_by('id')):
+        yield 'board', row
+    for row in _chunked(scope.labels().values('id', 'name', 'color').order_by('id')):
+        yield 'label', row
+    for row in _chunked(scope.filter(List.objects.all(), 'board').values(
+        'id', 'board_id', 'title', 'rank', 'created_at'
+    ).order_by('board_id', 'rank', 'id')):
+        yield 'list', row
+    for card in _chunked(scope.cards()):
+        yield 'card', {
+            'id': card.id,
+            'board_id': card.board_id,
+            'list_id': card.list_id,
+            'title': card.title,
+            'description': card.description,
+            'priority': card.priority,
+            'rank': card.rank,
+            'label_ids': [label.id for label in card.labels.all()],
+            'assignee': card.assignee.username if card.assignee else None,
+            'due_date': card.due_date,
+            'estimated_hours': card.estimated_hours,
+            'completed': card.completed,
+            'completed_at': card.completed_at,
+            'created_at': card.created_at,
+        }
+    for row in _chunked(scope.filter(TaskChecklist.objects.all(), 'card__board').values(
+        'id', 'card_id', 'title', 'is_completed', 'position', 'completed_at'
+    ).order_by('card_id', 'position')):
+        yield 'checklist_item', row
+    for row in _chunked(scope.filter(Comment.objects.all(), 'card__board').values(
+        'id', 'card_id', 'author__username', 'content', 'created_at'
+    ).order_by('id')):
+        yield 'comment', row
+    for row in _chunked(scope.filter(CardActivity.objects.all(), 'board').values(
+        'id', 'card_id', 'user__username', 'activity_type', 'description', 'created_at'
+    ).order_by('id')):
+        yield 'activity', row
+
+
+def iter_jsonl(scope: ExportScope) -> Iterator[str]:
+    """JSON Lines export, one object per line"""
+    for record_type, fields in iter_records(scope):
+        yield json.dumps({'type': record_type, **fields}, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    """File-like object returning what is written, for ``csv.writer``"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(scope: ExportScope) -> Iterator[str]:
+    """CSV export, one row per card"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    boards = dict(scope.boards().values_list('id', 'title'))
+    lists = dict(scope.filter(List.objects.all(), 'board').values_list('id', 'title'))
+    for card in _chunked(scope.cards()):
+        yield writer.writerow([
+            boards.get(card.board_id, ''),
+            lists.get(card.list_id, ''),
+            card.title,
+            card.description or '',
+            card.priority,
+            ';'.join(label.name for label in card.labels.all()),
+            card.assignee.username if card.assignee else '',
+            card.due_date.isoformat() if card.due_date else '',
+            card.estimated_hours if card.estimated_hours is not None else '',
+            card.completed,
+            card.completed_at.isoformat() if card.completed_at else '',
+            card.created_at.isoformat(),
+        ])
+
+
+def iter_blocks(lines: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    """
+    Group encoded lines into blocks of about ``EXPORT_BLOCK_BYTES``.
+
+    Args:
+        lines: Text lines of the export
+        compress: Gzip the stream
+
+    Yields:
+        Byte blocks ready to be sent
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= settings.EXPORT_BLOCK_BYTES:
+            block = b''.join(buffer)
+            buffer, size = [], 0
+            block = compressor.compress(block) if compressor else block
+            if block:
+                yield block
+    block = b''.join(buffer)
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
+
+
+async def _aiter(iterator: Iterator[bytes]):
+    # Each block is produced in the sync thread that owns the database connection
+    done = object()
+    while True:
+        block = await sync_to_async(next, thread_sensitive=True)(iterator, done)
+        if block is done:
+            return
+        yield block
+
+
+def export_response(request, scope: ExportScope, output: str, compress: bool, filename: str) -> StreamingHttpResponse:
+    """
+    Stream an export as a file download.
+
+    Args:
+        request: Current request (an async iterator is used under ASGI)
+        scope: Rows to export
+        output: ``jsonl`` or ``csv``
+        compress: Gzip the file
+        filename: Download name without extension
+
+    Returns:
+        Streaming response
+    """
+    content_type, extension = FORMATS[output]
+    lines = iter_jsonl(scope) if output == 'jsonl' else iter_csv(scope)
+    blocks = iter_blocks(lines, compress)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        # A sync iterator would be read into memory in full before sending
+        blocks = _aiter(blocks)
+
+    filename = f'{filename}.{extension}'
+    if compress:
+        content_type, filename = 'application/gzip', f'{filename}.gz'
+    response = StreamingHttpResponse(blocks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
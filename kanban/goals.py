@@ -0,0 +1,119 @@
+"""
+Maintained goal progress counters.
+
+``Goal.cards_total`` and ``Goal.cards_completed`` are adjusted with ``F()``
+updates whenever a card is linked to or unlinked from a goal, completed or
+reopened, created or deleted, so goal listings read progress from the goal
+row instead of counting its cards. The card's saved ``goal_id`` and
+``completed`` values are remembered when it is loaded and re-read just
+before it is saved, so a stale instance does not count a change twice.
+Inside ``transaction.atomic()`` the re-read locks the card row until the
+adjustment commits with the card write; writers of a card's goal or
+completion save inside a transaction for that reason.
+
+Signal handlers cover ``save()`` and ``delete()``; code that writes cards in
+bulk (``bulk_create``, ``QuerySet.update``) must adjust the counters itself
+or run ``recount_goal_progress``.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Card, Goal
+
+# Saved state of a card loaded without its goal or completed column
+UNKNOWN = object()
+
+# Card fields the counters depend on, as names accepted by save(update_fields=...)
+COUNTED_FIELDS = {'goal', 'goal_id', 'completed'}
+
+
+def adjust_goal_counts(goal_id: int, total_delta: int, completed_delta: int):
+    """
+    Add deltas to a goal's card counters.
+
+    Args:
+        goal_id: Goal to update
+        total_delta: Change in linked cards
+        completed_delta: Change in linked completed cards
+    """
+    if not goal_id or not (total_delta or completed_delta):
+        return
+    Goal.objects.filter(id=goal_id).update(
+        cards_total=Greatest(F('cards_total') + total_delta, Value(0)),
+        cards_completed=Greatest(F('cards_completed') + completed_delta, Value(0)),
+    )
+
+
+def recount_goal_progress(goal_ids=None) -> int:
+    """
+    Rebuild goal counters from the cards table.
+
+    Args:
+        goal_ids: Goals to repair (all goals when omitted)
+
+    Returns:
+        Number of goals updated
+    """
+    counts = Card.objects.filter(goal_id=OuterRef('id')).order_by().values('goal_id')
+    goals = Goal.objects.all()
+    if goal_ids is not None:
+        goals = goals.filter(id__in=goal_ids)
+    return goals.update(
+        cards_total=Coalesce(Subquery(counts.annotate(total=Count('id')).values('total')), Value(0)),
+        cards_completed=Coalesce(Subquery(
+            counts.annotate(total=Count('id', filter=Q(completed=True))).values('total')
+        ), Value(0)),
+    )
+
+
+@receiver(post_init, sender=Card)
+def remember_goal_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads don't trigger a query
+    if instance.pk:
+        instance._saved_goal_id = instance.__dict__.get('goal_id', UNKNOWN)
+        instance._saved_completed = instance.__dict__.get('completed', UNKNOWN)
+    else:
+        instance._saved_goal_id, instance._saved_completed = None, False
+
+
+@receiver(pre_save, sender=Card)
+def lock_goal_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Deltas are taken from the row as it is now, not as this instance loaded it
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not COUNTED_FIELDS.intersection(update_fields):
+        return
+    rows = Card.objects.filter(pk=instance.pk)
+    if transaction.get_connection().in_atomic_block:
+        rows = rows.select_for_update()
+    saved = rows.values_list('goal_id', 'completed').first()
+    if saved is not None:
+        instance._saved_goal_id, instance._saved_completed = saved
+
+
+@receiver(post_save, sender=Card)
+def count_saved_card(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not COUNTED_FIELDS.intersection(update_fields):
+        return
+    old_goal_id, was_completed = instance._saved_goal_id, instance._saved_completed
+    if UNKNOWN in (old_goal_id, was_completed):
+        return  # partial load: left to recount_goal_progress
+    instance._saved_goal_id, instance._saved_completed = instance.goal_id, instance.completed
+    if created:
+        adjust_goal_counts(instance.goal_id, 1, int(instance.completed))
+    elif old_goal_id != instance.goal_id:
+        adjust_goal_counts(old_goal_id, -1, -int(was_completed))
+        adjust_goal_counts(instance.goal_id, 1, int(instance.completed))
+    elif was_completed != instance.completed:
+        adjust_goal_counts(instance.goal_id, 0, 1 if instance.completed else -1)
+
+
+@receiver(post_delete, sender=Card)
+def count_deleted_card(sender, instance, **kwargs):
+    if UNKNOWN not in (instance._saved_goal_id, instance._saved_completed):
+        adjust_goal_counts(instance._saved_goal_id, -1, -int(instance._saved_completed))
@@ -0,0 +1,393 @@
+"""
+Board import from Trello JSON exports and CSV files.
+
+A file is read into a stream of card rows which is consumed in
+``IMPORT_BATCH_SIZE`` batches through ``batch_process``: each batch costs one
+INSERT for its cards, one for their label through-rows, one for checklist
+items and one for search index terms, whatever its size. Labels and
+assignees are resolved through in-memory maps, filled with at most one query
+(or bulk insert) per batch for names not seen before. Invalid rows are
+skipped and reported with their row number.
+
+CSV files are read row by row (a first pass only counts the rows of each
+list, so that card ranks can be spread evenly). A Trello export is a single
+JSON document and is loaded whole, but its cards are still written batch by
+batch. As with board copies, the new board stays inactive until the last
+batch is in, and files over ``IMPORT_SYNC_LIMIT_BYTES`` are imported by the
+``run_jobs`` worker.
+"""
+import csv
+import io
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, time as day_start
+from typing import Callable, Dict, Iterable, Iterator, List as TypingList, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .duplication import _with_pks
+from .jobs import register_job
+from .models import Board, Card, CardSearchTerm, Label, List, TaskChecklist
+from .ranking import spread_ranks
+from .search import build_terms
+from .utils import batch_process
+
+SOURCES = ('trello', 'csv')
+DEFAULT_LIST_TITLE = 'Imported'
+PRIORITIES = {value for value, _ in Card.PRIORITY_CHOICES}
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x'}
+
+# Trello label color names -> hex
+TRELLO_COLORS = {
+    'green': '#22C55E', 'yellow': '#EAB308', 'orange': '#F97316', 'red': '#EF4444',
+    'purple': '#A855F7', 'blue': '#3B82F6', 'sky': '#0EA5E9', 'lime': '#84CC16',
+    'pink': '#EC4899', 'black': '#1F2937',
+}
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be imported"""
+
+
+class ImportSource:
+    """Board title, lists and card rows read from an import file"""
+
+    def __init__(self, title: str, lists: TypingList[Tuple[str, str, int]], rows: Iterable[Tuple[int, dict]],
+                 total: int, row_label: str = 'Row', label_colors: Optional[Dict[str, str]] = None):
+        self.title = title
+        self.lists = lists  # (key, title, number of rows)
+        self.rows = rows  # (row number, row) in file order
+        self.total = total
+        self.row_label = row_label
+        self.label_colors = label_colors or {}
+
+
+def trello_source(file, title: str = '') -> ImportSource:
+    """Read a Trello board export (archived lists and cards are left out)"""
+    try:
+        data = json.load(file)
+    except ValueError:
+        raise ImportFormatError('The file is not valid JSON')
+    if not isinstance(data, dict) or not isinstance(data.get('cards'), list):
+        raise ImportFormatError('The file is not a Trello board export')
+
+    lists = sorted(
+        (list_obj for list_obj in data.get('lists', []) if not list_obj.get('closed')),
+        key=lambda list_obj: list_obj.get('pos') or 0
+    )
+    list_ids = {list_obj['id'] for list_obj in lists}
+    cards = sorted(
+        (card for card in data['cards'] if not card.get('closed') and card.get('idList') in list_ids),
+        key=lambda card: card.get('pos') or 0
+    )
+    counts = defaultdict(int)
+    for card in cards:
+        counts[card['idList']] += 1
+
+    label_names, label_colors = {}, {}
+    for label in data.get('labels', []):
+        name = label.get('name') or label.get('color') or 'label'
+        label_names[label['id']] = name
+        if label.get('color') in TRELLO_COLORS:
+            label_colors[name] = TRELLO_COLORS[label['color']]
+    members = {member['id']: member.get('username') for member in data.get('members', [])}
+    checklists = defaultdict(list)
+    for checklist in data.get('checklists', []):
+        for item in sorted(checklist.get('checkItems', []), key=lambda item: item.get('pos') or 0):
+            checklists[checklist.get('idCard')].append((item.get('name') or '', item.get('state') == 'complete'))
+
+    def rows():
+        for number, card in enumerate(cards, start=1):
+            usernames = [members.get(member_id) for member_id in card.get('idMembers', [])]
+            yield number, {
+                'list': card['idList'],
+                'title': card.get('name'),
+                'description': card.get('desc'),
+                'due_date': card.get('due'),
+                'completed': bool(card.get('dueComplete')),
+                'labels': [label_names[label_id] for label_id in card.get('idLabels', []) if label_id in label_names],
+                'assignee': next((username for username in usernames if username), None),
+                'checklist': checklists.get(card.get('id'), []),
+            }
+
+    return ImportSource(
+        title or data.get('name') or 'Trello import',
+        [(list_obj['id'], list_obj.get('name') or DEFAULT_LIST_TITLE, counts[list_obj['id']]) for list_obj in lists],
+        rows(), len(cards), row_label='Card', label_colors=label_colors,
+    )
+
+
+def _csv_rows(file) -> Iterator[Tuple[int, dict]]:
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        if 'title' not in (reader.fieldnames or []):
+            raise ImportFormatError('The CSV file needs a "title" column')
+        # Numbered as in a spreadsheet, the header being row 1
+        for number, row in enumerate(reader, start=2):
+            yield number, row
+    except UnicodeDecodeError:
+        raise ImportFormatError('The CSV file must be UTF-8 encoded')
+    finally:
+        text.detach()  # leave the underlying file open
+
+
+def csv_source(file, title: str = '') -> ImportSource:
+    """Read a CSV file with the columns of the CSV export (only ``title`` is required)"""
+    counts: Dict[str, int] = {}
+    for _, row in _csv_rows(file):
+        name = (row.get('list') or '').strip() or DEFAULT_LIST_TITLE
+        counts[name] = counts.get(name, 0) + 1
+
+    def rows():
+        for number, row in _csv_rows(file):
+            yield number, {
+                'list': (row.get('list') or '').strip() or DEFAULT_LIST_TITLE,
+                'title': row.get('title'),
+                'description': row.get('description'),
+                'priority': row.get('priority'),
+                'labels': [name.strip() for name in (row.get('labels') or '').split(';') if name.strip()],
+                'assignee': (row.get('assignee') or '').strip() or None,
+                'due_date': row.get('due_date'),
+                'estimated_hours': row.get('estimated_hours'),
+                'completed': (row.get('completed') or '').strip().lower() in TRUE_VALUES,
+                'completed_at': row.get('completed_at'),
+            }
+
+    return ImportSource(
+        title or 'CSV import', [(name, name, count) for name, count in counts.items()],
+        rows(), sum(counts.values()),
+    )
+
+
+def read_source(source: str, file, title: str = '') -> ImportSource:
+    """
+    Open an import file.
+
+    Args:
+        source: ``trello`` or ``csv``
+        file: Binary file object
+        title: Title of the new board (default: taken from the file)
+
+    Returns:
+        The parsed source
+
+    Raises:
+        ImportFormatError: If the file cannot be read as that source
+    """
+    reader = trello_source if source == 'trello' else csv_source
+    return reader(file, title)
+
+
+def _parse_moment(value, field: str) -> Optional[datetime]:
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            date = parse_date(value)
+            moment = datetime.combine(date, day_start()) if date else None
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f'invalid {field} "{value}"')
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def _card_fields(row: dict) -> dict:
+    """Validated Card field values of a row, raising ``ValueError`` with a readable message"""
+    title = (row.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is empty')
+    priority = (row.get('priority') or 'medium').strip().lower()
+    if priority not in PRIORITIES:
+        raise ValueError(f'unknown priority "{priority}"')
+    hours = (row.get('estimated_hours') or '').strip()
+    if hours and not hours.isdigit():
+        raise ValueError(f'invalid estimated_hours "{hours}"')
+    completed = bool(row.get('completed'))
+    return {
+        'title': title[:200],
+        'description': row.get('description') or '',
+        'priority': priority,
+        'due_date': _parse_moment(row.get('due_date'), 'due_date'),
+        'estimated_hours': int(hours) if hours else None,
+        'completed': completed,
+        'completed_at': (_parse_moment(row.get('completed_at'), 'completed_at') or timezone.now()) if completed else None,
+    }
+
+
+class LabelMap:
+    """The user's labels by lowercased name, created in bulk as new names appear"""
+
+    def __init__(self, user, colors: Dict[str, str]):
+        self.user = user
+        self.colors = colors
+        self.labels = {
+            name.lower(): (label_id, name)
+            for label_id, name in Label.objects.filter(user=user).values_list('id', 'name')
+        }
+
+    def resolve(self, names: Iterable[str]):
+        missing = {}
+        for name in names:
+            name = name[:50]
+            if name.lower() not in self.labels:
+                missing.setdefault(name.lower(), name)
+        if not missing:
+            return
+        new_labels = []
+        for name in missing.values():
+            label = Label(user=self.user, name=name)
+            if name in self.colors:
+                label.color = self.colors[name]
+            new_labels.append(label)
+        Label.objects.bulk_create(new_labels)
+        # Looked up by name: the highest ids need not be ours while another import runs
+        self.labels.update({
+            name.lower(): (label_id, name)
+            for label_id, name in Label.objects.filter(
+                user=self.user, name__in=missing.values()
+            ).values_list('id', 'name')
+        })
+
+    def get(self, name: str) -> Tuple[int, str]:
+        return self.labels[name[:50].lower()]
+
+
+class UserMap:
+    """User ids by username, looked up once per name"""
+
+    def __init__(self):
+        self.ids: Dict[str, Optional[int]] = {}
+
+    def resolve(self, usernames: Iterable[str]):
+        missing = {username for username in usernames if username and username not in self.ids}
+        if not missing:
+            return
+        self.ids.update(dict.fromkeys(missing))
+        self.ids.update(User.objects.filter(username__in=missing).values_list('username', 'id'))
+
+
+def import_board(user, source: ImportSource, progress: Optional[Callable] = None) -> dict:
+    """
+    Create a board from an import source.
+
+    Args:
+        user: Owner of the new board
+        source: Parsed import file
+        progress: Optional callable receiving ``(rows_processed, rows_total)``
+
+    Returns:
+        The board id, row counts, (at most ``IMPORT_MAX_ERRORS``) row errors and throughput
+    """
+    started = time.monotonic()
+    board = Board.objects.create(title=source.title[:200], owner=user, is_active=False)
+    processed = imported = error_count = 0
+    errors = []
+    try:
+        new_lists = _with_pks(List.objects.bulk_create([
+            List(title=title[:200], board=board, owner=user, rank=rank)
+            for (_, title, _), rank in zip(source.lists, spread_ranks(len(source.lists)))
+        ]), List.objects.filter(board=board))
+        list_ids = {key: list_obj.id for (key, _, _), list_obj in zip(source.lists, new_lists)}
+        card_ranks = {key: iter(spread_ranks(count)) for key, _, count in source.lists}
+        labels = LabelMap(user, source.label_colors)
+        users = UserMap()
+
+        if progress:
+            progress(0, source.total)
+        for batch in batch_process(source.rows, settings.IMPORT_BATCH_SIZE):
+            rows = []
+            for number, row in batch:
+                try:
+                    fields = _card_fields(row)
+                    fields.update(list_id=list_ids[row['list']], rank=next(card_ranks[row['list']]))
+                except ValueError as e:
+                    error_count += 1
+                    if len(errors) < settings.IMPORT_MAX_ERRORS:
+                        errors.append(f'{source.row_label} {number}: {e}')
+                else:
+                    rows.append((fields, row))
+            if rows:
+                _import_batch(rows, board, user, labels, users)
+            imported += len(rows)
+            processed += len(batch)
+            if progress:
+                progress(processed, source.total)
+    except Exception:
+        board.delete()
+        raise
+
+    board.is_active = True
+    board.save(update_fields=['is_active', 'updated_at'])
+    seconds = time.monotonic() - started
+    return {
+        'board_id': board.id,
+        'rows': processed,
+        'imported': imported,
+        'skipped': processed - imported,
+        'error_count': error_count,
+        'errors': errors,
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(processed / seconds, 1) if seconds else processed,
+    }
+
+
+def _import_batch(rows: TypingList[Tuple[dict, dict]], board: Board, owner, labels: LabelMap, users: UserMap):
+    labels.resolve(name for _, row in rows for name in row.get('labels', []))
+    users.resolve(row.get('assignee') for _, row in rows)
+
+    with transaction.atomic():
+        new_cards = _with_pks(Card.objects.bulk_create([
+            Card(board=board, owner=owner, assignee_id=users.ids.get(row.get('assignee')), **fields)
+            for fields, row in rows
+        ]), Card.objects.filter(board=board))
+
+        through = Card.labels.through
+        through_rows, terms, items = [], [], []
+        for card, (fields, row) in zip(new_cards, rows):
+            card_labels = dict(labels.get(name) for name in row.get('labels', []))
+            through_rows += [through(card_id=card.id, label_id=label_id) for label_id in card_labels]
+            # Signals are bypassed: the search terms are written here
+            terms += [
+                CardSearchTerm(user_id=owner.id, card_id=card.id, term=term, weight=weight)
+                for term, weight in build_terms(card.title, card.description, card_labels.values()).items()
+            ]
+            items += [
+                TaskChecklist(
+                    card_id=card.id, title=title[:200] or 'Item', is_completed=done, position=position,
+                    completed_at=timezone.now() if done else None,
+                )
+                for position, (title, done) in enumerate(row.get('checklist', []))
+            ]
+        through.objects.bulk_create(through_rows)
+        CardSearchTerm.objects.bulk_create(terms)
+        TaskChecklist.objects.bulk_create(items)
+
+
+def save_import_file(upload) -> str:
+    """Store an uploaded file for the job worker, returning its storage path"""
+    extension = os.path.splitext(upload.name)[1].lower()[:10]
+    return default_storage.save(f'imports/{uuid.uuid4().hex}{extension}', upload)
+
+
+@register_job('board_import')
+def import_board_job(job, progress):
+    """Job handler: ``params`` holds ``source``, ``path`` and ``title``"""
+    path = job.params['path']
+    try:
+        with default_storage.open(path, 'rb') as file:
+            return import_board(job.user, read_source(job.params['source'], file, job.params['title']), progress)
+    finally:
+        default_storage.delete(path)
@@ -0,0 +1,135 @@
+"""
+Background jobs.
+
+Work that is too large for a request (copying a big board, importing a
+file) is stored as a ``BackgroundJob`` row and executed by the ``run_jobs``
+worker. Handlers are registered per job kind and report progress through
+``JobProgress``; clients poll ``/api/jobs/<id>/`` and also receive
+``job.progress`` events on their notification stream. Notifications sent by
+a handler are written in one batch when it succeeds.
+"""
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+from .notifications import notification_batch
+from .realtime import broadcast_user_event
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(job, progress) returning the job result
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+
+def register_job(kind: str):
+    """Decorator registering the handler of a job kind"""
+    def decorator(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def enqueue_job(user, kind: str, **params) -> BackgroundJob:
+    """
+    Queue a job for the worker.
+
+    Args:
+        user: Account the job runs for
+        kind: Registered job kind
+        **params: JSON-serializable handler arguments
+
+    Returns:
+        The pending job
+    """
+    return BackgroundJob.objects.create(user=user, kind=kind, params=params)
+
+
+def job_payload(job: BackgroundJob) -> dict:
+    """Progress fields pushed to the job owner"""
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'processed': job.processed,
+        'total': job.total,
+        'progress_percentage': job.progress_percentage,
+        'rows_per_second': job.rows_per_second,
+        'result': job.result,
+        'error': job.error,
+    }
+
+
+class JobProgress:
+    """Records handler progress, writing it at most every ``JOB_PROGRESS_INTERVAL`` seconds"""
+
+    def __init__(self, job: Optional[BackgroundJob]):
+        self.job = job
+        self.last_write = 0.0
+
+    def __call__(self, processed: int, total: Optional[int] = None):
+        if self.job is None:
+            return  # synchronous run, nobody is polling
+        self.job.processed = processed
+        if total is not None:
+            self.job.total = total
+        now = time.monotonic()
+        if now - self.last_write >= settings.JOB_PROGRESS_INTERVAL or processed == self.job.total:
+            self.last_write = now
+            self.job.save(update_fields=['processed', 'total'])
+            broadcast_user_event(self.job.user_id, 'job.progress', job_payload(self.job))
+
+
+def run_job(job: BackgroundJob) -> BackgroundJob:
+    """Execute a claimed job and record its outcome"""
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'No handler registered for job kind {job.kind}')
+        with notification_batch():
+            job.result = handler(job, JobProgress(job)) or {}
+        job.status = 'succeeded'
+    except Exception as e:
+        logger.exception(f"Job {job.id} ({job.kind}) failed")
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'processed', 'total', 'finished_at'])
+    broadcast_user_event(job.user_id, 'job.progress', job_payload(job))
+    return job
+
+
+def claim_next_job() -> Optional[BackgroundJob]:
+    """Mark the oldest pending job as running and return it"""
+    with transaction.atomic():
+        pending = BackgroundJob.objects.filter(status='pending').order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            # Several workers can run side by side without picking the same job
+            pending = pending.select_for_update(skip_locked=True)
+        job = pending.first()
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_pending_jobs() -> int:
+    """
+    Run queued jobs until none is left.
+
+    Returns:
+        Number of jobs run
+    """
+    count = 0
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return count
+        run_job(job)
+        count += 1
@@ -0,0 +1,172 @@
+"""
+Queued email delivery.
+
+Requests only insert an ``EmailOutbox`` row; the ``send_outbox`` worker picks
+up due rows in batches and sends each batch over a single backend
+connection. A batch is first claimed (``sending``) in a short transaction;
+the SMTP conversation happens outside it and each message's outcome is
+recorded on its own, so a failed write cannot roll sent mail back to
+``pending``. A claim left behind by a crashed worker is taken over once
+``EMAIL_SEND_LEASE_SECONDS`` have passed. Failed messages are retried with
+exponential backoff until ``EMAIL_MAX_ATTEMPTS`` is reached. The
+recipient's ``UserProfile`` flags are checked at delivery time, so turning
+email off also stops mail that is already queued.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None,
+                  user=None, category: str = 'notification') -> EmailOutbox:
+    """
+    Queue an email for the outbox worker.
+
+    Args:
+        to_email: Recipient address
+        subject: Email subject
+        body: Plain text body
+        html_body: Optional HTML alternative
+        user: Recipient account whose email preferences apply
+        category: ``notification`` or ``daily_summary``
+
+    Returns:
+        The queued outbox row
+    """
+    return EmailOutbox.objects.create(
+        user=user,
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        category=category,
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next attempt after ``attempts`` failures"""
+    seconds = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_RETRY_MAX_SECONDS))
+
+
+def is_wanted(email: EmailOutbox) -> bool:
+    """Whether the recipient's preferences still allow this email"""
+    profile = getattr(email.user, 'profile', None) if email.user_id else None
+    if profile is None:
+        return True
+    if email.category == 'daily_summary':
+        return profile.daily_summary
+    return profile.email_notifications
+
+
+def _build_message(email: EmailOutbox, mail_connection) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email],
+        connection=mail_connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def claim_outbox(batch_size: int, now) -> Tuple[List[EmailOutbox], int]:
+    """
+    Claim a batch of due emails for this worker and commit the claim.
+
+    Emails the recipient no longer wants are cancelled instead.
+
+    Returns:
+        The claimed emails and the number cancelled
+    """
+    with transaction.atomic():
+        due = EmailOutbox.objects.filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+        if db_connection.features.has_select_for_update_skip_locked:
+            # Several workers can run side by side without sending twice
+            due = due.select_for_update(skip_locked=True, of=('self',))
+        emails = list(due.select_related('user__profile').order_by('next_attempt_at')[:batch_size])
+
+        wanted, cancelled = [], []
+        for email in emails:
+            if is_wanted(email):
+                wanted.append(email)
+            else:
+                cancelled.append(email.id)
+        if cancelled:
+            EmailOutbox.objects.filter(id__in=cancelled).update(status='cancelled')
+        if wanted:
+            lease = now + timedelta(seconds=settings.EMAIL_SEND_LEASE_SECONDS)
+            EmailOutbox.objects.filter(id__in=[email.id for email in wanted]).update(
+                status='sending', next_attempt_at=lease
+            )
+    return wanted, len(cancelled)
+
+
+def deliver_outbox(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Send one batch of due outbox emails over a single connection.
+
+    Args:
+        batch_size: Maximum number of emails (default: ``EMAIL_OUTBOX_BATCH_SIZE``)
+
+    Returns:
+        Counts of sent, retried, failed and cancelled emails
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    counts = {'sent': 0, 'retried': 0, 'failed': 0, 'cancelled': 0}
+
+    emails, counts['cancelled'] = claim_outbox(batch_size, now)
+    if not emails:
+        return counts
+
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as e:
+        # Nothing could be sent; every email in the batch is retried
+        logger.warning(f"Failed to open email connection: {str(e)}")
+        for email in emails:
+            _record_failure(email, e, now, counts)
+        return counts
+
+    try:
+        for email in emails:
+            try:
+                mail_connection.send_messages([_build_message(email, mail_connection)])
+            except Exception as e:
+                _record_failure(email, e, now, counts)
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.save(update_fields=['status', 'sent_at'])
+                counts['sent'] += 1
+    finally:
+        mail_connection.close()
+
+    return counts
+
+
+def _record_failure(email: EmailOutbox, error: Exception, now, counts: Dict[str, int]):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        email.status = 'failed'
+        counts['failed'] += 1
+        logger.error(f"Giving up on email {email.id} to {email.to_email}: {str(error)}")
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        counts['retried'] += 1
+    email.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error'])
@@ -0,0 +1,123 @@
+import json
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from kanban.models import Card, CardActivity, Notification, PomodoroSession, UserStatistics
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def hot_queries(object_id):
+    """The fixed filter/sort shapes issued by the views, keyed by a readable name"""
+    now = timezone.now()
+    return {
+        'cards of a list in rank order': Card.objects.filter(list_id=object_id).order_by('rank', 'id'),
+        'board changes since a sync': Card.objects.filter(board_id=object_id, updated_at__gte=now - timedelta(hours=1)),
+        'reminder horizon': Card.objects.filter(
+            completed=False, due_date__isnull=False, due_date__lte=now + timedelta(days=2)
+        ).order_by(),
+        'reminder poll': Card.objects.filter(updated_at__gte=now - timedelta(minutes=1)).order_by(),
+        'open cards of a list by due date': Card.objects.filter(
+            list_id=object_id, completed=False, due_date__lte=now
+        ).order_by('due_date'),
+        'due soon cards of a board': Card.objects.filter(
+            board_id=object_id, completed=False, due_date__gte=now, due_date__lte=now + timedelta(days=3)
+        ).order_by('due_date'),
+        'card list page': Card.objects.filter(owner_id=object_id).order_by('-created_at', '-id'),
+        'open cards of an assignee': Card.objects.filter(assignee_id=object_id, completed=False),
+        'completed cards of a goal': Card.objects.filter(goal_id=object_id, completed=True),
+        'activities of a card': CardActivity.objects.filter(card_id=object_id).order_by('-created_at'),
+        'activity feed of a board': CardActivity.objects.filter(board_id=object_id).order_by('-created_at', '-id'),
+        'unread notifications': Notification.objects.filter(
+            user_id=object_id, is_read=False
+        ).order_by('-created_at'),
+        'notification feed': Notification.objects.filter(user_id=object_id).order_by('-created_at', '-id'),
+        'pomodoro sessions since': PomodoroSession.objects.filter(
+            user_id=object_id, started_at__gte=now - timedelta(days=7)
+        ),
+        'daily statistics range': UserStatistics.objects.filter(
+            user_id=object_id, date__gte=(now - timedelta(days=30)).date()
+        ),
+    }
+
+
+def full_scans(plan, vendor):
+    """
+    Tables read without an index in a query plan.
+
+    Args:
+        plan: Output of ``QuerySet.explain()``
+        vendor: Database vendor (``connection.vendor``)
+
+    Returns:
+        Names of the fully scanned tables
+    """
+    if vendor == 'sqlite':
+        # "SCAN t USING [COVERING] INDEX i" walks an index; a bare "SCAN t" reads the table
+        return [
+            match.group(1) for match in map(SQLITE_SCAN.search, plan.splitlines())
+            if match and 'INDEX' not in match.group(2)
+        ]
+    if vendor == 'mysql':
+        tables = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get('access_type') == 'ALL':
+                    tables.append(node.get('table_name'))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(json.loads(plan))
+        return tables
+    if vendor == 'postgresql':
+        return POSTGRES_SCAN.findall(plan)
+    raise CommandError(f'EXPLAIN parsing is not supported for {vendor}')
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot query shapes and flag the ones that read a whole table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--id', type=int, default=1,
+            help='Value used for the user/board/list/card/goal filters (default: 1)'
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print every query plan, not only the flagged ones'
+        )
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Exit with an error when any query does a full table scan'
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        explain_options = {'format': 'json'} if vendor == 'mysql' else {}
+        flagged = []
+
+        for name, queryset in hot_queries(options['id']).items():
+            plan = queryset.explain(**explain_options)
+            tables = full_scans(plan, vendor)
+            if tables:
+                flagged.append(name)
+                self.stdout.write(self.style.WARNING(f"FULL SCAN  {name}: {', '.join(tables)}"))
+            else:
+                self.stdout.write(f"ok         {name}")
+            if tables or options['verbose_plans']:
+                self.stdout.write(f"    {plan}".replace('\n', '\n    '))
+
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f'{len(flagged)} hot queries do a full table scan')
+        self.stdout.write(self.style.SUCCESS(
+            f'Explained {len(hot_queries(options["id"]))} queries on {vendor}, {len(flagged)} flagged'
+        ))
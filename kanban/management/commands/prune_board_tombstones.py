@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from kanban.models import BoardTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete board tombstones older than BOARD_TOMBSTONE_RETENTION_DAYS'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.BOARD_TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = BoardTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {cutoff:%Y-%m-%d}'))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kanban.models import List, Card
+from kanban.ranking import long_rank_groups, rebalance
+from kanban.snapshots import bump_board_version
+
+
+class Command(BaseCommand):
+    help = 'Respace list and card ranks that have grown past RANK_REBALANCE_LENGTH'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and rescan every N seconds (default: run once)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            lists, cards = self.rebalance_once()
+            self.stdout.write(f'Rebalanced {lists} boards and {cards} lists')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def rebalance_once(self):
+        board_ids = list(long_rank_groups(List.objects.all(), 'board_id'))
+        for board_id in board_ids:
+            with transaction.atomic():
+                rebalance(List.objects.select_for_update().filter(board_id=board_id))
+                bump_board_version(board_id)
+
+        list_ids = list(long_rank_groups(Card.objects.all(), 'list_id'))
+        for list_id in list_ids:
+            with transaction.atomic():
+                rebalance(Card.objects.select_for_update().filter(list_id=list_id))
+                bump_board_version(List.objects.get(id=list_id).board_id)
+
+        return len(board_ids), len(list_ids)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kanban.models import Card, CardSearchTerm
+from kanban.search import build_terms
+from kanban.utils import batch_process
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the card full-text search index from scratch'
+
+    def handle(self, *args, **options):
+        cards = Card.objects.prefetch_related('labels')
+        card_ids = list(cards.values_list('id', flat=True))
+        indexed = 0
+
+        for chunk in batch_process(card_ids, batch_size=500):
+            with transaction.atomic():
+                CardSearchTerm.objects.filter(card_id__in=chunk).delete()
+                terms = []
+                for card in cards.filter(id__in=chunk):
+                    label_names = [label.name for label in card.labels.all()]
+                    terms.extend(
+                        CardSearchTerm(user_id=card.owner_id, card=card, term=term, weight=weight)
+                        for term, weight in build_terms(card.title, card.description, label_names).items()
+                    )
+                CardSearchTerm.objects.bulk_create(terms, batch_size=1000)
+            indexed += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} cards'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from kanban.goals import recount_goal_progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the maintained goal card counters from the cards table'
+
+    def handle(self, *args, **options):
+        updated = recount_goal_progress()
+        self.stdout.write(self.style.SUCCESS(f'Recounted card progress for {updated} goals'))
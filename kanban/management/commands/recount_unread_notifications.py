@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from kanban.notifications import recount_unread
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the maintained unread notification counters from the notifications table'
+
+    def handle(self, *args, **options):
+        updated = recount_unread()
+        self.stdout.write(self.style.SUCCESS(f'Recounted unread notifications for {updated} users'))
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from kanban.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs such as large board copies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the jobs that are queued now and exit'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(f'Ran {count} jobs')
+            if options['once']:
+                break
+            time.sleep(settings.JOB_POLL_SECONDS)
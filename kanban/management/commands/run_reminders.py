@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from kanban.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = 'Send due-soon and overdue reminders as cards reach their deadlines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Send the reminders that are due now and exit'
+        )
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler()
+        while True:
+            sent = scheduler.tick()
+            if sent:
+                stats = scheduler.dispatcher.stats
+                self.stdout.write(
+                    f"Sent {sent} reminders (last batch {stats['last_batch_size']}, "
+                    f"{stats['last_latency_ms']:.1f} ms)"
+                )
+            if options['once']:
+                break
+            time.sleep(self.sleep_seconds(scheduler))
+
+    def sleep_seconds(self, scheduler):
+        # Wake for the next reminder, but poll for card changes at least every interval
+        interval = settings.REMINDER_POLL_SECONDS
+        next_wakeup = scheduler.next_wakeup()
+        if next_wakeup is None:
+            return interval
+        return min(interval, max((next_wakeup - timezone.now()).total_seconds(), 0.1))
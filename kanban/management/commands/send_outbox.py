@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from kanban.mailer import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Deliver the emails that are due now and exit'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = deliver_outbox()
+            if any(counts.values()):
+                self.stdout.write(
+                    f"Sent {counts['sent']}, retrying {counts['retried']}, "
+                    f"failed {counts['failed']}, cancelled {counts['cancelled']}"
+                )
+            if sum(counts.values()) >= settings.EMAIL_OUTBOX_BATCH_SIZE:
+                continue  # a full batch; more may be waiting
+            if options['once']:
+                break
+            time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0002_board_background_color_board_is_template_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0003_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('list', 'List'), ('card', 'Card')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='kanban.board')),
+            ],
+            options={
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['board', 'deleted_at'], name='kanban_boar_board_i_e9930c_idx')],
+            },
+        ),
+    ]
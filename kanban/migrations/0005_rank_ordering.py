@@ -0,0 +1,91 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+# Frozen copy of kanban.ranking.spread_ranks as of this migration
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+
+def spread_ranks(count):
+    width = 1
+    while BASE ** width < (count + 1) * 2:
+        width += 1
+    step = BASE ** width // (count + 1)
+
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * step
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, BASE)
+            digits.append(DIGITS[remainder])
+        ranks.append(''.join(reversed(digits)).rstrip('0'))
+    return ranks
+
+
+def ranks_from_positions(apps, schema_editor):
+    """Give every list and card a rank that preserves its current position"""
+    List = apps.get_model('kanban', 'List')
+    Card = apps.get_model('kanban', 'Card')
+
+    for model, parent_field in ((List, 'board_id'), (Card, 'list_id')):
+        parent_ids = model.objects.values_list(parent_field, flat=True).distinct()
+        for parent_id in parent_ids:
+            siblings = list(model.objects.filter(**{parent_field: parent_id}).order_by('position', 'id'))
+            for item, rank in zip(siblings, spread_ranks(len(siblings))):
+                item.rank = rank
+            model.objects.bulk_update(siblings, ['rank'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0004_boardtombstone'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='card',
+            options={'ordering': ['rank', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='list',
+            options={'ordering': ['rank', 'id']},
+        ),
+        migrations.AlterUniqueTogether(
+            name='card',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='list',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='rank',
+            field=models.CharField(default='i', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='rank',
+            field=models.CharField(default='i', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['list', 'rank'], name='kanban_card_list_id_3d9df2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['board', 'rank'], name='kanban_list_board_i_af12e1_idx'),
+        ),
+        migrations.RunPython(ranks_from_positions, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='card',
+            name='position',
+        ),
+        migrations.RemoveField(
+            model_name='list',
+            name='position',
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:37
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Frozen copy of kanban.search.build_terms as of this migration
+TITLE_WEIGHT = 3
+LABEL_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+TERM_MAX_LENGTH = 50
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [token[:TERM_MAX_LENGTH] for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def build_terms(title, description, label_names):
+    terms = {}
+    fields = [(title, TITLE_WEIGHT), (description, DESCRIPTION_WEIGHT)]
+    fields += [(name, LABEL_WEIGHT) for name in label_names]
+    for text, weight in fields:
+        for term in set(tokenize(text)):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+def build_search_index(apps, schema_editor):
+    """Index the text of every existing card"""
+    Card = apps.get_model('kanban', 'Card')
+    CardSearchTerm = apps.get_model('kanban', 'CardSearchTerm')
+
+    cards = Card.objects.select_related('list__board').prefetch_related('labels')
+    batch = []
+    for card in cards.iterator(chunk_size=500):
+        terms = build_terms(card.title, card.description, [label.name for label in card.labels.all()])
+        batch.extend(
+            CardSearchTerm(user_id=card.list.board.owner_id, card_id=card.id, term=term, weight=weight)
+            for term, weight in terms.items()
+        )
+        if len(batch) >= 1000:
+            CardSearchTerm.objects.bulk_create(batch)
+            batch = []
+    CardSearchTerm.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0005_rank_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='kanban.card')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'term'], name='kanban_card_user_id_a67e84_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_owner_and_board(apps, schema_editor):
+    """Copy the board owner (and board) down the tree with set-based UPDATEs"""
+    Board = apps.get_model('kanban', 'Board')
+    List = apps.get_model('kanban', 'List')
+    Card = apps.get_model('kanban', 'Card')
+    Comment = apps.get_model('kanban', 'Comment')
+    CardActivity = apps.get_model('kanban', 'CardActivity')
+
+    List.objects.update(
+        owner_id=Subquery(Board.objects.filter(id=OuterRef('board_id')).values('owner_id')[:1])
+    )
+    lists = List.objects.filter(id=OuterRef('list_id'))
+    Card.objects.update(
+        board_id=Subquery(lists.values('board_id')[:1]),
+        owner_id=Subquery(lists.values('owner_id')[:1]),
+    )
+    Comment.objects.update(
+        owner_id=Subquery(Card.objects.filter(id=OuterRef('card_id')).values('owner_id')[:1])
+    )
+    cards = Card.objects.filter(id=OuterRef('card_id'))
+    CardActivity.objects.update(
+        board_id=Subquery(cards.values('board_id')[:1]),
+        owner_id=Subquery(cards.values('owner_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('kanban', '0006_cardsearchterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='card',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanban.board'),
+        ),
+        migrations.AddField(
+            model_name='card',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='cardactivity',
+            name='board',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanban.board'),
+        ),
+        migrations.AddField(
+            model_name='cardactivity',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_owner_and_board, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='list',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='card',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanban.board'),
+        ),
+        migrations.AlterField(
+            model_name='card',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='cardactivity',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='kanban.board'),
+        ),
+        migrations.AlterField(
+            model_name='cardactivity',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['owner', 'completed', 'due_date'], name='kanban_card_owner_i_d26e46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board', 'updated_at'], name='kanban_card_board_i_a868ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardactivity',
+            index=models.Index(fields=['owner', '-created_at'], name='kanban_card_owner_i_81aec8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardactivity',
+            index=models.Index(fields=['board', '-created_at'], name='kanban_card_board_i_148680_idx'),
+        ),
+    ]
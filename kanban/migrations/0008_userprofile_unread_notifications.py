@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_unread_notifications(apps, schema_editor):
+    UserProfile = apps.get_model('kanban', 'UserProfile')
+    Notification = apps.get_model('kanban', 'Notification')
+    unread = Notification.objects.filter(
+        user_id=OuterRef('user_id'), is_read=False
+    ).order_by().values('user_id').annotate(total=Count('id')).values('total')
+    UserProfile.objects.update(unread_notifications=Coalesce(Subquery(unread), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0007_denormalized_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0008_userprofile_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['completed', 'due_date'], name='kanban_card_complet_ea8712_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['updated_at'], name='kanban_card_updated_2eda35_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0010_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cardactivity',
+            name='kanban_card_owner_i_81aec8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cardactivity',
+            name='kanban_card_board_i_148680_idx',
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='kanban_card_owner_i_3abb73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardactivity',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='kanban_card_owner_i_66d69e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardactivity',
+            index=models.Index(fields=['board', '-created_at', '-id'], name='kanban_card_board_i_b475b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='kanban_comm_owner_i_2e4dbd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['card', '-created_at', '-id'], name='kanban_comm_card_id_8dd702_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='kanban_noti_user_id_63ffbc_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0011_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['list', 'completed', 'due_date'], name='kanban_card_list_id_6243f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board', 'completed', 'due_date'], name='kanban_card_board_i_5f7092_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['assignee', 'completed'], name='kanban_card_assigne_60c2e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['goal', 'completed'], name='kanban_card_goal_id_2fdfcf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cardactivity',
+            index=models.Index(fields=['card', '-created_at'], name='kanban_card_card_id_c3ae7c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='kanban_noti_user_id_f52a7c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pomodorosession',
+            index=models.Index(fields=['user', 'started_at'], name='kanban_pomo_user_id_acbb98_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0013_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='kind',
+            field=models.CharField(choices=[('board_copy', 'Board Copy'), ('board_import', 'Board Import')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_goal_cards(apps, schema_editor):
+    Goal = apps.get_model('kanban', 'Goal')
+    Card = apps.get_model('kanban', 'Card')
+    counts = Card.objects.filter(goal_id=OuterRef('id')).order_by().values('goal_id')
+    Goal.objects.update(
+        cards_total=Coalesce(Subquery(counts.annotate(total=Count('id')).values('total')), Value(0)),
+        cards_completed=Coalesce(Subquery(
+            counts.annotate(total=Count('id', filter=Q(completed=True))).values('total')
+        ), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0014_board_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='cards_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='cards_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_goal_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0015_goal_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=10),
+        ),
+    ]
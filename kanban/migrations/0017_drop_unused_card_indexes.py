@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban', '0016_email_outbox_sending'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='card',
+            name='kanban_card_owner_i_d26e46_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='card',
+            name='kanban_card_complet_ea8712_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='card',
+            name='kanban_card_list_id_6243f4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='card',
+            name='kanban_card_board_i_5f7092_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='card',
+            name='kanban_card_goal_id_2fdfcf_idx',
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['due_date', 'completed'], name='kanban_card_due_dat_d42a62_idx'),
+        ),
+    ]
@@ -4,6 +4,27 @@ from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.db.models import Q
+from .ranking import RANK_MAX_LENGTH, spread_ranks
+
+
+def _loaded_parent(instance, field_name):
+    """
+    Parent object to copy denormalized columns from, or None if unchanged.
+    
+    The parent is used when it is already loaded (it was just assigned) or
+    the row is new, so saves that don't move the row cost no extra query.
+    """
+    if instance._state.adding or instance._meta.get_field(field_name).is_cached(instance):
+        return getattr(instance, field_name)
+    return None
+
+
+def _with_update_fields(kwargs, trigger, *extra):
+    """Also save denormalized columns when a partial save touches their source"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and trigger in update_fields:
+        kwargs['update_fields'] = set(update_fields).union(extra)
+    return kwargs
 
 
 class UserProfile(models.Model):
@@ -23,6 +44,9 @@ class UserProfile(models.Model):
     due_date_reminders = models.BooleanField(default=True)
     daily_summary = models.BooleanField(default=False)
     
+    # Maintained by kanban.notifications so the badge never runs COUNT(*)
+    unread_notifications = models.PositiveIntegerField(default=0)
+    
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -74,6 +98,9 @@ class Goal(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by kanban.goals; rebuilt by the recount_goal_progress command
+    cards_total = models.PositiveIntegerField(default=0)
+    cards_completed = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['-created_at']
@@ -84,11 +111,9 @@ class Goal(models.Model):
     @property
     def progress_percentage(self):
         """Calculate completion percentage based on associated tasks"""
-        total_cards = self.cards.count()
-        if total_cards == 0:
+        if self.cards_total == 0:
             return 0
-        completed_cards = self.cards.filter(completed=True).count()
-        return round((completed_cards / total_cards) * 100, 1)
+        return round(self.cards_completed / self.cards_total * 100, 1)
     
     @property
     def is_overdue(self):
@@ -111,6 +136,9 @@ class Board(models.Model):
     # Board customization
     background_color = models.CharField(max_length=7, default='#F3F4F6')
     
+    # Bumped on every write to the board tree; keys the cached board snapshot
+    version = models.PositiveIntegerField(default=0)
+    
     class Meta:
         ordering = ['-created_at']
     
@@ -119,34 +147,37 @@ class Board(models.Model):
     
     def create_default_lists(self):
         """Create default To-do, Doing, Done lists"""
-        default_lists = [
-            {'title': 'To-do', 'position': 0},
-            {'title': 'Doing', 'position': 1},
-            {'title': 'Done', 'position': 2},
-        ]
-        
-        for list_data in default_lists:
-            List.objects.create(
-                title=list_data['title'],
-                board=self,
-                position=list_data['position']
-            )
+        titles = ['To-do', 'Doing', 'Done']
+        List.objects.bulk_create([
+            List(title=title, board=self, owner_id=self.owner_id, rank=rank)
+            for title, rank in zip(titles, spread_ranks(len(titles)))
+        ])
 
 
 class List(models.Model):
     """Model representing a list/column in a Kanban board"""
     title = models.CharField(max_length=200)
     board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='lists')
-    position = models.PositiveIntegerField(default=0)
+    # Denormalized board owner for single-predicate permission scoping
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    rank = models.CharField(max_length=RANK_MAX_LENGTH, default='i')
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['position']
-        unique_together = ['board', 'position']
+        ordering = ['rank', 'id']
+        indexes = [
+            models.Index(fields=['board', 'rank']),
+        ]
     
     def __str__(self):
         return f"{self.board.title} - {self.title}"
+    
+    def save(self, *args, **kwargs):
+        board = _loaded_parent(self, 'board')
+        if board is not None:
+            self.owner_id = board.owner_id
+        super().save(*args, **_with_update_fields(kwargs, 'board', 'owner'))
 
 
 class Card(models.Model):
@@ -161,11 +192,14 @@ class Card(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     list = models.ForeignKey(List, on_delete=models.CASCADE, related_name='cards')
+    # Denormalized from the list for single-predicate permission scoping and board queries
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
     goal = models.ForeignKey(Goal, on_delete=models.SET_NULL, null=True, blank=True, related_name='cards')
     assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_cards')
     labels = models.ManyToManyField(Label, blank=True, related_name='cards')
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
-    position = models.PositiveIntegerField(default=0)
+    rank = models.CharField(max_length=RANK_MAX_LENGTH, default='i')
     due_date = models.DateTimeField(null=True, blank=True)
     estimated_hours = models.PositiveIntegerField(null=True, blank=True, help_text="Estimated hours to complete")
     created_at = models.DateTimeField(default=timezone.now)
@@ -174,8 +208,21 @@ class Card(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
-        ordering = ['position']
-        unique_together = ['list', 'position']
+        ordering = ['rank', 'id']
+        # Each index is chosen by a plan of the explain_hot_queries command
+        indexes = [
+            # Cards of a list in rank order, board sync since a version
+            models.Index(fields=['list', 'rank']),
+            models.Index(fields=['board', 'updated_at']),
+            # Reminder scheduler: upcoming deadlines and cards changed since its last poll.
+            # The deadline range leads: SQLite filters open cards with NOT completed
+            models.Index(fields=['due_date', 'completed']),
+            models.Index(fields=['updated_at']),
+            # Cursor pagination of the card list
+            models.Index(fields=['owner', '-created_at', '-id']),
+            # Open cards of an assignee
+            models.Index(fields=['assignee', 'completed']),
+        ]
     
     def __str__(self):
         return self.title
@@ -200,20 +247,18 @@ class Card(models.Model):
             self.completed_at = timezone.now()
         elif not self.completed:
             self.completed_at = None
-        super().save(*args, **kwargs)
+        list_obj = _loaded_parent(self, 'list')
+        if list_obj is not None:
+            self.board_id = list_obj.board_id
+            self.owner_id = list_obj.owner_id
+        super().save(*args, **_with_update_fields(kwargs, 'list', 'board', 'owner'))
     
     @classmethod
     def search(cls, user, query, filters=None):
         """Advanced search and filter for cards"""
-        queryset = cls.objects.filter(list__board__owner=user)
+        from .search import search_cards
         
-        # Text search
-        if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(labels__name__icontains=query)
-            ).distinct()
+        queryset = cls.objects.filter(owner=user)
         
         # Apply filters
         if filters:
@@ -255,7 +300,7 @@ class Card(models.Model):
             
             # Filter by board
             if filters.get('board'):
-                queryset = queryset.filter(list__board__id__in=filters['board'])
+                queryset = queryset.filter(board_id__in=filters['board'])
             
             # Filter by date range
             if filters.get('created_from'):
@@ -263,22 +308,76 @@ class Card(models.Model):
             if filters.get('created_to'):
                 queryset = queryset.filter(created_at__lte=filters['created_to'])
         
+        # Text search, ranked by relevance
+        if query:
+            return search_cards(queryset, user, query).order_by('-search_rank', '-updated_at')
+        
         return queryset.order_by('-updated_at')
 
 
+class CardSearchTerm(models.Model):
+    """Inverted index entry: one row per distinct term of a card, weighted by field"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    card = models.ForeignKey(Card, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=50)
+    weight = models.PositiveSmallIntegerField(default=1)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'term']),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} ({self.weight}) -> {self.card_id}"
+
+
+class BoardTombstone(models.Model):
+    """Record of a deleted list or card, served by the board changes feed"""
+    OBJECT_TYPES = [
+        ('list', 'List'),
+        ('card', 'Card'),
+    ]
+    
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='tombstones')
+    object_type = models.CharField(max_length=10, choices=OBJECT_TYPES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['board', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"Deleted {self.object_type} {self.object_id} on {self.board_id}"
+
+
 class Comment(models.Model):
     """Model representing comments on cards"""
     card = models.ForeignKey(Card, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Denormalized board owner for single-predicate permission scoping
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
     content = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-id']),
+            models.Index(fields=['card', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.username} on {self.card.title}"
+    
+    def save(self, *args, **kwargs):
+        card = _loaded_parent(self, 'card')
+        if card is not None:
+            self.owner_id = card.owner_id
+        super().save(*args, **_with_update_fields(kwargs, 'card', 'owner'))
 
 
 class CardActivity(models.Model):
@@ -296,15 +395,30 @@ class CardActivity(models.Model):
     
     card = models.ForeignKey(Card, on_delete=models.CASCADE, related_name='activities')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Denormalized from the card for single-predicate feeds and permission scoping
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='+')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPES)
     description = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-id']),
+            models.Index(fields=['board', '-created_at', '-id']),
+            models.Index(fields=['card', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} {self.activity_type} {self.card.title}"
+    
+    def save(self, *args, **kwargs):
+        card = _loaded_parent(self, 'card')
+        if card is not None:
+            self.board_id = card.board_id
+            self.owner_id = card.owner_id
+        super().save(*args, **_with_update_fields(kwargs, 'card', 'board', 'owner'))
 
 
 class Notification(models.Model):
@@ -329,11 +443,102 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['user', 'is_read', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
 
+class EmailOutbox(models.Model):
+    """Queued email, delivered in batches by the send_outbox worker"""
+    CATEGORIES = [
+        ('notification', 'Notification'),
+        ('daily_summary', 'Daily Summary'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_emails')
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    category = models.CharField(max_length=20, choices=CATEGORIES, default='notification')
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+class BackgroundJob(models.Model):
+    """Long-running task executed by the run_jobs worker, polled for progress"""
+    KINDS = [
+        ('board_copy', 'Board Copy'),
+        ('board_import', 'Board Import'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending')
+    params = models.JSONField(default=dict, blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+    
+    @property
+    def progress_percentage(self):
+        if self.status == 'succeeded':
+            return 100
+        if not self.total:
+            return 0
+        return min(round(self.processed / self.total * 100), 100)
+    
+    @property
+    def rows_per_second(self):
+        if not self.started_at or not self.processed:
+            return 0
+        seconds = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.processed / seconds, 1) if seconds > 0 else 0
+
+
 class UserStatistics(models.Model):
     """Model to store daily user statistics"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='statistics')
@@ -439,6 +644,9 @@ class PomodoroSession(models.Model):
     
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['user', 'started_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.session_type} ({self.duration_minutes}min)"
@@ -0,0 +1,291 @@
+"""
+Unread notification counters and live delivery.
+
+The unread count of a user is kept on ``UserProfile.unread_notifications``
+and adjusted with ``F()`` updates as notifications are created, read or
+deleted, so the badge is a primary-key lookup instead of a ``COUNT(*)``
+over the user's notifications. New notifications and count changes are
+pushed to the user's channel group (WebSocket or SSE) after the
+transaction commits.
+
+Signal handlers cover ``save()`` and ``delete()``; code that writes in bulk
+(``bulk_create``, ``QuerySet.update``) must adjust the counter itself.
+
+New notifications should go through ``notify`` (views, signal handlers) or a
+``NotificationDispatcher`` (workers): events are buffered, identical
+``(user, type, card, goal)`` events inside ``NOTIFICATION_DEDUPE_SECONDS``
+are coalesced, and each batch is written with one ``bulk_create``.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value, prefetch_related_objects
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Notification, UserProfile
+from .realtime import broadcast_user_event, send_group_event, user_group_name
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def get_unread_count(user_id: int) -> int:
+    """Current unread notification count of a user"""
+    count = UserProfile.objects.filter(user_id=user_id).values_list('unread_notifications', flat=True).first()
+    return count or 0
+
+
+def push_unread_count(user_id: int):
+    """Push the user's unread count once the transaction commits"""
+    transaction.on_commit(lambda: send_group_event(
+        user_group_name(user_id), 'unread_count', {'unread_count': get_unread_count(user_id)}
+    ))
+
+
+def adjust_unread_count(user_id: int, delta: int):
+    """
+    Add ``delta`` to a user's unread count and push the new value.
+
+    Args:
+        user_id: Owner of the notifications
+        delta: Number of notifications that became unread (negative when read)
+    """
+    if not delta:
+        return
+    UserProfile.objects.filter(user_id=user_id).update(
+        unread_notifications=Greatest(F('unread_notifications') + delta, Value(0))
+    )
+    push_unread_count(user_id)
+
+
+def recount_unread(user_ids=None) -> int:
+    """
+    Rebuild unread counters from the notifications table.
+
+    Args:
+        user_ids: Users to repair (all users when omitted)
+
+    Returns:
+        Number of profiles updated
+    """
+    unread = Notification.objects.filter(
+        user_id=OuterRef('user_id'), is_read=False
+    ).order_by().values('user_id').annotate(total=Count('id')).values('total')
+    profiles = UserProfile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    return profiles.update(unread_notifications=Coalesce(Subquery(unread), Value(0)))
+
+
+def push_notification(notification: Notification):
+    """Push a new notification to the user's open connections"""
+    from .serializers import NotificationSerializer
+    
+    broadcast_user_event(notification.user_id, 'notification.created', NotificationSerializer(notification).data)
+
+
+def _dedupe_key(notification: Notification) -> Tuple[int, str, int, int]:
+    return notification.user_id, notification.type, notification.card_id, notification.goal_id
+
+
+def _with_pks(created: List[Notification]) -> List[Notification]:
+    """
+    Notifications returned by ``bulk_create`` with their primary keys.
+
+    Backends that cannot return ids from a bulk insert (MySQL) leave them
+    unset; they are then looked up by their dedupe key and ``created_at``.
+    """
+    missing = [n for n in created if n.pk is None]
+    if not missing:
+        return created
+    ids = {
+        (user_id, type_, card_id, goal_id, created_at): pk
+        for pk, user_id, type_, card_id, goal_id, created_at in Notification.objects.filter(
+            user_id__in={n.user_id for n in missing},
+            created_at__in={n.created_at for n in missing},
+        ).values_list('id', 'user_id', 'type', 'card_id', 'goal_id', 'created_at')
+    }
+    for notification in missing:
+        notification.pk = ids.get((*_dedupe_key(notification), notification.created_at))
+    return created
+
+
+def create_notifications(notifications: List[Notification]) -> List[Notification]:
+    """
+    Insert notifications in one statement, then update counters and push them.
+
+    Args:
+        notifications: Unsaved notifications
+
+    Returns:
+        The created notifications
+    """
+    if not notifications:
+        return []
+    with transaction.atomic():
+        created = _with_pks(Notification.objects.bulk_create(notifications))
+        unread = Counter(n.user_id for n in created if not n.is_read)
+        for user_id, count in unread.items():
+            adjust_unread_count(user_id, count)
+        from .serializers import NotificationSerializer
+        
+        prefetch_related_objects(created, *NotificationSerializer.prefetch_lookups())
+        for notification in created:
+            push_notification(notification)
+    return created
+
+
+class NotificationDispatcher:
+    """
+    Buffers notification events and writes them in coalesced bulk batches.
+
+    Events with the same ``(user, type, card, goal)`` key are merged while buffered
+    and dropped at flush time if one was already written within the dedupe
+    window. The buffer is flushed when it reaches ``batch_size`` or when
+    ``flush`` is called. ``stats`` accumulates batch sizes and write latency.
+    """
+
+    def __init__(self, window: int = None, batch_size: int = None):
+        self.window = settings.NOTIFICATION_DEDUPE_SECONDS if window is None else window
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.buffer: Dict[Tuple[int, str, int, int], Notification] = {}
+        self.stats = {
+            'batches': 0,
+            'events': 0,
+            'coalesced': 0,
+            'written': 0,
+            'last_batch_size': 0,
+            'last_latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+        }
+
+    def add(self, **fields) -> bool:
+        """
+        Buffer one notification event.
+
+        Args:
+            **fields: ``Notification`` fields (``user``/``user_id``, ``type``, ``title``, ...)
+
+        Returns:
+            False if the event was merged into an identical buffered one
+        """
+        notification = Notification(**fields)
+        key = _dedupe_key(notification)
+        self.stats['events'] += 1
+        if key in self.buffer:
+            self.stats['coalesced'] += 1
+            return False
+        self.buffer[key] = notification
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self) -> List[Notification]:
+        """Write the buffered events, skipping ones already sent within the window"""
+        if not self.buffer:
+            return []
+        started = time.monotonic()
+        pending, self.buffer = self.buffer, {}
+
+        if self.window:
+            cutoff = timezone.now() - timedelta(seconds=self.window)
+            recent = set(Notification.objects.filter(
+                created_at__gte=cutoff,
+                user_id__in={user_id for user_id, _, _, _ in pending},
+                type__in={type_ for _, type_, _, _ in pending},
+            ).values_list('user_id', 'type', 'card_id', 'goal_id'))
+            for key in recent.intersection(pending):
+                del pending[key]
+                self.stats['coalesced'] += 1
+
+        created = create_notifications(list(pending.values()))
+        latency_ms = (time.monotonic() - started) * 1000
+        self.stats['batches'] += 1
+        self.stats['written'] += len(created)
+        self.stats['last_batch_size'] = len(created)
+        self.stats['last_latency_ms'] = latency_ms
+        self.stats['max_latency_ms'] = max(self.stats['max_latency_ms'], latency_ms)
+        logger.info(f"Notification batch: {len(created)} written in {latency_ms:.1f} ms")
+        return created
+
+
+@contextmanager
+def notification_batch(dispatcher: NotificationDispatcher = None):
+    """
+    Collect ``notify`` calls made inside the block and write them at exit.
+
+    Nested blocks share the outermost dispatcher. Nothing is written if the
+    block raises.
+
+    Args:
+        dispatcher: Dispatcher the outermost block buffers into (a new one when omitted)
+    """
+    current = getattr(_local, 'dispatcher', None)
+    if current is not None:
+        yield current
+        return
+    dispatcher = _local.dispatcher = dispatcher or NotificationDispatcher()
+    try:
+        yield dispatcher
+    finally:
+        _local.dispatcher = None
+    dispatcher.flush()
+
+
+def notify(**fields):
+    """
+    Send a notification, batched with others when inside ``notification_batch``.
+
+    Args:
+        **fields: ``Notification`` fields, e.g. ``user=..., type='assigned', card=...``
+    """
+    with notification_batch() as dispatcher:
+        dispatcher.add(**fields)
+
+
+def notify_assignment(card, actor):
+    """Tell a card's assignee they were assigned, unless they assigned themselves"""
+    if card.assignee_id and card.assignee_id != actor.id:
+        notify(
+            user_id=card.assignee_id,
+            type='assigned',
+            title='Card Assigned',
+            message=f'{actor.profile.name} assigned you "{card.title}"',
+            card=card,
+        )
+
+
+@receiver(post_init, sender=Notification)
+def remember_read_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads don't trigger a query
+    instance._saved_is_read = instance.__dict__.get('is_read') if instance.pk else None
+
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_read = instance._saved_is_read
+    instance._saved_is_read = instance.is_read
+    if created:
+        push_notification(instance)
+        adjust_unread_count(instance.user_id, 0 if instance.is_read else 1)
+    elif was_read is not None and was_read != instance.is_read:
+        adjust_unread_count(instance.user_id, -1 if instance.is_read else 1)
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread_count(instance.user_id, -1)
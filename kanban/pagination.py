@@ -0,0 +1,43 @@
+"""
+Cursor pagination for append-heavy feeds.
+
+Cards, activities, notifications and comments are paged by an opaque cursor
+on ``(created_at, id)`` instead of page numbers: no ``COUNT(*)`` is issued
+and each page is an index range scan starting after the previous one, so
+deep pages cost the same as the first. Each model has a composite index on
+its scoping column followed by ``created_at`` and ``id``.
+
+Cards of one list are paged by a cursor on ``(rank, id)`` instead, so a
+column reads in its board order. Results that are ordered by something a
+cursor cannot follow (relevance, a whole board in list order) are bounded
+and returned in one page of the same shape, so every request to an
+endpoint gets ``{next, previous, results}``.
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest first, ties on ``created_at`` broken by ``id``"""
+    ordering = ('-created_at', '-id')
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    page_size_query_param = 'page_size'
+    max_page_size = settings.CURSOR_PAGE_SIZE_MAX
+
+
+class RankCursorPagination(CreatedAtCursorPagination):
+    """Column order: ``rank`` ascending, ties broken by ``id``"""
+    ordering = ('rank', 'id')
+
+
+class SinglePagePagination(CreatedAtCursorPagination):
+    """The whole bounded result in the queryset's own order, in the cursor response shape"""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return list(queryset)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([('next', None), ('previous', None), ('results', data)]))
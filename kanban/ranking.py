@@ -0,0 +1,192 @@
+"""
+Lexicographic rank keys for ordering lists and cards.
+
+A rank is a base-36 fraction written without the leading "0." ("i" is 0.5,
+"9" is 0.25, ...), so ordering rows by the plain string column orders them
+numerically. A key strictly between any two neighbours always exists, which
+lets a move rewrite only the moved row. Only digits and lowercase letters are
+used so that case-insensitive collations (MySQL) sort the keys the same way.
+
+Keys grow by roughly one character every few inserts at the same spot.
+Appends take the shortest key after the last one instead of a midpoint, so
+they grow one character every ~35 appends. ``rebalance`` rewrites a whole
+sibling set to short, evenly spaced keys. It runs inline when a new key would
+exceed the column, and in the background from the ``rebalance_ranks``
+management command.
+"""
+from typing import List, Optional
+
+from django.conf import settings
+from django.db.models.functions import Length
+from django.utils import timezone
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+RANK_MAX_LENGTH = 64
+
+
+def _midpoint(lower: str, upper: Optional[str]) -> str:
+    """Key strictly between two keys (``upper`` of None means 1.0)"""
+    if upper is not None:
+        # Keep the common prefix and recurse on the remainder
+        prefix = 0
+        while prefix < len(upper) and (lower[prefix] if prefix < len(lower) else '0') == upper[prefix]:
+            prefix += 1
+        if prefix > 0:
+            return upper[:prefix] + _midpoint(lower[prefix:], upper[prefix:])
+
+    digit_lower = DIGITS.index(lower[0]) if lower else 0
+    digit_upper = DIGITS.index(upper[0]) if upper is not None else BASE
+    if digit_upper - digit_lower > 1:
+        return DIGITS[(digit_lower + digit_upper + 1) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return DIGITS[digit_lower] + _midpoint(lower[1:], None)
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Generate a rank that sorts strictly between two neighbouring ranks.
+
+    Args:
+        before: Rank of the previous item, or None at the start
+        after: Rank of the next item, or None at the end
+
+    Returns:
+        New rank key
+
+    Raises:
+        ValueError: If the neighbours are not in ascending order
+    """
+    before = before or ''
+    if after is not None and before >= after:
+        raise ValueError(f"Rank '{before}' does not sort before '{after}'")
+    if before.endswith('0') or (after or '').endswith('0'):
+        raise ValueError('Ranks must not end with the zero digit')
+    return _midpoint(before, after)
+
+
+def rank_after(rank: str) -> str:
+    """Shortest key that sorts after ``rank``"""
+    for length in range(1, len(rank) + 1):
+        digit = DIGITS.index(rank[length - 1])
+        if digit < BASE - 1:
+            return rank[:length - 1] + DIGITS[digit + 1]
+    return rank + DIGITS[1]
+
+
+def spread_ranks(count: int) -> List[str]:
+    """
+    Generate ``count`` short, evenly spaced ranks in ascending order.
+
+    Args:
+        count: Number of ranks to generate
+
+    Returns:
+        List of rank keys
+    """
+    width = 1
+    while BASE ** width < (count + 1) * 2:
+        width += 1
+    step = BASE ** width // (count + 1)
+
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * step
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, BASE)
+            digits.append(DIGITS[remainder])
+        ranks.append(''.join(reversed(digits)).rstrip('0'))
+    return ranks
+
+
+def _neighbour_rank(queryset, index: int, exclude_id: Optional[int]) -> str:
+    siblings = queryset.order_by('rank', 'id')
+    if exclude_id is not None:
+        siblings = siblings.exclude(id=exclude_id)
+    ranks = siblings.values_list('rank', flat=True)
+
+    if index == 0:
+        before = None
+        after = ranks.first()
+    else:
+        neighbours = list(ranks[index - 1:index + 1])
+        if not neighbours:
+            # Past the end: append after the last sibling
+            before, after = ranks.last(), None
+        else:
+            before = neighbours[0]
+            after = neighbours[1] if len(neighbours) > 1 else None
+    return rank_between(before, after)
+
+
+def rank_at(queryset, index: int, exclude_id: Optional[int] = None) -> str:
+    """
+    Rank for an item placed at a zero-based index of an ordered sibling set.
+
+    Only the (at most two) neighbouring ranks are read. If the neighbours
+    collide (concurrent moves) or the key would exceed the column, the
+    siblings are rebalanced first.
+
+    Args:
+        queryset: Siblings, e.g. ``list_obj.cards.all()``
+        index: Target index among the siblings
+        exclude_id: Id of the item being moved, if it is already a sibling
+
+    Returns:
+        New rank key
+    """
+    index = max(int(index), 0)
+    try:
+        rank = _neighbour_rank(queryset, index, exclude_id)
+    except ValueError:
+        rank = None
+    if rank is None or len(rank) > RANK_MAX_LENGTH:
+        rebalance(queryset)
+        rank = _neighbour_rank(queryset, index, exclude_id)
+    return rank
+
+
+def append_rank(queryset) -> str:
+    """
+    Rank that places a new item after every existing sibling.
+
+    The siblings are rebalanced first if the key would exceed the column.
+    """
+    last = queryset.order_by('rank', 'id').values_list('rank', flat=True).last()
+    if last is None:
+        return rank_between(None, None)
+    rank = rank_after(last)
+    if len(rank) > RANK_MAX_LENGTH:
+        rebalance(queryset)
+        rank = rank_after(queryset.order_by('rank', 'id').values_list('rank', flat=True).last())
+    return rank
+
+
+def rebalance(queryset) -> int:
+    """
+    Rewrite the ranks of an ordered sibling set to evenly spaced short keys.
+
+    Args:
+        queryset: Siblings to rebalance (all cards of a list, all lists of a board)
+
+    Returns:
+        Number of rows rewritten
+    """
+    items = list(queryset.order_by('rank', 'id').only('id', 'rank'))
+    now = timezone.now()
+    for item, rank in zip(items, spread_ranks(len(items))):
+        item.rank = rank
+        item.updated_at = now
+    queryset.model.objects.bulk_update(items, ['rank', 'updated_at'], batch_size=500)
+    return len(items)
+
+
+def long_rank_groups(queryset, group_field: str):
+    """Ids of the parent groups (lists or boards) holding a rank over the rebalance threshold"""
+    return queryset.annotate(
+        rank_length=Length('rank')
+    ).filter(
+        rank_length__gt=settings.RANK_REBALANCE_LENGTH
+    ).values_list(group_field, flat=True).distinct()
@@ -0,0 +1,105 @@
+"""
+Event broadcasting over the Channels layer.
+
+Viewsets call ``broadcast_board_event`` after a write; the event is handed to
+the channel layer once the surrounding transaction commits, so clients never
+see changes that were rolled back. Every consumer subscribed to the group
+(``BoardConsumer`` for a board, ``NotificationConsumer`` or the SSE stream
+for a user) forwards it to its client.
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SSE_KEEPALIVE_SECONDS = 25
+SSE_RETRY_MS = 3000
+
+
+def board_group_name(board_id: int) -> str:
+    """Channel layer group of the sockets viewing a board"""
+    return f'board_{board_id}'
+
+
+def user_group_name(user_id: int) -> str:
+    """Channel layer group of the notification connections of a user"""
+    return f'user_{user_id}'
+
+
+def group_message(event: str, data: dict) -> dict:
+    """Channel layer message carrying an event for ``group_event`` handlers"""
+    # Plain JSON types only, so every layer backend can encode the message
+    return {
+        'type': 'group.event',
+        'event': event,
+        'data': json.loads(json.dumps(data, cls=DjangoJSONEncoder)),
+    }
+
+
+def send_group_event(group: str, event: str, data: dict):
+    """Send an event to a group right away, logging (not raising) layer failures"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(group, group_message(event, data))
+    except Exception as e:
+        # The write succeeded; clients still catch up through the REST endpoints
+        logger.warning(f"Failed to send {event} to {group}: {str(e)}")
+
+
+def broadcast_board_event(board_id: int, event: str, data: dict):
+    """
+    Send an event to everyone viewing a board once the transaction commits.
+
+    Args:
+        board_id: Board the event belongs to
+        event: Event name, e.g. ``card.moved``
+        data: Serialized object (or ``{'id': ...}`` for deletions)
+    """
+    transaction.on_commit(lambda: send_group_event(board_group_name(board_id), event, data))
+
+
+def broadcast_user_event(user_id: int, event: str, data: dict):
+    """Send an event to every open notification connection of a user once the transaction commits"""
+    transaction.on_commit(lambda: send_group_event(user_group_name(user_id), event, data))
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Encode one server-sent event"""
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+async def stream_group_events(group: str, initial=None):
+    """
+    Yield the events of a channel layer group as server-sent events.
+
+    Used where WebSockets are unavailable; a comment line is sent when the
+    group is quiet so proxies keep the response open.
+
+    Args:
+        group: Channel layer group to subscribe to
+        initial: Optional ``(event, data)`` sent before any group event
+    """
+    channel_layer = get_channel_layer()
+    channel = await channel_layer.new_channel()
+    await channel_layer.group_add(group, channel)
+    try:
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        if initial is not None:
+            yield format_sse(*initial)
+        while True:
+            try:
+                message = await asyncio.wait_for(channel_layer.receive(channel), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_sse(message['event'], message['data'])
+    finally:
+        await channel_layer.group_discard(group, channel)
@@ -0,0 +1,186 @@
+"""
+Server-side due-date reminders.
+
+``ReminderScheduler`` keeps the upcoming reminder moments of open cards in a
+min-heap keyed by fire time: a ``due_soon`` reminder ``REMINDER_DUE_SOON_HOURS``
+before the deadline and an ``overdue`` reminder at the deadline. Only
+deadlines inside a sliding horizon are loaded, and the horizon is extended
+as time passes. Card saves are picked up incrementally by polling
+``updated_at`` past the last seen value, so the worker needs no broker.
+``updated_at`` is set before its transaction commits, so each poll re-reads
+the last ``REMINDER_SCAN_OVERLAP_SECONDS``; cards seen twice are no-ops or
+dropped by the sent-reminder check in ``emit``.
+
+Heap entries are never removed in place: when a card's deadline changes or
+the card is completed, its current deadline is replaced in ``deadlines`` and
+older entries are discarded when they surface. Reminders that come due
+together are sent in one ``notification_batch`` on the scheduler's
+``NotificationDispatcher``.
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Card, Notification
+from .notifications import NotificationDispatcher, notification_batch
+
+DUE_SOON = 'due_soon'
+OVERDUE = 'overdue'
+
+
+def fire_time(due_date: datetime, kind: str) -> datetime:
+    """Moment at which a reminder of a deadline fires"""
+    if kind == DUE_SOON:
+        return due_date - timedelta(hours=settings.REMINDER_DUE_SOON_HOURS)
+    return due_date
+
+
+class ReminderScheduler:
+    """In-memory heap of upcoming due-date reminders fed from the cards table"""
+
+    def __init__(self):
+        self.heap: List[Tuple[datetime, int, str, datetime]] = []
+        # card id -> (deadline currently scheduled, reminder kinds already sent for it)
+        self.deadlines: Dict[int, Tuple[datetime, Set[str]]] = {}
+        self.loaded_from: Optional[datetime] = None
+        self.loaded_until: Optional[datetime] = None
+        self.cursor: Optional[datetime] = None
+        self.dispatcher = NotificationDispatcher()
+
+    def _reminder_cards(self):
+        return Card.objects.filter(
+            completed=False, due_date__isnull=False, owner__profile__due_date_reminders=True
+        )
+
+    def schedule(self, card_id: int, due_date: Optional[datetime], completed: bool = False):
+        """Add, move or cancel the reminders of a card"""
+        current = self.deadlines.get(card_id)
+        if (completed or due_date is None or self.loaded_until is None
+                or not self.loaded_from <= due_date <= self.loaded_until):
+            # Cancelled, long past, or out of the horizon until a later load picks it up
+            self.deadlines.pop(card_id, None)
+            return
+        if current is not None and current[0] == due_date:
+            return
+        self.deadlines[card_id] = (due_date, set())
+        for kind in (DUE_SOON, OVERDUE):
+            heapq.heappush(self.heap, (fire_time(due_date, kind), card_id, kind, due_date))
+
+    def load(self, now: datetime) -> int:
+        """
+        Extend the horizon to ``now + REMINDER_HORIZON_HOURS`` and load its deadlines.
+
+        The first load also reaches back ``REMINDER_CATCHUP_HOURS`` so reminders
+        missed while the worker was down are still sent.
+
+        Returns:
+            Number of deadlines loaded
+        """
+        horizon = now + timedelta(hours=settings.REMINDER_HORIZON_HOURS)
+        if self.loaded_until is not None and horizon <= self.loaded_until:
+            return 0
+
+        cards = self._reminder_cards().filter(due_date__lte=horizon)
+        if self.loaded_until is None:
+            self.cursor = now
+            self.loaded_from = now - timedelta(hours=settings.REMINDER_CATCHUP_HOURS)
+            cards = cards.filter(due_date__gte=self.loaded_from)
+        else:
+            cards = cards.filter(due_date__gt=self.loaded_until)
+
+        self.loaded_until = horizon
+        rows = list(cards.values_list('id', 'due_date'))
+        for card_id, due_date in rows:
+            self.schedule(card_id, due_date)
+        return len(rows)
+
+    def refresh(self) -> int:
+        """
+        Apply cards saved since the previous refresh.
+
+        Returns:
+            Number of changed cards seen
+        """
+        since = self.cursor - timedelta(seconds=settings.REMINDER_SCAN_OVERLAP_SECONDS)
+        rows = list(
+            Card.objects.filter(updated_at__gte=since).values_list(
+                'id', 'due_date', 'completed', 'updated_at', 'owner__profile__due_date_reminders'
+            )
+        )
+        for card_id, due_date, completed, updated_at, reminders_enabled in rows:
+            self.schedule(card_id, due_date, completed or not reminders_enabled)
+            self.cursor = max(self.cursor, updated_at)
+        return len(rows)
+
+    def pop_due(self, now: datetime) -> List[Tuple[int, str, datetime]]:
+        """Remove and return the reminders whose time has come"""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, card_id, kind, due_date = heapq.heappop(self.heap)
+            current = self.deadlines.get(card_id)
+            if current is None or current[0] != due_date or kind in current[1]:
+                continue  # stale entry: deadline moved, card completed or already sent
+            current[1].add(kind)
+            if kind == OVERDUE:
+                del self.deadlines[card_id]
+            due.append((card_id, kind, due_date))
+        return due
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Fire time of the earliest pending reminder"""
+        return self.heap[0][0] if self.heap else None
+
+    def emit(self, reminders: List[Tuple[int, str, datetime]]) -> int:
+        """
+        Write the notifications of due reminders in bulk.
+
+        Cards that were completed or rescheduled since they were loaded, and
+        reminders already sent for the same deadline (e.g. before a restart),
+        are skipped.
+
+        Returns:
+            Number of notifications written
+        """
+        if not reminders:
+            return 0
+        card_ids = {card_id for card_id, _, _ in reminders}
+        cards = {
+            card.id: card
+            for card in self._reminder_cards().filter(id__in=card_ids).only('id', 'title', 'due_date', 'owner_id')
+        }
+        last_sent = {
+            (row['card_id'], row['type']): row['last_sent']
+            for row in Notification.objects.filter(
+                card_id__in=card_ids, type__in=[DUE_SOON, OVERDUE]
+            ).values('card_id', 'type').annotate(last_sent=Max('created_at'))
+        }
+
+        written = self.dispatcher.stats['written']
+        with notification_batch(self.dispatcher) as dispatcher:
+            for card_id, kind, due_date in reminders:
+                card = cards.get(card_id)
+                if card is None or card.due_date != due_date:
+                    continue
+                sent_at = last_sent.get((card_id, kind))
+                if sent_at is not None and sent_at >= fire_time(due_date, kind):
+                    continue
+                if kind == DUE_SOON:
+                    title, message = 'Task Due Soon', f'"{card.title}" is due {timezone.localtime(due_date):%b %d, %H:%M}'
+                else:
+                    title, message = 'Task Overdue', f'"{card.title}" is overdue!'
+                dispatcher.add(user_id=card.owner_id, type=kind, title=title, message=message, card_id=card_id)
+        return self.dispatcher.stats['written'] - written
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """Pick up card changes, extend the horizon and send everything that is due"""
+        now = now or timezone.now()
+        if self.loaded_until is None:
+            self.load(now)
+        else:
+            self.refresh()
+            self.load(now)
+        return self.emit(self.pop_due(now))
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import BoardConsumer, NotificationConsumer
+
+websocket_urlpatterns = [
+    path('ws/boards/<int:board_id>/', BoardConsumer.as_asgi()),
+    path('ws/notifications/', NotificationConsumer.as_asgi()),
+]
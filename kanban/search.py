@@ -0,0 +1,200 @@
+"""
+Card full-text search backed by an in-app inverted index.
+
+Every card is tokenized into ``CardSearchTerm`` rows (one per distinct term,
+weighted by the field it came from) whenever its title, description or
+labels change. A query is answered by a single grouped lookup on the
+``(user, term)`` index instead of ``icontains`` scans over cards, descriptions
+and the label join. All query words must match; the last word matches as a
+prefix so results update while the user is typing.
+"""
+import re
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db.models import Case, When, Value, IntegerField, Max, Q, Sum
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Card, CardSearchTerm, Label
+
+TITLE_WEIGHT = 3
+LABEL_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+TERM_MAX_LENGTH = 50
+QUERY_MAX_TERMS = 8
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+INDEXED_FIELDS = {'title', 'description'}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms in order of appearance
+    """
+    if not text:
+        return []
+    return [token[:TERM_MAX_LENGTH] for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+def build_terms(title: str, description: str, label_names: Iterable[str]) -> Dict[str, int]:
+    """
+    Build the weighted term map of a card.
+
+    Args:
+        title: Card title
+        description: Card description
+        label_names: Names of the card's labels
+
+    Returns:
+        Mapping of term to summed field weight
+    """
+    terms: Dict[str, int] = {}
+    fields = [(title, TITLE_WEIGHT), (description, DESCRIPTION_WEIGHT)]
+    fields += [(name, LABEL_WEIGHT) for name in label_names]
+    for text, weight in fields:
+        for term in set(tokenize(text)):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+def index_card(card: Card):
+    """Rebuild the index entries of a single card"""
+    owner_id = card.owner_id
+    label_names = card.labels.values_list('name', flat=True)
+    terms = build_terms(card.title, card.description, label_names)
+
+    CardSearchTerm.objects.filter(card=card).delete()
+    CardSearchTerm.objects.bulk_create([
+        CardSearchTerm(user_id=owner_id, card=card, term=term, weight=weight)
+        for term, weight in terms.items()
+    ])
+
+
+def index_cards(card_ids: Iterable[int]):
+    """Rebuild the index entries of several cards"""
+    cards = Card.objects.filter(id__in=list(card_ids))
+    for card in cards:
+        index_card(card)
+
+
+def _term_filter(token: str, prefix: bool) -> Q:
+    if prefix:
+        # Range scan on the (user, term) index; works with any collation
+        return Q(term__gte=token, term__lt=token + PREFIX_UPPER_BOUND)
+    return Q(term=token)
+
+
+def rank_matches(user, query: str, card_ids=None) -> Dict[int, int]:
+    """
+    Find the cards of a user matching every word of a query.
+
+    Args:
+        user: Board owner whose cards are searched
+        query: Raw search text
+        card_ids: Optional card id queryset the matches must come from, applied
+            before ``SEARCH_RESULT_LIMIT`` so filtered searches keep their matches
+
+    Returns:
+        Mapping of card id to relevance score, best matches first
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))[:QUERY_MAX_TERMS]
+    if not tokens:
+        return {}
+
+    conditions = [_term_filter(token, index == len(tokens) - 1) for index, token in enumerate(tokens)]
+    any_condition = Q()
+    for condition in conditions:
+        any_condition |= condition
+
+    # One row per card: total weight plus a hit flag per query word
+    hits = {
+        f'hit_{index}': Max(Case(When(condition, then=Value(1)), default=Value(0), output_field=IntegerField()))
+        for index, condition in enumerate(conditions)
+    }
+    matches = CardSearchTerm.objects.filter(any_condition, user=user)
+    if card_ids is not None:
+        matches = matches.filter(card_id__in=card_ids)
+    matches = matches.values('card_id').annotate(
+        score=Sum('weight'), **hits
+    ).filter(
+        **{name: 1 for name in hits}
+    ).order_by('-score')[:settings.SEARCH_RESULT_LIMIT]
+
+    return {row['card_id']: row['score'] for row in matches}
+
+
+def search_cards(queryset, user, query: str):
+    """
+    Restrict a card queryset to the matches of a text query.
+
+    Args:
+        queryset: Card queryset to filter (already scoped to the user)
+        user: Board owner whose cards are searched
+        query: Raw search text
+
+    Returns:
+        Filtered queryset annotated with ``search_rank`` (higher is better)
+    """
+    scores = rank_matches(user, query, queryset.order_by().values('id'))
+    if not scores:
+        return queryset.none().annotate(search_rank=Value(0, output_field=IntegerField()))
+    return queryset.filter(id__in=scores.keys()).annotate(
+        search_rank=Case(
+            *[When(id=card_id, then=Value(score)) for card_id, score in scores.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+@receiver(post_save, sender=Card)
+def index_card_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the index in sync with card text"""
+    if raw:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    index_card(instance)
+
+
+@receiver(m2m_changed, sender=Card.labels.through)
+def index_card_on_labels_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Re-index cards whose labels were added, removed or cleared"""
+    if reverse and action == 'pre_clear':
+        # instance is a Label; remember its cards before the rows disappear
+        instance._search_card_ids = list(instance.cards.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        card_ids = pk_set if pk_set is not None else getattr(instance, '_search_card_ids', [])
+        index_cards(card_ids)
+    else:
+        index_card(instance)
+
+
+@receiver(post_save, sender=Label)
+def index_cards_on_label_saved(sender, instance, created, raw=False, **kwargs):
+    """A renamed label changes the terms of every card carrying it"""
+    if created or raw:
+        return
+    index_cards(instance.cards.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Label)
+def collect_cards_on_label_delete(sender, instance, **kwargs):
+    instance._search_card_ids = list(instance.cards.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Label)
+def index_cards_on_label_deleted(sender, instance, **kwargs):
+    index_cards(getattr(instance, '_search_card_ids', []))
@@ -1,20 +1,111 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db import models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Prefetch, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
 from .models import (
     Board, List, Card, Comment, UserProfile, Label, CardActivity, Goal, 
-    Notification, TaskChecklist, PomodoroSession, Team, TeamMembership
+    Notification, TaskChecklist, PomodoroSession, Team, TeamMembership, BackgroundJob
 )
+from .notifications import notify_assignment
+from .snapshots import bump_board_version
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+def _count_subquery(model, parent_field):
+    """Correlated ``COUNT(*)`` of the rows of ``model`` pointing at the outer row"""
+    counts = model.objects.filter(
+        **{parent_field: OuterRef('pk')}
+    ).order_by().values(parent_field).annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def _split_param(context, name):
+    request = context.get('request')
+    raw = request.query_params.get(name, '') if request is not None else ''
+    return {item.strip() for item in raw.split(',') if item.strip()}
+
+
+def requested_fields(context):
+    """
+    Top-level fields a caller picked with ``?fields=a,b``.
+    
+    Args:
+        context: Serializer context; an explicit ``fields`` entry wins over the request
+    
+    Returns:
+        Set of field names, or None when every field is wanted
+    """
+    if 'fields' in context:
+        return set(context['fields']) if context['fields'] else None
+    return _split_param(context, 'fields') or None
+
+
+def requested_expansions(context, allowed=None):
+    """
+    Relations a caller asked to expand with ``?expand=a,b``.
+    
+    Args:
+        context: Serializer context; an explicit ``expand`` entry wins over the request
+        allowed: Names of the relations that may be expanded (default: any)
+    
+    Returns:
+        Set of requested names that are allowed
+    """
+    if 'expand' in context:
+        requested = set(context['expand'])
+    else:
+        requested = _split_param(context, 'expand')
+    return requested if allowed is None else requested & set(allowed)
+
+
+def eager_loading_options(context):
+    """Keyword arguments for ``setup_eager_loading`` matching the requested shape"""
+    return {'expand': requested_expansions(context), 'fields': requested_fields(context)}
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets and opt-in relations for model serializers.
+    
+    ``?fields=a,b`` limits the top-level representation to the named fields.
+    Relations listed in ``Meta.expandable_fields`` are heavy and left out
+    unless named in ``?expand=``; expansion applies at every nesting level,
+    so ``?expand=comments`` also expands the comments of nested cards.
+    ``setup_eager_loading`` only loads what ``includes`` reports as wanted.
+    """
+    
+    @classmethod
+    def includes(cls, name, expand=(), fields=None):
+        """Whether a field is part of the representation for a request shape"""
+        if name in getattr(cls.Meta, 'expandable_fields', ()) and name not in expand:
+            return False
+        return fields is None or name in fields
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = requested_expansions(self.context)
+        # ?fields= only shapes the top level; nested serializers keep their fields
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        selected = requested_fields(self.context) if parent is None else None
+        for name in list(fields):
+            if fields[name].write_only:
+                continue
+            if not self.includes(name, expand, selected):
+                del fields[name]
+        return fields
+
+
+class UserProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for UserProfile model"""
     class Meta:
         model = UserProfile
         fields = ['avatar', 'display_name', 'bio']
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for User model with profile"""
     profile = UserProfileSerializer(read_only=True)
     full_name = serializers.SerializerMethodField()
@@ -82,7 +173,7 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 
-class LabelSerializer(serializers.ModelSerializer):
+class LabelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Label model"""
     class Meta:
         model = Label
@@ -90,7 +181,7 @@ class LabelSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
-class CardActivitySerializer(serializers.ModelSerializer):
+class CardActivitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for CardActivity model"""
     user = UserSerializer(read_only=True)
     
@@ -99,7 +190,7 @@ class CardActivitySerializer(serializers.ModelSerializer):
         fields = ['id', 'activity_type', 'description', 'user', 'created_at']
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Comment model"""
     author = UserSerializer(read_only=True)
     
@@ -109,7 +200,7 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 
-class CardSerializer(serializers.ModelSerializer):
+class CardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Card model"""
     assignee = UserSerializer(read_only=True)
     assignee_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
@@ -120,6 +211,7 @@ class CardSerializer(serializers.ModelSerializer):
         required=False
     )
     comments = CommentSerializer(many=True, read_only=True)
+    comments_count = serializers.SerializerMethodField()
     activities = CardActivitySerializer(many=True, read_only=True)
     is_overdue = serializers.ReadOnlyField()
     is_due_soon = serializers.ReadOnlyField()
@@ -127,12 +219,38 @@ class CardSerializer(serializers.ModelSerializer):
     class Meta:
         model = Card
         fields = [
-            'id', 'title', 'description', 'assignee', 'assignee_id', 
-            'labels', 'label_ids', 'priority', 'position', 'due_date', 
+            'id', 'title', 'description', 'list', 'assignee', 'assignee_id', 
+            'labels', 'label_ids', 'priority', 'rank', 'due_date', 
             'estimated_hours', 'created_at', 'updated_at', 'completed', 
-            'completed_at', 'comments', 'activities', 'is_overdue', 'is_due_soon'
+            'completed_at', 'comments', 'comments_count', 'activities', 'is_overdue', 'is_due_soon'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'completed_at']
+        read_only_fields = ['list', 'rank', 'created_at', 'updated_at', 'completed_at']
+        expandable_fields = ['comments', 'activities']
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """Load the requested assignee, labels, comments and activities in a fixed number of queries"""
+        if cls.includes('assignee', expand, fields):
+            queryset = queryset.select_related('assignee__profile')
+        if cls.includes('labels', expand, fields):
+            queryset = queryset.prefetch_related('labels')
+        if cls.includes('comments', expand, fields):
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=Comment.objects.select_related('author__profile'))
+            )
+        elif cls.includes('comments_count', expand, fields):
+            queryset = queryset.annotate(comments_total=_count_subquery(Comment, 'card'))
+        if cls.includes('activities', expand, fields):
+            queryset = queryset.prefetch_related(
+                Prefetch('activities', queryset=CardActivity.objects.select_related('user__profile'))
+            )
+        return queryset
+    
+    def get_comments_count(self, obj):
+        # Annotated by setup_eager_loading; otherwise served from the prefetch cache or counted
+        if hasattr(obj, 'comments_total'):
+            return obj.comments_total
+        return obj.comments.count()
     
     def create(self, validated_data):
         assignee_id = validated_data.pop('assignee_id', None)
@@ -145,6 +263,7 @@ class CardSerializer(serializers.ModelSerializer):
                 assignee = User.objects.get(id=assignee_id)
                 card.assignee = assignee
                 card.save()
+                notify_assignment(card, self.context['request'].user)
             except User.DoesNotExist:
                 pass
         
@@ -160,6 +279,7 @@ class CardSerializer(serializers.ModelSerializer):
             description=f"Created card '{card.title}'"
         )
         
+        bump_board_version(card.board_id)
         return card
     
     def update(self, instance, validated_data):
@@ -185,7 +305,9 @@ class CardSerializer(serializers.ModelSerializer):
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            # Saved together with the goal counter adjustment (kanban.goals)
+            instance.save()
         
         # Create activities for significant changes
         user = self.context['request'].user
@@ -206,6 +328,7 @@ class CardSerializer(serializers.ModelSerializer):
                     activity_type='assigned',
                     description=f"Assigned to {instance.assignee.profile.name}"
                 )
+                notify_assignment(instance, user)
             else:
                 CardActivity.objects.create(
                     card=instance,
@@ -222,24 +345,45 @@ class CardSerializer(serializers.ModelSerializer):
                 description=f"Marked card as completed"
             )
         
+        bump_board_version(instance.board_id)
         return instance
 
 
-class ListSerializer(serializers.ModelSerializer):
+class ListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for List model"""
     cards = CardSerializer(many=True, read_only=True)
     cards_count = serializers.SerializerMethodField()
     
     class Meta:
         model = List
-        fields = ['id', 'title', 'position', 'created_at', 'updated_at', 'cards', 'cards_count']
-        read_only_fields = ['created_at', 'updated_at']
+        fields = ['id', 'title', 'rank', 'created_at', 'updated_at', 'cards', 'cards_count']
+        read_only_fields = ['rank', 'created_at', 'updated_at']
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """Prefetch the cards of each list together with their requested relations"""
+        if cls.includes('cards', expand, fields):
+            cards = CardSerializer.setup_eager_loading(Card.objects.all(), expand)
+            return queryset.prefetch_related(Prefetch('cards', queryset=cards))
+        if cls.includes('cards_count', expand, fields):
+            return queryset.annotate(cards_total=_count_subquery(Card, 'list'))
+        return queryset
     
     def get_cards_count(self, obj):
+        # Served from the annotation or the prefetch cache when the list was eager loaded
+        if hasattr(obj, 'cards_total'):
+            return obj.cards_total
         return obj.cards.count()
 
 
-class BoardSerializer(serializers.ModelSerializer):
+class ListSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Serializer for list metadata without nested cards"""
+    class Meta:
+        model = List
+        fields = ['id', 'title', 'rank', 'created_at', 'updated_at']
+
+
+class BoardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Board model"""
     owner = UserSerializer(read_only=True)
     lists = ListSerializer(many=True, read_only=True)
@@ -248,18 +392,32 @@ class BoardSerializer(serializers.ModelSerializer):
         model = Board
         fields = [
             'id', 'title', 'description', 'owner', 'created_at', 
-            'updated_at', 'is_active', 'is_template', 'lists'
+            'updated_at', 'is_active', 'is_template', 'version', 'lists'
         ]
-        read_only_fields = ['created_at', 'updated_at']
-
-
-class GoalSerializer(serializers.ModelSerializer):
+        read_only_fields = ['created_at', 'updated_at', 'version']
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """
+        Load the board tree in a constant number of queries:
+        board + owner, lists, cards + assignees + comment counts, labels,
+        and comments and activities when expanded.
+        """
+        if cls.includes('owner', expand, fields):
+            queryset = queryset.select_related('owner__profile')
+        if cls.includes('lists', expand, fields):
+            lists = ListSerializer.setup_eager_loading(List.objects.all(), expand)
+            queryset = queryset.prefetch_related(Prefetch('lists', queryset=lists))
+        return queryset
+
+
+class GoalSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Goal model"""
     owner = UserSerializer(read_only=True)
     progress_percentage = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
-    cards_count = serializers.SerializerMethodField()
-    completed_cards_count = serializers.SerializerMethodField()
+    cards_count = serializers.IntegerField(source='cards_total', read_only=True)
+    completed_cards_count = serializers.IntegerField(source='cards_completed', read_only=True)
     cards = CardSerializer(many=True, read_only=True)
     
     class Meta:
@@ -271,21 +429,26 @@ class GoalSerializer(serializers.ModelSerializer):
             'completed_cards_count', 'cards'
         ]
         read_only_fields = ['created_at', 'updated_at', 'completed_at']
+        expandable_fields = ['cards']
     
-    def get_cards_count(self, obj):
-        return obj.cards.count()
-    
-    def get_completed_cards_count(self, obj):
-        return obj.cards.filter(completed=True).count()
-
-
-class GoalListSerializer(serializers.ModelSerializer):
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """Load the owner and, when expanded, the cards; progress comes from the goal row"""
+        if cls.includes('owner', expand, fields):
+            queryset = queryset.select_related('owner__profile')
+        if cls.includes('cards', expand, fields):
+            cards = CardSerializer.setup_eager_loading(Card.objects.all(), expand)
+            queryset = queryset.prefetch_related(Prefetch('cards', queryset=cards))
+        return queryset
+
+
+class GoalListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for goal listing"""
     owner = UserSerializer(read_only=True)
     progress_percentage = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
-    cards_count = serializers.SerializerMethodField()
-    completed_cards_count = serializers.SerializerMethodField()
+    cards_count = serializers.IntegerField(source='cards_total', read_only=True)
+    completed_cards_count = serializers.IntegerField(source='cards_completed', read_only=True)
     
     class Meta:
         model = Goal
@@ -296,14 +459,15 @@ class GoalListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'completed_at']
     
-    def get_cards_count(self, obj):
-        return obj.cards.count()
-    
-    def get_completed_cards_count(self, obj):
-        return obj.cards.filter(completed=True).count()
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """Each goal is one row: only the owner needs loading"""
+        if cls.includes('owner', expand, fields):
+            queryset = queryset.select_related('owner__profile')
+        return queryset
 
 
-class TaskChecklistSerializer(serializers.ModelSerializer):
+class TaskChecklistSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for TaskChecklist model"""
     class Meta:
         model = TaskChecklist
@@ -314,7 +478,7 @@ class TaskChecklistSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'completed_at']
 
 
-class PomodoroSessionSerializer(serializers.ModelSerializer):
+class PomodoroSessionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for PomodoroSession model"""
     card = CardSerializer(read_only=True)
     
@@ -325,9 +489,17 @@ class PomodoroSessionSerializer(serializers.ModelSerializer):
             'started_at', 'completed_at', 'is_completed', 'notes'
         ]
         read_only_fields = ['started_at', 'completed_at']
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """Load the requested card of each session with its relations"""
+        if cls.includes('card', expand, fields):
+            cards = CardSerializer.setup_eager_loading(Card.objects.all(), expand)
+            queryset = queryset.prefetch_related(Prefetch('card', queryset=cards))
+        return queryset
 
 
-class TeamMembershipSerializer(serializers.ModelSerializer):
+class TeamMembershipSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for TeamMembership model"""
     user = UserSerializer(read_only=True)
     invited_by = UserSerializer(read_only=True)
@@ -340,7 +512,7 @@ class TeamMembershipSerializer(serializers.ModelSerializer):
         read_only_fields = ['joined_at']
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Team model"""
     owner = UserSerializer(read_only=True)
     members = TeamMembershipSerializer(source='teammembership_set', many=True, read_only=True)
@@ -358,25 +530,120 @@ class TeamSerializer(serializers.ModelSerializer):
         return obj.members.count()
 
 
-class NotificationSerializer(serializers.ModelSerializer):
-    """Serializer for Notification model"""
-    card = CardSerializer(read_only=True)
-    goal = GoalSerializer(read_only=True)
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for Notification model.
+    
+    The card and goal are summarized by id and title; ``?expand=card,goal``
+    embeds the full objects instead.
+    """
+    EXPANDABLE = ('card', 'goal')
+    
+    card = serializers.SerializerMethodField()
+    goal = serializers.SerializerMethodField()
+    link = serializers.SerializerMethodField()
     
     class Meta:
         model = Notification
         fields = [
-            'id', 'type', 'title', 'message', 'card', 'goal', 
+            'id', 'type', 'title', 'message', 'card', 'goal', 'link',
             'is_read', 'created_at'
         ]
         read_only_fields = ['created_at']
+    
+    @staticmethod
+    def prefetch_lookups(expand=()):
+        """Lookups that load the cards and goals of a page in one query each"""
+        if 'card' in expand:
+            cards = CardSerializer.setup_eager_loading(Card.objects.all(), expand)
+        else:
+            cards = Card.objects.only('id', 'title', 'board')
+        if 'goal' in expand:
+            goals = Goal.objects.select_related('owner__profile')
+            if GoalSerializer.includes('cards', expand):
+                goal_cards = CardSerializer.setup_eager_loading(Card.objects.all(), expand)
+                goals = goals.prefetch_related(Prefetch('cards', queryset=goal_cards))
+        else:
+            goals = Goal.objects.only('id', 'title')
+        return [Prefetch('card', queryset=cards), Prefetch('goal', queryset=goals)]
+    
+    def get_expand(self):
+        return requested_expansions(self.context, self.EXPANDABLE)
+    
+    def _nested_context(self):
+        # The embedded object keeps every field; ?fields= applies to the notification
+        return {**self.context, 'fields': None}
+    
+    def get_card(self, obj):
+        if obj.card_id is None:
+            return None
+        if 'card' in self.get_expand():
+            return CardSerializer(obj.card, context=self._nested_context()).data
+        return {'id': obj.card.id, 'title': obj.card.title, 'board_id': obj.card.board_id}
+    
+    def get_goal(self, obj):
+        if obj.goal_id is None:
+            return None
+        if 'goal' in self.get_expand():
+            return GoalSerializer(obj.goal, context=self._nested_context()).data
+        return {'id': obj.goal.id, 'title': obj.goal.title}
+    
+    def get_link(self, obj):
+        """Frontend route that opens the notification's subject"""
+        if obj.card_id is not None:
+            return f'/board/{obj.card.board_id}?card={obj.card_id}'
+        if obj.goal_id is not None:
+            return '/goals'
+        return None
 
 
-class BoardListSerializer(serializers.ModelSerializer):
+class BackgroundJobSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Serializer for BackgroundJob progress"""
+    progress_percentage = serializers.ReadOnlyField()
+    rows_per_second = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'kind', 'status', 'processed', 'total', 'progress_percentage', 'rows_per_second',
+            'result', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class BoardListBatchSerializer(serializers.ListSerializer):
+    """Fetches the recent activity of every board on a page in one query"""
+    
+    def to_representation(self, data):
+        boards = list(data.all() if isinstance(data, models.Manager) else data)
+        if not BoardListSerializer.includes('recent_activity', fields=requested_fields(self.context)):
+            return super().to_representation(boards)
+        activities = CardActivity.objects.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('board_id')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )
+        ).filter(
+            board__in=[board.id for board in boards],
+            row_number__lte=BoardListSerializer.RECENT_ACTIVITY_LIMIT,
+        ).select_related('user__profile').order_by('board_id', 'row_number')
+        
+        recent = {board.id: [] for board in boards}
+        for activity in activities:
+            recent[activity.board_id].append(activity)
+        for board in boards:
+            board.recent_activities = recent[board.id]
+        return super().to_representation(boards)
+
+
+class BoardListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for board listing"""
+    RECENT_ACTIVITY_LIMIT = 3
+    
     owner = UserSerializer(read_only=True)
-    lists_count = serializers.SerializerMethodField()
-    cards_count = serializers.SerializerMethodField()
+    lists_count = serializers.IntegerField(read_only=True)
+    cards_count = serializers.IntegerField(read_only=True)
     recent_activity = serializers.SerializerMethodField()
     
     class Meta:
@@ -386,15 +653,24 @@ class BoardListSerializer(serializers.ModelSerializer):
             'updated_at', 'is_active', 'lists_count', 'cards_count', 'recent_activity'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        list_serializer_class = BoardListBatchSerializer
     
-    def get_lists_count(self, obj):
-        return obj.lists.count()
-    
-    def get_cards_count(self, obj):
-        return Card.objects.filter(list__board=obj).count()
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=(), fields=None):
+        """Load owners and annotate list and card counts in the page query"""
+        if cls.includes('owner', expand, fields):
+            queryset = queryset.select_related('owner__profile')
+        if cls.includes('lists_count', expand, fields):
+            queryset = queryset.annotate(lists_count=_count_subquery(List, 'board'))
+        if cls.includes('cards_count', expand, fields):
+            queryset = queryset.annotate(cards_count=_count_subquery(Card, 'board'))
+        return queryset
     
     def get_recent_activity(self, obj):
-        recent_activities = CardActivity.objects.filter(
-            card__list__board=obj
-        ).order_by('-created_at')[:3]
+        # Filled in for the whole page by BoardListBatchSerializer
+        recent_activities = getattr(obj, 'recent_activities', None)
+        if recent_activities is None:
+            recent_activities = CardActivity.objects.filter(
+                board=obj
+            ).select_related('user__profile').order_by('-created_at')[:self.RECENT_ACTIVITY_LIMIT]
         return CardActivitySerializer(recent_activities, many=True).data
\ No newline at end of file
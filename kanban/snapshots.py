@@ -0,0 +1,64 @@
+"""
+Versioned board snapshot cache.
+
+Each board carries a ``version`` counter that is bumped on every write to
+its tree (lists, cards, comments, labels). The fully serialized board is
+cached under a key that includes this version, so a write never has to
+delete anything: the next read simply misses and renders a fresh snapshot,
+and stale versions expire on their own.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import Board, Card, CardActivity, Comment
+from .caching import get_or_compute
+from .utils import calculate_cache_key
+
+
+def get_snapshot_key(board_id: int, version: int, variant: str = '') -> str:
+    """Cache key of the serialized snapshot of a board at a given version"""
+    if variant:
+        digest = hashlib.md5(variant.encode()).hexdigest()[:16]
+        return calculate_cache_key('board', board_id, 'snapshot', version, digest)
+    return calculate_cache_key('board', board_id, 'snapshot', version)
+
+
+def get_board_snapshot(board: Board, build, variant: str = ''):
+    """
+    Return the serialized tree of a board, rendering it only on a cache miss.
+
+    Args:
+        board: Board instance (its ``version`` must be current)
+        build: Callable returning the serialized board data
+        variant: Identifies a non-default response shape (``?fields=``/``?expand=``)
+
+    Returns:
+        Serialized board data
+    """
+    return get_or_compute(
+        get_snapshot_key(board.id, board.version, variant),
+        lambda: dict(build()),
+        timeout=settings.BOARD_SNAPSHOT_TIMEOUT,
+    )
+
+
+def bump_board_version(board_id: int):
+    """Invalidate the snapshot of a board after a write to its tree"""
+    Board.objects.filter(id=board_id).update(version=F('version') + 1)
+
+
+def bump_user_boards_version(user):
+    """Invalidate the snapshots of every board owned by a user"""
+    Board.objects.filter(owner=user).update(version=F('version') + 1)
+
+
+def bump_member_boards_version(user):
+    """Invalidate the snapshots of every board that shows a user's name"""
+    Board.objects.filter(
+        Q(owner=user)
+        | Q(id__in=Card.objects.filter(assignee=user).values('board_id'))
+        | Q(id__in=Comment.objects.filter(author=user).values('card__board_id'))
+        | Q(id__in=CardActivity.objects.filter(user=user).values('board_id'))
+    ).update(version=F('version') + 1)
@@ -0,0 +1,170 @@
+"""
+Daily user statistics rollups.
+
+``UserStatistics`` rows are never read and written back: increments are
+applied with ``UPDATE ... SET counter = counter + n`` after an
+``INSERT ... ON CONFLICT DO NOTHING`` (``bulk_create(ignore_conflicts=True)``)
+has made sure the ``(user, date)`` row exists, so concurrent requests cannot
+lose each other's updates and no row lock is held beyond the UPDATE.
+
+Increments are fed by events: card activities (``created``, ``completed``,
+``moved``) and Pomodoro sessions becoming completed (on ``save()``, or by
+``record_session_completed`` after a conditional ``UPDATE``). Inside a
+``statistics_batch`` block they are buffered per ``(user, date)`` and
+written in one flush; otherwise each event is written at once.
+"""
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import CardActivity, PomodoroSession, UserStatistics
+
+COUNTERS = ('cards_created', 'cards_completed', 'cards_moved', 'pomodoro_sessions', 'hours_worked')
+
+# Card activity type -> counter it increments
+ACTIVITY_COUNTERS = {
+    'created': 'cards_created',
+    'completed': 'cards_completed',
+    'moved': 'cards_moved',
+}
+
+_local = threading.local()
+
+
+def apply_increments(increments: Dict[Tuple[int, date], Dict[str, float]]) -> int:
+    """
+    Add counter increments to daily statistics rows, creating missing rows.
+
+    Args:
+        increments: ``{(user_id, date): {counter: amount}}``
+
+    Returns:
+        Number of rows updated
+    """
+    increments = {
+        key: {name: value for name, value in values.items() if value}
+        for key, values in increments.items()
+    }
+    increments = {key: values for key, values in increments.items() if values}
+    if not increments:
+        return 0
+    # Rows are inserted and locked in (user, date) order so concurrent flushes cannot deadlock
+    rows = sorted(increments.items())
+    with transaction.atomic():
+        UserStatistics.objects.bulk_create(
+            [UserStatistics(user_id=user_id, date=day) for (user_id, day), _ in rows],
+            ignore_conflicts=True,
+        )
+        for (user_id, day), values in rows:
+            UserStatistics.objects.filter(user_id=user_id, date=day).update(
+                **{name: F(name) + value for name, value in values.items()}
+            )
+    return len(increments)
+
+
+class StatisticsRecorder:
+    """
+    Buffers statistics increments and writes them in batches.
+
+    Increments for the same ``(user, date)`` are summed while buffered; the
+    buffer is flushed when it holds ``batch_size`` rows or when ``flush`` is
+    called.
+    """
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or settings.STATISTICS_BATCH_SIZE
+        self.buffer: Dict[Tuple[int, date], Counter] = defaultdict(Counter)
+
+    def add(self, user_id: int, day: date = None, **increments):
+        """
+        Buffer counter increments.
+
+        Args:
+            user_id: User the statistics belong to
+            day: Statistics date (default: today)
+            **increments: Amounts per counter, e.g. ``cards_created=1``
+        """
+        unknown = set(increments) - set(COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown statistics counters: {', '.join(sorted(unknown))}")
+        self.buffer[(user_id, day or timezone.now().date())].update(increments)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write the buffered increments, returning the number of rows updated"""
+        pending, self.buffer = self.buffer, defaultdict(Counter)
+        return apply_increments(pending)
+
+
+@contextmanager
+def statistics_batch():
+    """
+    Collect ``record_statistics`` calls made inside the block and write them at exit.
+
+    Nested blocks share the outermost recorder. Nothing is written if the
+    block raises.
+    """
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is not None:
+        yield recorder
+        return
+    recorder = _local.recorder = StatisticsRecorder()
+    try:
+        yield recorder
+    finally:
+        _local.recorder = None
+    recorder.flush()
+
+
+def record_statistics(user_id: int, day: date = None, **increments):
+    """
+    Increment daily statistics, batched with others when inside ``statistics_batch``.
+
+    Args:
+        user_id: User the statistics belong to
+        day: Statistics date (default: today)
+        **increments: Amounts per counter, e.g. ``pomodoro_sessions=1, hours_worked=0.5``
+    """
+    with statistics_batch() as recorder:
+        recorder.add(user_id, day, **increments)
+
+
+@receiver(post_save, sender=CardActivity)
+def count_card_activity(sender, instance, created, raw=False, **kwargs):
+    counter = ACTIVITY_COUNTERS.get(instance.activity_type)
+    if created and not raw and counter:
+        record_statistics(instance.user_id, instance.created_at.date(), **{counter: 1})
+
+
+def record_session_completed(session: PomodoroSession):
+    """Count a Pomodoro session that has just become completed"""
+    increments = {'pomodoro_sessions': 1}
+    if session.session_type == 'work':
+        increments['hours_worked'] = session.duration_minutes / 60
+    record_statistics(session.user_id, (session.completed_at or timezone.now()).date(), **increments)
+
+
+@receiver(post_init, sender=PomodoroSession)
+def remember_session_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads don't trigger a query
+    instance._saved_is_completed = instance.__dict__.get('is_completed') if instance.pk else False
+
+
+@receiver(post_save, sender=PomodoroSession)
+def count_completed_session(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_completed = instance._saved_is_completed
+    instance._saved_is_completed = instance.is_completed
+    if was_completed is False and instance.is_completed:
+        record_session_completed(instance)
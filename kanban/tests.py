@@ -1,3 +1,1526 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    Board, List, Card, Comment, Label, CardActivity, Goal, Notification, EmailOutbox, TaskChecklist,
+    BackgroundJob, CardSearchTerm, PomodoroSession, UserProfile, UserStatistics
+)
+from .ranking import RANK_MAX_LENGTH, append_rank, rank_between, spread_ranks
+from .jobs import JOB_HANDLERS, run_pending_jobs
+from .mailer import deliver_outbox
+from .middleware import issue_stream_ticket
+from .notifications import NotificationDispatcher, notification_batch, notify
+from .caching import cache_stats, cached, get_or_compute, reset_cache_stats
+from .reminders import ReminderScheduler
+from .statistics import record_statistics, statistics_batch
+from .utils import send_notification_email
+from .views import EisenhowerMatrixView
+from kanban_project.asgi import application
+
+
+class KanbanTestCase(TestCase):
+    """Base test case with an authenticated API client"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester', email='tester@example.com', password='secret-pass-123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_board(self, lists=3, cards_per_list=2, title='Board'):
+        """Create a board populated with lists, cards, labels, comments and activities"""
+        board = Board.objects.create(title=title, owner=self.user)
+        label = Label.objects.create(name=f'{title} label', user=self.user)
+        for list_index, list_rank in enumerate(spread_ranks(lists)):
+            list_obj = List.objects.create(title=f'List {list_index}', board=board, rank=list_rank)
+            for card_index, card_rank in enumerate(spread_ranks(cards_per_list)):
+                card = Card.objects.create(
+                    title=f'Card {card_index}',
+                    list=list_obj,
+                    rank=card_rank,
+                    assignee=self.user,
+                )
+                card.labels.add(label)
+                Comment.objects.create(card=card, author=self.user, content='Looks good')
+                CardActivity.objects.create(
+                    card=card, user=self.user, activity_type='created', description='Created card'
+                )
+        return board
+
+
+class BoardDetailQueryTests(KanbanTestCase):
+    """The board detail endpoint must load the whole tree in a fixed number of queries"""
+
+    # permission lookup, then board+owner, lists, cards+assignees+comment counts, labels
+    QUERY_BUDGET = 5
+
+    def test_board_detail_query_budget(self):
+        board = self.create_board(lists=2, cards_per_list=1)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('board-detail', args=[board.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['lists']), 2)
+
+    def test_board_detail_query_count_independent_of_size(self):
+        board = self.create_board(lists=5, cards_per_list=20)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('board-detail', args=[board.id]))
+        self.assertEqual(response.status_code, 200)
+        first_list = response.data['lists'][0]
+        self.assertEqual(first_list['cards_count'], 20)
+        card = first_list['cards'][0]
+        self.assertEqual(card['assignee']['full_name'], 'tester')
+        self.assertEqual(len(card['labels']), 1)
+        self.assertEqual(card['comments_count'], 1)
+        self.assertNotIn('comments', card)
+
+    def test_expanded_board_detail_query_budget(self):
+        board = self.create_board(lists=5, cards_per_list=20)
+        # plus comments+authors and activities+users
+        with self.assertNumQueries(self.QUERY_BUDGET + 2):
+            response = self.client.get(
+                reverse('board-detail', args=[board.id]), {'expand': 'comments,activities'}
+            )
+        card = response.data['lists'][0]['cards'][0]
+        self.assertEqual(len(card['comments']), 1)
+        self.assertEqual(len(card['activities']), 1)
+
+
+class BoardSnapshotTests(KanbanTestCase):
+    """Repeat board opens are served from the versioned snapshot cache"""
+
+    def test_repeat_open_is_a_single_query(self):
+        board = self.create_board()
+        url = reverse('board-detail', args=[board.id])
+        first = self.client.get(url)
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(first.data, second.data)
+
+    def test_card_write_invalidates_snapshot(self):
+        board = self.create_board()
+        url = reverse('board-detail', args=[board.id])
+        self.client.get(url)
+        card = Card.objects.filter(list__board=board).first()
+
+        response = self.client.patch(reverse('card-detail', args=[card.id]), {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        board.refresh_from_db()
+        self.assertEqual(board.version, 1)
+        titles = [c['title'] for l in self.client.get(url).data['lists'] for c in l['cards']]
+        self.assertIn('Renamed', titles)
+
+    def test_list_and_label_writes_bump_version(self):
+        board = self.create_board()
+        list_obj = board.lists.first()
+        label = Label.objects.get(user=self.user)
+
+        self.client.patch(reverse('list-detail', args=[list_obj.id]), {'title': 'Backlog'}, format='json')
+        self.client.patch(reverse('label-detail', args=[label.id]), {'name': 'Bug'}, format='json')
+
+        board.refresh_from_db()
+        self.assertEqual(board.version, 2)
+
+    def test_goal_link_and_profile_update_bump_version(self):
+        board = self.create_board()
+        url = reverse('board-detail', args=[board.id])
+        card = Card.objects.filter(list__board=board).first()
+        goal = Goal.objects.create(title='Ship', owner=self.user)
+
+        self.client.post(reverse('goal-link-card', args=[goal.id]), {'card_id': card.id}, format='json')
+        activities = self.client.get(url, {'expand': 'activities'}).data['lists'][0]['cards'][0]['activities']
+        self.assertIn('goal_linked', [a['activity_type'] for a in activities])
+
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        other_board = Board.objects.create(title='Other', owner=other)
+        self.client.patch(reverse('auth-update-profile'), {'display_name': 'Tess'}, format='json')
+        board.refresh_from_db()
+        other_board.refresh_from_db()
+        self.assertEqual((board.version, other_board.version), (2, 0))
+        card_data = self.client.get(url).data['lists'][0]['cards'][0]
+        self.assertEqual(card_data['assignee']['profile']['display_name'], 'Tess')
+
+
+class BoardChangesTests(KanbanTestCase):
+    """The changes feed returns only what was written after the client's last sync"""
+
+    def sync(self, board, **params):
+        response = self.client.get(reverse('board-changes', args=[board.id]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_since_is_required(self):
+        board = self.create_board()
+        response = self.client.get(reverse('board-changes', args=[board.id]))
+        self.assertEqual(response.status_code, 400)
+
+    def test_returns_changed_cards_and_deletions(self):
+        board = self.create_board(lists=2, cards_per_list=2)
+        cursor = self.sync(board, since=timezone.now().isoformat())
+        self.assertEqual(cursor['cards'], [])
+
+        cards = list(Card.objects.filter(list__board=board).order_by('id'))
+        self.client.patch(reverse('card-detail', args=[cards[0].id]), {'title': 'Changed'}, format='json')
+        self.client.delete(reverse('card-detail', args=[cards[1].id]))
+
+        changes = self.sync(board, since=cursor['synced_at'].isoformat(), version=cursor['version'])
+        self.assertEqual([c['id'] for c in changes['cards']], [cards[0].id])
+        self.assertEqual(changes['cards'][0]['list'], cards[0].list_id)
+        self.assertEqual(changes['deleted']['cards'], [cards[1].id])
+
+    def test_unchanged_version_short_circuits(self):
+        board = self.create_board()
+        since = timezone.now().isoformat()
+        with self.assertNumQueries(1):
+            changes = self.sync(board, since=since, version=board.version)
+        self.assertEqual(changes['lists'], [])
+
+    def test_board_detail_seeds_the_cursor(self):
+        board = self.create_board(lists=1, cards_per_list=2)
+        detail = self.client.get(reverse('board-detail', args=[board.id])).data
+        self.assertEqual(detail['version'], board.version)
+        changes = self.sync(board, since=detail['synced_at'].isoformat(), version=detail['version'])
+        self.assertEqual(changes['cards'], [])
+
+        card = Card.objects.filter(list__board=board).first()
+        self.client.patch(reverse('card-detail', args=[card.id]), {'title': 'Changed'}, format='json')
+        changes = self.sync(board, since=detail['synced_at'].isoformat(), version=detail['version'])
+        self.assertEqual([c['id'] for c in changes['cards']], [card.id])
+
+    def test_stale_cursor_requests_full_refresh(self):
+        board = self.create_board()
+        changes = self.sync(board, since=(timezone.now() - timedelta(days=365)).isoformat())
+        self.assertTrue(changes['full_refresh'])
+
+
+class RankingTests(KanbanTestCase):
+    """Moves write a single row and ranks stay ordered"""
+
+    def test_rank_between_orders_keys(self):
+        keys = []
+        for _ in range(50):
+            keys.insert(0, rank_between(None, keys[0] if keys else None))
+        self.assertEqual(keys, sorted(keys))
+        self.assertLess(rank_between('i', 'j'), 'j')
+        self.assertGreater(rank_between('i', 'j'), 'i')
+
+    def test_move_writes_one_card_row(self):
+        board = self.create_board(lists=2, cards_per_list=5)
+        source, target = board.lists.all()
+        card = source.cards.last()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('card-move', args=[card.id]), {'list_id': target.id, 'position': 2}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        card_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "kanban_card"')]
+        self.assertEqual(len(card_updates), 1)
+        self.assertEqual(list(target.cards.values_list('id', flat=True)).index(card.id), 2)
+
+    def test_reorder_list_to_front(self):
+        board = self.create_board(lists=3, cards_per_list=0)
+        last = board.lists.last()
+        self.client.post(reverse('list-reorder', args=[last.id]), {'position': 0}, format='json')
+        self.assertEqual(board.lists.first(), last)
+
+    def append_cards(self, list_obj, count):
+        return [
+            Card.objects.create(title=f'Card {index}', list=list_obj, rank=append_rank(list_obj.cards.all())).id
+            for index in range(count)
+        ]
+
+    def test_sequential_appends_stay_within_the_column(self):
+        list_obj = self.create_board(lists=1, cards_per_list=0).lists.get()
+        ids = self.append_cards(list_obj, 400)
+        ranks = list(list_obj.cards.values_list('rank', flat=True))
+        self.assertLessEqual(max(map(len, ranks)), RANK_MAX_LENGTH)
+        self.assertEqual(list(list_obj.cards.values_list('id', flat=True)), ids)
+
+    def test_append_rebalances_before_overflowing(self):
+        list_obj = self.create_board(lists=1, cards_per_list=0).lists.get()
+        with mock.patch('kanban.ranking.RANK_MAX_LENGTH', 2):
+            ids = self.append_cards(list_obj, 80)
+        self.assertLessEqual(max(len(r) for r in list_obj.cards.values_list('rank', flat=True)), 2)
+        self.assertEqual(list(list_obj.cards.values_list('id', flat=True)), ids)
+
+    @override_settings(RANK_REBALANCE_LENGTH=4)
+    def test_rebalance_command_shortens_ranks(self):
+        board = self.create_board(lists=1, cards_per_list=0)
+        list_obj = board.lists.get()
+        rank = None
+        for index in range(40):
+            rank = rank_between(None, rank)
+            Card.objects.create(title=f'Card {index}', list=list_obj, rank=rank)
+        order = list(list_obj.cards.values_list('id', flat=True))
+
+        call_command('rebalance_ranks', stdout=StringIO())
+
+        self.assertEqual(list(list_obj.cards.values_list('id', flat=True)), order)
+        self.assertTrue(all(len(r) <= 2 for r in list_obj.cards.values_list('rank', flat=True)))
+
+
+class CardSearchTests(KanbanTestCase):
+    """Search goes through the inverted index and ranks by relevance"""
+
+    def setUp(self):
+        super().setUp()
+        board = Board.objects.create(title='Search', owner=self.user)
+        self.list = List.objects.create(title='Inbox', board=board)
+
+    def search(self, query):
+        response = self.client.get(reverse('card-list'), {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [card['title'] for card in response.data['results']]
+
+    def test_title_matches_rank_above_description_matches(self):
+        Card.objects.create(title='Write report', description='quarterly numbers', list=self.list, rank='a')
+        Card.objects.create(title='Call bank', description='ask about the report', list=self.list, rank='b')
+        self.assertEqual(self.search('report'), ['Write report', 'Call bank'])
+
+    def test_last_word_matches_as_prefix_and_all_words_required(self):
+        Card.objects.create(title='Deploy backend service', list=self.list, rank='a')
+        Card.objects.create(title='Deploy frontend', list=self.list, rank='b')
+        self.assertEqual(self.search('deploy back'), ['Deploy backend service'])
+
+    @override_settings(SEARCH_RESULT_LIMIT=2)
+    def test_filters_apply_before_the_result_limit(self):
+        other = List.objects.create(title='Other', board=Board.objects.create(title='Other', owner=self.user))
+        for index in range(3):
+            # Title and description hits: these outrank the filtered board's match
+            Card.objects.create(title=f'Report {index}', description='report', list=self.list, rank=f'a{index}')
+        Card.objects.create(title='Report archive', list=other, rank='a')
+        response = self.client.get(reverse('card-list'), {'search': 'report', 'board': other.board_id})
+        self.assertEqual([card['title'] for card in response.data['results']], ['Report archive'])
+
+    def test_label_changes_are_indexed(self):
+        card = Card.objects.create(title='Fix login', list=self.list, rank='a')
+        label = Label.objects.create(name='Urgent', user=self.user)
+        card.labels.add(label)
+        self.assertEqual(self.search('urgent'), ['Fix login'])
+
+        label.name = 'Later'
+        label.save()
+        self.assertEqual(self.search('urgent'), [])
+        self.assertEqual(Card.search(self.user, 'later').get(), card)
+
+    def test_other_users_cards_are_not_found(self):
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        board = Board.objects.create(title='Private', owner=other)
+        Card.objects.create(title='Secret plan', list=List.objects.create(title='L', board=board))
+        self.assertEqual(self.search('secret'), [])
+
+
+class DenormalizedOwnerTests(KanbanTestCase):
+    """Lists, cards, comments and activities carry their board and owner"""
+
+    def test_columns_follow_parent_on_create_and_move(self):
+        source = self.create_board(lists=1, cards_per_list=1, title='Source')
+        target = self.create_board(lists=1, cards_per_list=0, title='Target')
+        card = Card.objects.get(list__board=source)
+        self.assertEqual((card.board_id, card.owner_id), (source.id, self.user.id))
+        self.assertEqual(card.comments.get().owner_id, self.user.id)
+        self.assertEqual(card.activities.get().board_id, source.id)
+
+        response = self.client.post(
+            reverse('card-move', args=[card.id]), {'list_id': target.lists.get().id, 'position': 0}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        card.refresh_from_db()
+        self.assertEqual(card.board_id, target.id)
+        self.assertEqual(card.activities.filter(activity_type='moved').get().board_id, target.id)
+        self.assertEqual(card.activities.get(activity_type='created').board_id, target.id)
+
+    def test_other_users_cannot_reach_cards(self):
+        board = self.create_board(lists=1, cards_per_list=1)
+        card = Card.objects.get(list__board=board)
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(reverse('card-detail', args=[card.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('comment-list'), {'card': card.id}).data['results'], [])
+
+
+class BoardListQueryTests(KanbanTestCase):
+    """The board list costs the same number of queries however many boards it shows"""
+
+    # page count, boards + owners + counts, recent activity of the page
+    QUERY_BUDGET = 3
+
+    def test_board_list_query_count_independent_of_size(self):
+        for index in range(2):
+            self.create_board(lists=2, cards_per_list=2, title=f'Board {index}')
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            self.client.get(reverse('board-list'))
+
+        for index in range(2, 6):
+            self.create_board(lists=3, cards_per_list=4, title=f'Board {index}')
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('board-list'))
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_counts_and_recent_activity(self):
+        board = self.create_board(lists=3, cards_per_list=2)
+        Board.objects.create(title='Empty', owner=self.user)
+        newest = CardActivity.objects.filter(board=board).order_by('-created_at', '-id')[:3]
+
+        results = {b['title']: b for b in self.client.get(reverse('board-list')).data['results']}
+        self.assertEqual(results['Board']['lists_count'], 3)
+        self.assertEqual(results['Board']['cards_count'], 6)
+        self.assertEqual([a['id'] for a in results['Board']['recent_activity']], [a.id for a in newest])
+        self.assertEqual(results['Empty']['cards_count'], 0)
+        self.assertEqual(results['Empty']['recent_activity'], [])
+
+
+class DashboardStatsTests(KanbanTestCase):
+    """Dashboard figures come from a few aggregate queries and a per-user cache"""
+
+    # card aggregate, board count, today's pomodoros, recent activity
+    QUERY_BUDGET = 4
+
+    def test_stats_use_conditional_aggregation(self):
+        board = self.create_board(lists=1, cards_per_list=4)
+        cards = list(Card.objects.filter(board=board))
+        now = timezone.now()
+        Card.objects.filter(id=cards[0].id).update(completed=True)
+        Card.objects.filter(id=cards[1].id).update(due_date=now + timedelta(days=1))
+        Card.objects.filter(id=cards[2].id).update(due_date=now - timedelta(days=1))
+        cache.clear()
+
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('dashboard_stats'))
+        stats = response.data['stats']
+        self.assertEqual(stats['total_boards'], 1)
+        self.assertEqual(stats['total_cards'], 4)
+        self.assertEqual(stats['completed_cards'], 1)
+        self.assertEqual(stats['due_soon_cards'], 1)
+        self.assertEqual(stats['overdue_cards'], 1)
+        self.assertEqual(len(response.data['recent_activities']), 4)
+
+    def test_cached_until_a_card_is_written(self):
+        board = self.create_board(lists=1, cards_per_list=2)
+        self.client.get(reverse('dashboard_stats'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('dashboard_stats'))
+
+        card = Card.objects.filter(board=board).first()
+        self.client.patch(reverse('card-detail', args=[card.id]), {'completed': True}, format='json')
+        stats = self.client.get(reverse('dashboard_stats')).data['stats']
+        self.assertEqual(stats['completed_cards'], 1)
+
+
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class BoardSocketTests(KanbanTestCase):
+    """Card and list writes are pushed to everyone viewing the board"""
+
+    def setUp(self):
+        super().setUp()
+        self.board = self.create_board(lists=2, cards_per_list=1)
+
+    def connect(self, user=None, board=None, ticket=None):
+        ticket = ticket or issue_stream_ticket(user or self.user)
+        board = board or self.board
+        return WebsocketCommunicator(application, f'/ws/boards/{board.id}/?ticket={ticket}')
+
+    def write(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(url, data, format='json')
+
+    async def test_card_and_list_events_are_broadcast(self):
+        communicator = self.connect()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        list_obj = await sync_to_async(self.board.lists.first)()
+        await sync_to_async(self.write)('post', reverse('card-list'), {'title': 'Live', 'list': list_obj.id})
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['type'], 'card.created')
+        self.assertEqual(event['data']['title'], 'Live')
+
+        await sync_to_async(self.write)('post', reverse('card-move', args=[event['data']['id']]), {
+            'list_id': list_obj.id, 'position': 0,
+        })
+        self.assertEqual((await communicator.receive_json_from())['type'], 'card.moved')
+
+        await sync_to_async(self.write)('delete', reverse('list-detail', args=[list_obj.id]))
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'list.deleted', 'data': {'id': list_obj.id}})
+        await communicator.disconnect()
+
+    async def test_other_users_cannot_subscribe(self):
+        other = await sync_to_async(User.objects.create_user)(username='other', password='secret-pass-123')
+        connected, _ = await self.connect(user=other).connect()
+        self.assertFalse(connected)
+
+        anonymous = WebsocketCommunicator(application, f'/ws/boards/{self.board.id}/')
+        connected, _ = await anonymous.connect()
+        self.assertFalse(connected)
+
+    async def test_tickets_are_single_use_and_tokens_are_refused(self):
+        response = await sync_to_async(self.client.post)(reverse('auth-stream-ticket'))
+        ticket = response.data['ticket']
+        first = self.connect(ticket=ticket)
+        self.assertTrue((await first.connect())[0])
+        self.assertFalse((await self.connect(ticket=ticket).connect())[0])
+        await first.disconnect()
+
+        with override_settings(STREAM_TICKET_SECONDS=0):
+            self.assertFalse((await self.connect().connect())[0])
+        token = AccessToken.for_user(self.user)
+        by_token = WebsocketCommunicator(application, f'/ws/boards/{self.board.id}/?token={token}')
+        self.assertFalse((await by_token.connect())[0])
+
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class NotificationPushTests(KanbanTestCase):
+    """Unread counts are maintained counters pushed to the user as they change"""
+
+    def notify(self, title='Due soon'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(user=self.user, type='due_soon', title=title, message='Soon')
+
+    def unread_count(self):
+        return self.client.get(reverse('notification-unread-count')).data['unread_count']
+
+    def test_counter_follows_creates_reads_and_deletes(self):
+        first, second, third = self.notify(), self.notify(), self.notify()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.unread_count(), 3)
+
+        self.client.post(reverse('notification-mark-read', args=[first.id]))
+        self.client.post(reverse('notification-mark-read', args=[first.id]))
+        self.assertEqual(self.unread_count(), 2)
+
+        second.delete()
+        self.assertEqual(self.unread_count(), 1)
+        self.client.post(reverse('notification-mark-all-read'))
+        self.assertEqual(self.unread_count(), 0)
+
+        Notification.objects.filter(id=third.id).update(is_read=False)
+        call_command('recount_unread_notifications', stdout=StringIO())
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_mark_all_read_only_subtracts_the_rows_it_marked(self):
+        self.notify()
+        self.notify()
+        # One more counted by a notification whose row this request cannot see yet
+        UserProfile.objects.filter(user=self.user).update(unread_notifications=3)
+        self.client.post(reverse('notification-mark-all-read'))
+        self.assertEqual(self.unread_count(), 1)
+
+    async def test_websocket_receives_notifications_and_counts(self):
+        ticket = await sync_to_async(issue_stream_ticket)(self.user)
+        communicator = WebsocketCommunicator(application, f'/ws/notifications/?ticket={ticket}')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'data': {'unread_count': 0}})
+
+        await sync_to_async(self.notify)('Review PR')
+        created = await communicator.receive_json_from()
+        self.assertEqual(created['type'], 'notification.created')
+        self.assertEqual(created['data']['title'], 'Review PR')
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'data': {'unread_count': 1}})
+        await communicator.disconnect()
+
+    async def test_event_stream_fallback(self):
+        ticket = await sync_to_async(issue_stream_ticket)(self.user)
+        response = await AsyncClient().get(reverse('notification_stream'), {'ticket': ticket})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = response.streaming_content
+        self.assertTrue((await anext(events)).startswith(b'retry:'))
+        self.assertIn(b'event: unread_count', await anext(events))
+
+        await sync_to_async(self.notify)()
+        self.assertIn(b'event: notification.created', await anext(events))
+        await events.aclose()
+
+    async def test_event_stream_requires_ticket(self):
+        response = await AsyncClient().get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 401)
+        token = AccessToken.for_user(self.user)
+        response = await AsyncClient().get(reverse('notification_stream'), {'token': str(token)})
+        self.assertEqual(response.status_code, 401)
+
+
+
+class ReminderSchedulerTests(KanbanTestCase):
+    """Due-date reminders fire from the scheduler heap and are written in bulk"""
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.board = self.create_board(lists=1, cards_per_list=3)
+        self.cards = list(Card.objects.filter(board=self.board).order_by('id'))
+        self.scheduler = ReminderScheduler()
+
+    def set_due(self, card, **delta):
+        card.due_date = self.now + timedelta(**delta)
+        card.save()
+
+    def sent(self):
+        return sorted(Notification.objects.values_list('card__title', 'type'))
+
+    def test_due_soon_then_overdue(self):
+        self.set_due(self.cards[0], hours=30)
+        self.set_due(self.cards[1], hours=28)
+        self.assertEqual(self.scheduler.tick(self.now), 0)
+        self.assertEqual(self.scheduler.next_wakeup(), self.cards[1].due_date - timedelta(hours=24))
+
+        self.scheduler.tick(self.now + timedelta(hours=5))
+        self.assertEqual(self.sent(), [('Card 1', 'due_soon')])
+
+        self.scheduler.tick(self.now + timedelta(hours=31))
+        self.assertEqual(self.sent(), [
+            ('Card 0', 'due_soon'), ('Card 0', 'overdue'), ('Card 1', 'due_soon'), ('Card 1', 'overdue'),
+        ])
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.unread_notifications, 4)
+
+    def test_card_changes_are_picked_up(self):
+        self.scheduler.tick(self.now)
+        self.set_due(self.cards[0], hours=1)
+        self.set_due(self.cards[1], hours=1)
+        self.set_due(self.cards[2], hours=1)
+        self.cards[1].completed = True
+        self.cards[1].save()
+        self.set_due(self.cards[2], hours=40)
+
+        self.scheduler.tick(self.now + timedelta(hours=2))
+        self.assertEqual(self.sent(), [('Card 0', 'due_soon'), ('Card 0', 'overdue')])
+
+    def test_late_commits_are_rescanned(self):
+        self.scheduler.tick(self.now)
+        # Saved before the cursor but committed after the previous poll
+        Card.objects.filter(id=self.cards[0].id).update(
+            due_date=self.now + timedelta(hours=1), updated_at=self.now - timedelta(seconds=5)
+        )
+        self.scheduler.tick(self.now + timedelta(hours=2))
+        self.scheduler.tick(self.now + timedelta(hours=2))
+        self.assertEqual(self.sent(), [('Card 0', 'due_soon'), ('Card 0', 'overdue')])
+
+    def test_restart_does_not_resend(self):
+        self.set_due(self.cards[0], hours=-1)
+        self.scheduler.tick(self.now)
+        ReminderScheduler().tick(self.now)
+        self.assertEqual(self.sent(), [('Card 0', 'due_soon'), ('Card 0', 'overdue')])
+
+    def test_reminders_respect_profile_setting(self):
+        self.user.profile.due_date_reminders = False
+        self.user.profile.save()
+        self.set_due(self.cards[0], hours=-1)
+        call_command('run_reminders', '--once', stdout=StringIO())
+        self.assertEqual(self.sent(), [])
+
+
+
+class NotificationDispatcherTests(KanbanTestCase):
+    """Notification events are coalesced and written in bulk batches"""
+
+    def setUp(self):
+        super().setUp()
+        board = self.create_board(lists=1, cards_per_list=3)
+        self.cards = list(Card.objects.filter(board=board).order_by('id'))
+
+    def event(self, card, type_='assigned'):
+        return {'user': self.user, 'type': type_, 'title': 'Assigned', 'message': card.title, 'card': card}
+
+    def test_batch_is_one_insert_and_duplicates_are_coalesced(self):
+        dispatcher = NotificationDispatcher()
+        for card in self.cards:
+            dispatcher.add(**self.event(card))
+        self.assertFalse(dispatcher.add(**self.event(self.cards[0])))
+
+        with CaptureQueriesContext(connection) as queries:
+            dispatcher.flush()
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "kanban_notification"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(dispatcher.stats['last_batch_size'], 3)
+        self.assertEqual(dispatcher.stats['coalesced'], 1)
+        self.assertGreater(dispatcher.stats['last_latency_ms'], 0)
+
+        # Same events again inside the window are dropped; another type is not
+        dispatcher.add(**self.event(self.cards[1]))
+        dispatcher.add(**self.event(self.cards[1], type_='mentioned'))
+        dispatcher.flush()
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_batch_size_triggers_flush(self):
+        dispatcher = NotificationDispatcher(batch_size=2)
+        for card in self.cards:
+            dispatcher.add(**self.event(card))
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(len(dispatcher.buffer), 1)
+
+    def test_notify_batches_until_block_exit(self):
+        with notification_batch():
+            for card in self.cards:
+                notify(**self.event(card))
+            self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.unread_notifications, 3)
+
+    def test_pushed_notifications_carry_ids_without_bulk_returning(self):
+        dispatcher = NotificationDispatcher()
+        for card in self.cards:
+            dispatcher.add(**self.event(card))
+        # MySQL cannot return ids from a bulk insert
+        with mock.patch.object(
+            type(connection.features), 'can_return_rows_from_bulk_insert', new_callable=mock.PropertyMock,
+            return_value=False,
+        ), mock.patch('kanban.notifications.broadcast_user_event') as broadcast:
+            created = dispatcher.flush()
+        self.assertEqual(
+            sorted(n.pk for n in created), sorted(Notification.objects.values_list('id', flat=True))
+        )
+        self.assertEqual(
+            sorted(call.args[2]['id'] for call in broadcast.call_args_list), sorted(n.pk for n in created)
+        )
+
+    def test_events_without_a_card_are_keyed_by_goal(self):
+        goals = [Goal.objects.create(title=f'Goal {index}', owner=self.user) for index in range(2)]
+        dispatcher = NotificationDispatcher()
+        for goal in goals:
+            dispatcher.add(user=self.user, type='goal_progress', title='Goal Progress', message='', goal=goal)
+        dispatcher.flush()
+        dispatcher.add(user=self.user, type='goal_progress', title='Goal Progress', message='', goal=goals[1])
+        dispatcher.flush()
+        self.assertEqual(sorted(Notification.objects.values_list('goal_id', flat=True)), [g.id for g in goals])
+
+    def test_assignment_goes_through_the_dispatcher(self):
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        card = self.cards[0]
+        self.client.patch(reverse('card-detail', args=[card.id]), {'assignee_id': other.id}, format='json')
+        self.assertEqual(list(other.notifications.values_list('type', 'card_id')), [('assigned', card.id)])
+
+    def test_job_notifications_are_written_in_one_batch(self):
+        def handler(job, progress):
+            for card in self.cards:
+                notify(user=job.user, type='assigned', title='Assigned', message='', card=card)
+
+        BackgroundJob.objects.create(user=self.user, kind='board_copy')
+        with mock.patch.dict(JOB_HANDLERS, {'board_copy': handler}), \
+                mock.patch.object(NotificationDispatcher, 'flush', autospec=True,
+                                  side_effect=NotificationDispatcher.flush) as flush:
+            run_pending_jobs()
+        self.assertEqual(flush.call_count, 1)
+        self.assertEqual(self.user.notifications.count(), len(self.cards))
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_MAX_ATTEMPTS=2,
+    EMAIL_RETRY_BASE_SECONDS=60,
+)
+class EmailOutboxTests(KanbanTestCase):
+    """Emails are queued and delivered in batches by the outbox worker"""
+
+    def queue(self, count=1, **kwargs):
+        for index in range(count):
+            send_notification_email(
+                self.user.email, f'Subject {index}', 'Body', '<p>Body</p>', user=self.user, **kwargs
+            )
+
+    def test_request_only_queues_and_worker_sends_over_one_connection(self):
+        self.queue(3)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutbox.objects.filter(status='pending').count(), 3)
+
+        with mock.patch('kanban.mailer.get_connection', wraps=mail.get_connection) as get_connection:
+            counts = deliver_outbox()
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(counts['sent'], 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Body</p>', 'text/html')])
+        self.assertEqual(EmailOutbox.objects.filter(status='sent').count(), 3)
+        self.assertEqual(deliver_outbox()['sent'], 0)
+
+    def test_failures_back_off_and_give_up(self):
+        self.queue()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down')):
+            self.assertEqual(deliver_outbox()['retried'], 1)
+            email = EmailOutbox.objects.get()
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.last_error, 'down')
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+            # Not due again until the backoff has passed
+            self.assertEqual(deliver_outbox()['retried'], 0)
+            EmailOutbox.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(deliver_outbox()['failed'], 1)
+        self.assertEqual(EmailOutbox.objects.get().status, 'failed')
+
+    def test_sent_mail_stays_sent_when_recording_a_later_message_fails(self):
+        self.queue(2)
+        original_save = EmailOutbox.save
+
+        def save(email, *args, **kwargs):
+            if email.subject == 'Subject 1':
+                raise RuntimeError('database went away')
+            return original_save(email, *args, **kwargs)
+
+        with mock.patch.object(EmailOutbox, 'save', save), self.assertRaises(RuntimeError):
+            deliver_outbox()
+        self.assertEqual(dict(EmailOutbox.objects.values_list('subject', 'status')), {
+            'Subject 0': 'sent', 'Subject 1': 'sending',
+        })
+        # The unrecorded claim is not sent again until its lease runs out
+        self.assertEqual(deliver_outbox()['sent'], 0)
+        EmailOutbox.objects.filter(status='sending').update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_outbox()['sent'], 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_preferences_are_checked_at_delivery(self):
+        self.queue()
+        self.queue(category='daily_summary')
+        self.user.profile.email_notifications = False
+        self.user.profile.save()
+
+        counts = deliver_outbox()
+        self.assertEqual(counts['cancelled'], 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class NotificationPayloadTests(KanbanTestCase):
+    """Notifications are compact by default; full objects are opt-in"""
+
+    def setUp(self):
+        super().setUp()
+        board = self.create_board(lists=1, cards_per_list=5)
+        self.board = board
+        goal = Goal.objects.create(title='Ship it', owner=self.user)
+        for card in Card.objects.filter(board=board):
+            Notification.objects.create(user=self.user, type='assigned', title='Assigned', message='', card=card)
+            Notification.objects.create(user=self.user, type='goal_progress', title='Goal', message='', goal=goal)
+
+    def test_list_is_compact_with_deep_link(self):
+        with self.assertNumQueries(3):  # notifications, cards, goals
+            response = self.client.get(reverse('notification-list'))
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        with_card = next(item for item in results if item['card'])
+        card = Card.objects.get(id=with_card['card']['id'])
+        self.assertEqual(with_card['card'], {'id': card.id, 'title': card.title, 'board_id': self.board.id})
+        self.assertEqual(with_card['link'], f'/board/{self.board.id}?card={card.id}')
+        with_goal = next(item for item in results if item['goal'])
+        self.assertEqual(set(with_goal['goal']), {'id', 'title'})
+        self.assertEqual(with_goal['link'], '/goals')
+
+    def test_expand_embeds_full_objects(self):
+        response = self.client.get(reverse('notification-list'), {'expand': 'card,comments'})
+        with_card = next(item for item in response.data['results'] if item['card'])
+        self.assertIn('assignee', with_card['card'])
+        self.assertEqual(len(with_card['card']['comments']), 1)
+        with_goal = next(item for item in response.data['results'] if item['goal'])
+        self.assertNotIn('cards', with_goal['goal'])
+
+
+class SparseFieldsetTests(KanbanTestCase):
+    """?fields= picks fields and ?expand= opts into heavy relations"""
+
+    def setUp(self):
+        super().setUp()
+        self.board = self.create_board(lists=2, cards_per_list=3)
+
+    def test_heavy_relations_are_off_by_default(self):
+        response = self.client.get(reverse('card-list'))
+        card = response.data['results'][0]
+        self.assertNotIn('comments', card)
+        self.assertNotIn('activities', card)
+        self.assertEqual(card['comments_count'], 1)
+
+    def test_fields_skip_unrequested_relations(self):
+        # cards only: no assignee join, label or comment queries
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('card-list'), {'fields': 'id,title'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+
+    def test_expand_loads_only_the_requested_relation(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('card-list'), {'expand': 'activities', 'fields': 'id,activities'})
+        self.assertEqual(len(response.data['results'][0]['activities']), 1)
+        self.assertFalse(any('kanban_comment' in q['sql'] for q in queries.captured_queries))
+
+    def test_board_snapshot_is_cached_per_shape(self):
+        url = reverse('board-detail', args=[self.board.id])
+        full = self.client.get(url).data
+        slim = self.client.get(url, {'fields': 'id,title'}).data
+        self.assertEqual(set(slim), {'id', 'title'})
+        self.assertIn('lists', self.client.get(url).data)
+        self.assertEqual(full['id'], slim['id'])
+
+
+class CursorPaginationTests(KanbanTestCase):
+    """Append-heavy feeds page by a (created_at, id) cursor"""
+
+    def collect(self, url, params=None):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            ids += [item['id'] for item in response.data['results']]
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_every_row_once_without_count_or_offset(self):
+        created_at = timezone.now()
+        Notification.objects.bulk_create([
+            # Identical timestamps force ties to be broken by id
+            Notification(user=self.user, type='assigned', title=f'N{index}', message='', created_at=created_at)
+            for index in range(25)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            ids, pages = self.collect(reverse('notification-list'), {'page_size': 10})
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(set(ids)), 25)
+        sql = ' '.join(q['sql'] for q in queries.captured_queries)
+        self.assertNotIn('COUNT(', sql)
+
+    def test_card_queries_do_not_join_lists(self):
+        board = self.create_board(lists=2, cards_per_list=3)
+        with CaptureQueriesContext(connection) as queries:
+            ids, pages = self.collect(reverse('card-list'), {'page_size': 4})
+            self.client.get(reverse('card-detail', args=[Card.objects.filter(board=board).first().id]))
+        self.assertEqual((len(ids), pages), (6, 2))
+        card_queries = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT "kanban_card"')]
+        self.assertTrue(card_queries)
+        self.assertFalse(any('"kanban_list"' in sql for sql in card_queries))
+
+    def test_board_activity_feed_continues_the_timeline(self):
+        board = self.create_board(lists=1, cards_per_list=25)
+        timeline = self.client.get(reverse('board-timeline', args=[board.id])).data
+        self.assertEqual(len(timeline['recent_activities']), 20)
+        self.assertIn(reverse('board-activities', args=[board.id]), timeline['recent_activities_next'])
+
+        rest = self.client.get(timeline['recent_activities_next']).data['results']
+        ids = [a['id'] for a in timeline['recent_activities']] + [a['id'] for a in rest]
+        self.assertEqual(sorted(ids), list(CardActivity.objects.filter(board=board).values_list('id', flat=True).order_by('id')))
+
+    def test_card_search_keeps_relevance_order(self):
+        self.create_board(lists=1, cards_per_list=3)
+        response = self.client.get(reverse('card-list'), {'search': 'card'})
+        self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+        self.assertEqual((len(response.data['results']), response.data['next']), (3, None))
+
+    def test_list_and_board_filters_keep_rank_order(self):
+        board = self.create_board(lists=2, cards_per_list=3)
+        first, second = board.lists.order_by('rank')
+        # Newest card ranked first, so creation order and rank order disagree
+        top = Card.objects.create(title='Top', list=second, rank=rank_between(None, second.cards.order_by('rank').first().rank))
+        column = list(second.cards.order_by('rank', 'id').values_list('id', flat=True))
+        self.assertEqual(column[0], top.id)
+
+        ids, pages = self.collect(reverse('card-list'), {'list': second.id, 'page_size': 3})
+        self.assertEqual((ids, pages), (column, 2))
+
+        response = self.client.get(reverse('card-list'), {'board': board.id})
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(
+            [card['id'] for card in response.data['results']],
+            list(first.cards.order_by('rank', 'id').values_list('id', flat=True)) + column,
+        )
+
+
+class ExplainHotQueriesTests(KanbanTestCase):
+    """The EXPLAIN command reports whether hot queries use an index"""
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', '--fail-on-scan', stdout=out)
+        self.assertNotIn('FULL SCAN', out.getvalue())
+        self.assertIn('0 flagged', out.getvalue())
+
+    def test_full_scans_are_detected_per_vendor(self):
+        from .management.commands.explain_hot_queries import full_scans
+
+        self.assertEqual(full_scans('2 0 0 SCAN kanban_card', 'sqlite'), ['kanban_card'])
+        self.assertEqual(full_scans('2 0 0 SCAN kanban_card USING INDEX idx', 'sqlite'), [])
+        mysql_plan = '{"query_block": {"table": {"table_name": "kanban_card", "access_type": "ALL"}}}'
+        self.assertEqual(full_scans(mysql_plan, 'mysql'), ['kanban_card'])
+        self.assertEqual(full_scans('Seq Scan on kanban_card  (cost=0.00..1.01)', 'postgresql'), ['kanban_card'])
+
+
+class BoardCopyTests(KanbanTestCase):
+    """Boards are copied with bulk inserts, large ones by the job worker"""
+
+    def copy_queries(self, cards_per_list):
+        board = self.create_board(lists=2, cards_per_list=cards_per_list, title=f'Board {cards_per_list}')
+        for card in Card.objects.filter(board=board):
+            TaskChecklist.objects.create(card=card, title='Step', position=0)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('board-duplicate', args=[board.id]))
+        self.assertEqual(response.status_code, 201)
+        return board, Board.objects.get(id=response.data['id']), len(queries)
+
+    def test_copy_is_complete_and_query_count_independent_of_size(self):
+        _, _, small = self.copy_queries(2)
+        source, copy, large = self.copy_queries(20)
+        self.assertEqual(small, large)
+
+        self.assertTrue(copy.is_active)
+        self.assertEqual(copy.title, 'Board 20 (Copy)')
+        self.assertEqual(list(copy.lists.values_list('title', 'rank')), list(source.lists.values_list('title', 'rank')))
+        cards = Card.objects.filter(board=copy)
+        self.assertEqual(cards.count(), 40)
+        self.assertEqual(cards.filter(owner=self.user, labels__isnull=False).count(), 40)
+        self.assertEqual(TaskChecklist.objects.filter(card__board=copy).count(), 40)
+        self.assertEqual(
+            CardSearchTerm.objects.filter(card__board=copy).count(),
+            CardSearchTerm.objects.filter(card__board=source).count(),
+        )
+
+    @override_settings(BOARD_COPY_SYNC_LIMIT=3)
+    def test_large_board_is_copied_by_a_job(self):
+        board = self.create_board(lists=2, cards_per_list=2)
+        response = self.client.post(reverse('board-duplicate', args=[board.id]))
+        self.assertEqual(response.status_code, 202)
+        job_url = reverse('job-detail', args=[response.data['job']['id']])
+        self.assertEqual(response['Location'], job_url)
+        self.assertEqual(Board.objects.filter(owner=self.user).count(), 1)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job = self.client.get(job_url).data
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual((job['processed'], job['total'], job['progress_percentage']), (4, 4, 100))
+        self.assertEqual(Card.objects.filter(board_id=job['result']['board_id']).count(), 4)
+
+    def test_template_instantiation_uses_the_copy(self):
+        board = self.create_board(lists=1, cards_per_list=2)
+        url = reverse('board-use-template', args=[board.id])
+        self.assertEqual(self.client.post(url).status_code, 400)
+
+        Board.objects.filter(id=board.id).update(is_template=True)
+        response = self.client.post(url, {'title': 'Sprint 12'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['title'], 'Sprint 12')
+        self.assertFalse(response.data['is_template'])
+        self.assertEqual(Card.objects.filter(board_id=response.data['id']).count(), 2)
+
+
+class ExportTests(KanbanTestCase):
+    """Exports are streamed in chunks, in a number of queries independent of size"""
+
+    def export(self, name, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'import-export-{name}'), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            content = b''.join(response.streaming_content)
+        return response, content, len(queries)
+
+    @override_settings(EXPORT_BLOCK_BYTES=256)
+    def test_board_jsonl_export(self):
+        small = self.create_board(lists=1, cards_per_list=2, title='Small')
+        board = self.create_board(lists=2, cards_per_list=10, title='Large')
+        _, _, small_queries = self.export('export-board', board_id=small.id)
+        response, content, queries = self.export('export-board', board_id=board.id)
+        self.assertEqual(small_queries, queries)
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn(f'board-{board.id}.jsonl', response['Content-Disposition'])
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        counts = {}
+        for record in records:
+            counts[record['type']] = counts.get(record['type'], 0) + 1
+        self.assertEqual(counts, {'board': 1, 'label': 1, 'list': 2, 'card': 20, 'comment': 20, 'activity': 20})
+        card = next(record for record in records if record['type'] == 'card')
+        label = next(record for record in records if record['type'] == 'label')
+        self.assertEqual(card['label_ids'], [label['id']])
+        self.assertEqual(card['assignee'], 'tester')
+
+    def test_board_csv_export_gzip(self):
+        board = self.create_board(lists=2, cards_per_list=3, title='Roadmap')
+        response, content, _ = self.export('export-board', board_id=board.id, output='csv', compress='gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz', response['Content-Disposition'])
+        rows = list(csv.reader(StringIO(gzip.decompress(content).decode())))
+        self.assertEqual(rows[0][:3], ['board', 'list', 'title'])
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[1][:3], ['Roadmap', 'List 0', 'Card 0'])
+        self.assertEqual(rows[1][5], 'Roadmap label')
+
+    def test_account_export_covers_active_boards_only(self):
+        self.create_board(lists=1, cards_per_list=2, title='One')
+        self.create_board(lists=1, cards_per_list=3, title='Two')
+        Board.objects.create(title='Archived', owner=self.user, is_active=False)
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        Board.objects.create(title='Theirs', owner=other)
+
+        _, content, _ = self.export('export-account')
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(sorted(r['title'] for r in records if r['type'] == 'board'), ['One', 'Two'])
+        self.assertEqual(sum(r['type'] == 'card' for r in records), 5)
+
+    def test_export_errors(self):
+        board = self.create_board(lists=1, cards_per_list=1)
+        url = reverse('import-export-export-board')
+        self.assertEqual(self.client.get(url, {'board_id': board.id, 'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'board_id': 'abc'}).status_code, 404)
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        theirs = Board.objects.create(title='Theirs', owner=other)
+        self.assertEqual(self.client.get(url, {'board_id': theirs.id}).status_code, 404)
+
+
+class BoardImportTests(KanbanTestCase):
+    """Imports insert in batches, resolve labels and users in memory and report bad rows"""
+
+    TRELLO = {
+        'name': 'Trello board',
+        'lists': [
+            {'id': 'l2', 'name': 'Done', 'pos': 2},
+            {'id': 'l1', 'name': 'Todo', 'pos': 1},
+            {'id': 'l3', 'name': 'Old', 'pos': 3, 'closed': True},
+        ],
+        'labels': [{'id': 'b', 'name': 'Bug', 'color': 'red'}, {'id': 'g', 'name': '', 'color': 'green'}],
+        'members': [{'id': 'm1', 'username': 'tester'}],
+        'cards': [
+            {'id': 'c1', 'name': 'Fix login', 'desc': 'Crash', 'idList': 'l1', 'pos': 1,
+             'idLabels': ['b', 'g'], 'idMembers': ['m1'], 'due': '2030-01-01T12:00:00.000Z'},
+            {'id': 'c2', 'name': 'Ship it', 'idList': 'l2', 'pos': 1, 'dueComplete': True},
+            {'id': 'c3', 'name': 'Archived', 'idList': 'l1', 'pos': 2, 'closed': True},
+            {'id': 'c4', 'name': 'Old list', 'idList': 'l3', 'pos': 1},
+            {'id': 'c5', 'name': '', 'idList': 'l1', 'pos': 3},
+        ],
+        'checklists': [{'idCard': 'c1', 'checkItems': [
+            {'name': 'Repro', 'state': 'complete', 'pos': 1}, {'name': 'Patch', 'state': 'incomplete', 'pos': 2},
+        ]}],
+    }
+
+    def csv_file(self, rows, name='roadmap.csv'):
+        lines = ['title,list,priority,labels,assignee,due_date'] + rows
+        return SimpleUploadedFile(name, '\n'.join(lines).encode(), content_type='text/csv')
+
+    def test_trello_import(self):
+        Label.objects.create(name='bug', user=self.user)
+        upload = SimpleUploadedFile('board.json', json.dumps(self.TRELLO).encode())
+        response = self.client.post(reverse('import-export-import-trello'), {'file': upload})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['rows'], response.data['imported']), (3, 2))
+        self.assertEqual(response.data['errors'], ['Card 3: title is empty'])
+
+        board = Board.objects.get(id=response.data['board_id'])
+        self.assertTrue(board.is_active)
+        self.assertEqual(board.title, 'Trello board')
+        self.assertEqual(list(board.lists.order_by('rank').values_list('title', flat=True)), ['Todo', 'Done'])
+        card = Card.objects.get(board=board, title='Fix login')
+        self.assertEqual(card.list.title, 'Todo')
+        self.assertEqual(card.assignee, self.user)
+        # The existing label is reused (case-insensitively), the unnamed one is named after its color
+        self.assertEqual(sorted(card.labels.values_list('name', flat=True)), ['bug', 'green'])
+        self.assertEqual(Label.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(list(card.checklist_items.values_list('title', 'is_completed')), [('Repro', True), ('Patch', False)])
+        self.assertTrue(Card.objects.get(board=board, title='Ship it').completed)
+        self.assertTrue(CardSearchTerm.objects.filter(card=card, term='crash').exists())
+
+    def test_new_labels_are_matched_by_name(self):
+        bulk_create = Label.objects.bulk_create
+
+        def create_then_interleave(labels, *args, **kwargs):
+            created = bulk_create(labels, *args, **kwargs)
+            # A concurrent import of the same user inserts after us
+            Label.objects.create(name='Other import', user=self.user)
+            return created
+
+        rows = ['Task,Todo,low,Bug;Docs,,']
+        with mock.patch.object(
+            type(connection.features), 'can_return_rows_from_bulk_insert',
+            new_callable=mock.PropertyMock, return_value=False,
+        ), mock.patch.object(Label.objects, 'bulk_create', side_effect=create_then_interleave):
+            response = self.client.post(reverse('import-export-import-csv'), {'file': self.csv_file(rows)})
+        self.assertEqual(response.status_code, 201)
+        card = Card.objects.get(board_id=response.data['board_id'])
+        self.assertEqual(sorted(card.labels.values_list('name', flat=True)), ['Bug', 'Docs'])
+
+    @override_settings(IMPORT_BATCH_SIZE=20)
+    def test_csv_import_query_count_independent_of_size(self):
+        def run(count):
+            rows = [f'Task {i},List {i % 2},high,"Label {i % 3};Shared",tester,2030-01-0{1 + i % 9}' for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse('import-export-import-csv'), {'file': self.csv_file(rows)})
+            self.assertEqual(response.status_code, 201)
+            return response.data, len(queries)
+
+        run(3)  # creates the labels
+        _, small_queries = run(5)
+        large, large_queries = run(20)
+        self.assertEqual(small_queries, large_queries)
+        board = Board.objects.get(id=large['board_id'])
+        self.assertEqual(board.title, 'roadmap')
+        self.assertEqual(Card.objects.filter(board=board, priority='high', assignee=self.user).count(), 20)
+        self.assertEqual(Card.labels.through.objects.filter(card__board=board).count(), 40)
+        self.assertEqual(Label.objects.filter(user=self.user).count(), 4)
+
+    def test_csv_row_errors_and_bad_files(self):
+        rows = ['Good,Todo,low,,,', ',Todo,low,,,', 'Bad,Todo,critical,,,', 'Late,Todo,low,,,someday']
+        response = self.client.post(reverse('import-export-import-csv'), {'file': self.csv_file(rows)})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['errors'], [
+            'Row 3: title is empty', 'Row 4: unknown priority "critical"', 'Row 5: invalid due_date "someday"'
+        ])
+
+        url = reverse('import-export-import-csv')
+        self.assertEqual(self.client.post(url, {}).status_code, 400)
+        upload = SimpleUploadedFile('x.csv', b'name,list\nA,B')
+        self.assertEqual(self.client.post(url, {'file': upload}).status_code, 400)
+        upload = SimpleUploadedFile('x.json', b'{"cards": 1}')
+        self.assertEqual(self.client.post(reverse('import-export-import-trello'), {'file': upload}).status_code, 400)
+        self.assertEqual(Board.objects.filter(owner=self.user).count(), 1)
+
+    @override_settings(IMPORT_SYNC_LIMIT_BYTES=10, MEDIA_ROOT=tempfile.mkdtemp())
+    def test_large_file_is_imported_by_a_job(self):
+        rows = [f'Task {i},Todo,,,,' for i in range(6)] + [',Todo,,,,']
+        response = self.client.post(reverse('import-export-import-csv'), {'file': self.csv_file(rows)})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Board.objects.filter(owner=self.user).count(), 0)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job = self.client.get(response['Location']).data
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual((job['processed'], job['total']), (7, 7))
+        self.assertEqual(job['result']['imported'], 6)
+        self.assertEqual(job['result']['errors'], ['Row 8: title is empty'])
+        self.assertIn('rows_per_second', job)
+        self.assertEqual(Card.objects.filter(board_id=job['result']['board_id']).count(), 6)
+        self.assertFalse(default_storage.exists(BackgroundJob.objects.get(id=job['id']).params['path']))
+
+
+class GoalProgressTests(KanbanTestCase):
+    """Goal progress is read from counters kept in step with the goal's cards"""
+
+    def counts(self, goal):
+        goal.refresh_from_db()
+        return goal.cards_total, goal.cards_completed
+
+    def test_counters_follow_link_completion_and_deletion(self):
+        board = self.create_board(lists=1, cards_per_list=3)
+        first, second, third = Card.objects.filter(board=board).order_by('id')
+        goal = Goal.objects.create(title='Launch', owner=self.user)
+        link_url = reverse('goal-link-card', args=[goal.id])
+        for card in (first, second, third):
+            self.client.post(link_url, {'card_id': card.id}, format='json')
+        self.assertEqual(self.counts(goal), (3, 0))
+
+        self.client.patch(reverse('card-detail', args=[first.id]), {'completed': True}, format='json')
+        self.assertEqual(self.counts(goal), (3, 1))
+        response = self.client.get(reverse('goal-detail', args=[goal.id]))
+        self.assertEqual((response.data['cards_count'], response.data['completed_cards_count']), (3, 1))
+        self.assertEqual(response.data['progress_percentage'], 33.3)
+
+        self.client.post(reverse('goal-unlink-card', args=[goal.id]), {'card_id': first.id}, format='json')
+        self.assertEqual(self.counts(goal), (2, 0))
+        self.client.delete(reverse('card-detail', args=[second.id]))
+        self.assertEqual(self.counts(goal), (1, 0))
+        self.client.delete(reverse('board-detail', args=[board.id]))
+        self.assertEqual(self.counts(goal), (0, 0))
+
+    def test_stale_instances_do_not_count_a_change_twice(self):
+        board = self.create_board(lists=1, cards_per_list=1)
+        goal = Goal.objects.create(title='Launch', owner=self.user)
+        # Two requests load the same card before either saves
+        first, second = Card.objects.get(board=board), Card.objects.get(board=board)
+        for card in (first, second):
+            card.goal = goal
+            card.save()
+        self.assertEqual(self.counts(goal), (1, 0))
+
+        first, second = Card.objects.get(board=board), Card.objects.get(board=board)
+        for card in (first, second):
+            card.completed = True
+            with transaction.atomic():
+                card.save()
+        self.assertEqual(self.counts(goal), (1, 1))
+        self.assertEqual(goal.progress_percentage, 100.0)
+
+        second.completed = False
+        second.save(update_fields=['title'])
+        self.assertEqual(self.counts(goal), (1, 1))
+
+    def test_goal_list_query_count_independent_of_goals(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse('goal-list')).status_code, 200)
+            return len(queries)
+
+        board = self.create_board(lists=1, cards_per_list=4)
+        for index, card in enumerate(Card.objects.filter(board=board)):
+            card.goal = Goal.objects.create(title=f'Goal {index}', owner=self.user)
+            card.save()
+        few = list_queries()
+        for index in range(10):
+            Goal.objects.create(title=f'More {index}', owner=self.user)
+        self.assertEqual(list_queries(), few)
+
+    def test_recount_command_repairs_counters(self):
+        board = self.create_board(lists=1, cards_per_list=2)
+        goal = Goal.objects.create(title='Launch', owner=self.user)
+        Card.objects.filter(board=board).update(goal=goal, completed=True)
+        self.assertEqual(self.counts(goal), (0, 0))
+        call_command('recount_goal_progress', stdout=StringIO())
+        self.assertEqual(self.counts(goal), (2, 2))
+
+
+class EisenhowerMatrixTests(KanbanTestCase):
+    """Quadrants are classified in SQL and capped, in a fixed number of queries"""
+
+    def setUp(self):
+        super().setUp()
+        self.board = self.create_board(lists=1, cards_per_list=0)
+        self.list = self.board.lists.get()
+        self.goal = Goal.objects.create(title='Launch', owner=self.user)
+
+    def add_cards(self, count, **fields):
+        for index in range(count):
+            Card.objects.create(title=f'Card {index}', list=self.list, **fields)
+
+    def test_classification_and_counts(self):
+        soon = timezone.now() + timedelta(days=1)
+        later = timezone.now() + timedelta(days=10)
+        self.add_cards(2, priority='high', due_date=soon)
+        self.add_cards(1, goal=self.goal, due_date=later)
+        self.add_cards(3, priority='low', due_date=timezone.now() - timedelta(days=1))
+        self.add_cards(1, priority='medium')
+        self.add_cards(1, priority='urgent', due_date=soon, completed=True)
+
+        response = self.client.get(reverse('eisenhower-matrix'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['counts'], {
+            'urgent_important': 2, 'not_urgent_important': 1,
+            'urgent_not_important': 3, 'not_urgent_not_important': 1,
+        })
+        card = response.data['matrix']['urgent_important'][0]
+        self.assertEqual(set(card), set(EisenhowerMatrixView.CARD_FIELDS))
+        self.assertTrue(response.data['matrix']['urgent_not_important'][0]['is_overdue'])
+
+    def test_quadrants_are_capped_and_paged(self):
+        self.add_cards(5, priority='low')
+        response = self.client.get(reverse('eisenhower-matrix'), {'limit': 2})
+        quadrant = response.data['matrix']['not_urgent_not_important']
+        self.assertEqual((len(quadrant), response.data['counts']['not_urgent_not_important']), (2, 5))
+        self.assertIsNone(response.data['next']['urgent_important'])
+
+        seen = [card['id'] for card in quadrant]
+        next_url = response.data['next']['not_urgent_not_important']
+        while next_url:
+            page = self.client.get(next_url).data
+            self.assertEqual(list(page['matrix']), ['not_urgent_not_important'])
+            seen += [card['id'] for card in page['matrix']['not_urgent_not_important']]
+            next_url = page['next']['not_urgent_not_important']
+        self.assertEqual(sorted(seen), sorted(Card.objects.filter(owner=self.user).values_list('id', flat=True)))
+        self.assertEqual(self.client.get(reverse('eisenhower-matrix'), {'quadrant': 'later'}).status_code, 400)
+
+    def test_query_count_independent_of_cards(self):
+        def matrix_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('eisenhower-matrix'))
+            return len(queries)
+
+        self.add_cards(2, priority='high', goal=self.goal)
+        few = matrix_queries()
+        self.add_cards(30, priority='low', assignee=self.user)
+        self.add_cards(30, priority='urgent', due_date=timezone.now())
+        self.assertEqual(matrix_queries(), few)
+
+
+class UserStatisticsTests(KanbanTestCase):
+    """Daily statistics are incremented atomically from card and Pomodoro events"""
+
+    def stats(self):
+        return UserStatistics.objects.get(user=self.user, date=timezone.now().date())
+
+    def test_card_and_pomodoro_events_update_counters(self):
+        board = self.create_board(lists=2, cards_per_list=0)
+        first, second = board.lists.order_by('rank')
+        response = self.client.post(reverse('card-list'), {'title': 'Write docs', 'list': first.id}, format='json')
+        card_id = response.data['id']
+        self.client.post(reverse('card-move', args=[card_id]), {'list_id': second.id}, format='json')
+        self.client.patch(reverse('card-detail', args=[card_id]), {'completed': True}, format='json')
+
+        session = PomodoroSession.objects.create(user=self.user, duration_minutes=30)
+        url = reverse('pomodoro-complete-session', args=[session.id])
+        self.client.post(url)
+        self.client.post(url)  # completing twice counts once
+        PomodoroSession.objects.create(user=self.user, session_type='short_break', duration_minutes=5, is_completed=True)
+
+        stats = self.stats()
+        self.assertEqual(
+            (stats.cards_created, stats.cards_moved, stats.cards_completed, stats.pomodoro_sessions),
+            (1, 1, 1, 2)
+        )
+        self.assertAlmostEqual(stats.hours_worked, 0.5)
+
+    def test_racing_completions_count_once(self):
+        session = PomodoroSession.objects.create(user=self.user, duration_minutes=25)
+        stale = PomodoroSession.objects.get(pk=session.pk)
+        url = reverse('pomodoro-complete-session', args=[session.id])
+        self.client.post(url)
+        # A second request that loaded the session before the first one committed
+        with mock.patch('kanban.views.PomodoroViewSet.get_object', return_value=stale):
+            self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertEqual(self.stats().pomodoro_sessions, 1)
+
+    def test_increments_are_applied_with_f_expressions(self):
+        # A stale in-memory copy must not overwrite increments made in between
+        record_statistics(self.user.id, cards_created=1)
+        stale = self.stats()
+        record_statistics(self.user.id, cards_created=2, hours_worked=1.5)
+        stale.refresh_from_db()
+        self.assertEqual((stale.cards_created, stale.hours_worked), (3, 1.5))
+
+    def test_batch_flushes_once(self):
+        other = User.objects.create_user(username='other', password='secret-pass-123')
+        with CaptureQueriesContext(connection) as queries:
+            with statistics_batch():
+                for _ in range(20):
+                    record_statistics(self.user.id, cards_moved=1)
+                    record_statistics(other.id, cards_moved=2)
+                self.assertFalse(UserStatistics.objects.exists())
+        # one INSERT ... ON CONFLICT DO NOTHING and one UPDATE per user, plus savepoint statements
+        self.assertLessEqual(len(queries), 6)
+        self.assertEqual(self.stats().cards_moved, 20)
+        self.assertEqual(UserStatistics.objects.get(user=other).cards_moved, 40)
+        with self.assertRaises(ValueError):
+            record_statistics(self.user.id, cards_deleted=1)
+
+
+class PomodoroStatsTests(KanbanTestCase):
+    """Pomodoro statistics come from grouped aggregates, not per-session loops"""
+
+    def session(self, started_at, session_type='work', minutes=25, completed=True):
+        return PomodoroSession.objects.create(
+            user=self.user, session_type=session_type, duration_minutes=minutes,
+            started_at=started_at, is_completed=completed,
+        )
+
+    def test_today_and_week_totals_in_one_query(self):
+        now = timezone.now()
+        self.session(now)
+        self.session(now, 'short_break', 5)
+        self.session(now - timedelta(days=3), minutes=50)
+        self.session(now - timedelta(days=3), 'long_break', 15)
+        self.session(now - timedelta(days=30))
+        self.session(now, completed=False)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('pomodoro-get-stats'))
+        self.assertEqual(len(queries), 1)
+        today, week = response.data['today'], response.data['this_week']
+        self.assertEqual((today['total_sessions'], today['work_sessions'], today['total_minutes']), (2, 1, 30))
+        self.assertEqual((week['total_sessions'], week['work_sessions'], week['total_minutes']), (4, 2, 95))
+        self.assertEqual(week['by_type']['long_break'], {'sessions': 1, 'minutes': 15})
+        self.assertNotIn('range', response.data)
+
+    def test_date_range_daily_buckets(self):
+        day = timezone.now().replace(year=2026, month=3, day=10, hour=12)
+        self.session(day)
+        self.session(day, minutes=30)
+        self.session(day + timedelta(days=2), 'short_break', 5)
+        self.session(day + timedelta(days=5))
+
+        response = self.client.get(reverse('pomodoro-get-stats'), {'start': '2026-03-09', 'end': '2026-03-12'})
+        stats = response.data['range']
+        self.assertEqual((stats['total_sessions'], stats['total_minutes']), (3, 60))
+        self.assertEqual([bucket['total_sessions'] for bucket in stats['daily']], [0, 2, 0, 1])
+        self.assertEqual(str(stats['daily'][1]['date']), '2026-03-10')
+        self.assertEqual(stats['daily'][1]['by_type']['work'], {'sessions': 2, 'minutes': 55})
+
+        url = reverse('pomodoro-get-stats')
+        self.assertEqual(self.client.get(url, {'start': '2026-03-12', 'end': '2026-03-09'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': 'March'}).status_code, 400)
+
+
+class StampedeSafeCacheTests(KanbanTestCase):
+    """One caller recomputes an entry at a time; the others get a cached, stale or awaited value"""
+
+    def setUp(self):
+        super().setUp()
+        reset_cache_stats()
+        self.calls = 0
+
+    def compute(self, value='fresh'):
+        def build():
+            self.calls += 1
+            return value
+        return build
+
+    def test_hits_misses_and_negative_caching(self):
+        self.assertIsNone(get_or_compute('demo:none', self.compute(None), 60))
+        self.assertIsNone(get_or_compute('demo:none', self.compute(None), 60))
+        self.assertEqual(get_or_compute('demo:value', self.compute(), 60), 'fresh')
+        self.assertEqual(self.calls, 2)
+        stats = cache_stats()['demo']
+        self.assertEqual((stats['hits'], stats['misses'], stats['recomputes']), (1, 2, 2))
+
+    def test_expired_entry_is_served_stale_while_another_worker_recomputes(self):
+        cache.set('demo:key', ('old', time.time() - 1, 0.0), 60)
+        cache.add('demo:key:lock', 'other-worker', 10)
+        self.assertEqual(get_or_compute('demo:key', self.compute(), 60), 'old')
+        self.assertEqual((self.calls, cache_stats()['demo']['stale_hits']), (0, 1))
+
+        cache.delete('demo:key:lock')
+        self.assertEqual(get_or_compute('demo:key', self.compute(), 60), 'fresh')
+        self.assertEqual(get_or_compute('demo:key', self.compute(), 60), 'fresh')
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(cache.get('demo:key:lock'))
+
+    @override_settings(CACHE_LOCK_WAIT_SECONDS=2)
+    def test_miss_waits_for_the_lock_holder(self):
+        cache.add('demo:key:lock', 'other-worker', 10)
+        timer = threading.Timer(0.1, lambda: cache.set('demo:key', ('computed elsewhere', time.time() + 60, 0.0), 60))
+        timer.start()
+        self.assertEqual(get_or_compute('demo:key', self.compute(), 60), 'computed elsewhere')
+        timer.join()
+        self.assertEqual((self.calls, cache_stats()['demo']['waits']), (0, 1))
+
+    def test_probabilistic_early_expiration(self):
+        # Expires in 1s and took 10s to compute: -log(0.5) * 10 > 1, so it is refreshed early
+        cache.set('demo:key', ('old', time.time() + 1, 10.0), 60)
+        with mock.patch('kanban.caching.random.random', return_value=0.5):
+            self.assertEqual(get_or_compute('demo:key', self.compute(), 60, beta=0), 'old')
+            self.assertEqual(get_or_compute('demo:key', self.compute(), 60), 'fresh')
+        self.assertEqual(cache_stats()['demo']['early_refreshes'], 1)
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=60)
+    def test_decorator(self):
+        @cached(lambda user_id: f'demo:{user_id}', timeout='DASHBOARD_CACHE_TIMEOUT')
+        def load(user_id):
+            self.calls += 1
+            return {'user': user_id}
+
+        self.assertEqual(load(1), {'user': 1})
+        self.assertEqual(load(1), {'user': 1})
+        self.assertEqual(load(2), {'user': 2})
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(load.uncached(1), {'user': 1})
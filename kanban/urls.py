@@ -6,7 +6,7 @@ from .views import (
     UserViewSet, AuthViewSet, LabelViewSet, GoalViewSet, 
     NotificationViewSet, AIAssistantViewSet, PomodoroViewSet, 
     TaskChecklistViewSet, EisenhowerMatrixView, TeamViewSet,
-    ImportExportViewSet, shared_board_view, dashboard_stats
+    ImportExportViewSet, JobViewSet, shared_board_view, dashboard_stats, notification_stream
 )
 
 router = DefaultRouter()
@@ -25,8 +25,11 @@ router.register(r'eisenhower', EisenhowerMatrixView, basename='eisenhower')
 router.register(r'teams', TeamViewSet, basename='team')
 router.register(r'import-export', ImportExportViewSet, basename='import-export')
 router.register(r'users', UserViewSet, basename='user')
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
+    # Before the router so "stream" is not taken for a notification id
+    path('api/notifications/stream/', notification_stream, name='notification_stream'),
     path('api/', include(router.urls)),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
@@ -2,11 +2,11 @@ import secrets
 import string
 import hashlib
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, List
 from django.core.cache import cache
 from django.db.models import QuerySet
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
 import re
 
@@ -51,25 +51,6 @@ def calculate_cache_key(*args) -> str:
     return ':'.join(key_parts)
 
 
-def get_or_set_cache(key: str, func, timeout: int = 300):
-    """
-    Get value from cache or set it using the provided function.
-    
-    Args:
-        key: Cache key
-        func: Function to call if cache miss
-        timeout: Cache timeout in seconds (default: 5 minutes)
-    
-    Returns:
-        Cached or computed value
-    """
-    value = cache.get(key)
-    if value is None:
-        value = func()
-        cache.set(key, value, timeout)
-    return value
-
-
 def invalidate_cache_pattern(pattern: str):
     """
     Invalidate all cache keys matching a pattern.
@@ -209,30 +190,31 @@ def estimate_task_duration(title: str, description: str = '') -> float:
     return min(hours, 8.0)  # Cap at 8 hours
 
 
-def send_notification_email(user_email: str, subject: str, message: str, html_message: Optional[str] = None):
+def send_notification_email(user_email: str, subject: str, message: str, html_message: Optional[str] = None,
+                            user=None, category: str = 'notification'):
     """
-    Send notification email to user.
+    Queue a notification email to a user.
+    
+    The email is written to the outbox and delivered by the ``send_outbox``
+    worker, so the request never waits on SMTP.
     
     Args:
         user_email: Recipient email
         subject: Email subject
         message: Plain text message
         html_message: Optional HTML message
+        user: Recipient account, so its email preferences are honored
+        category: ``notification`` or ``daily_summary``
     """
+    from .mailer import enqueue_email
+    
     try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        enqueue_email(user_email, subject, message, html_message, user=user, category=category)
     except Exception as e:
         # Log error but don't raise to avoid breaking the main flow
         import logging
         logger = logging.getLogger(__name__)
-        logger.error(f"Failed to send email to {user_email}: {str(e)}")
+        logger.error(f"Failed to queue email to {user_email}: {str(e)}")
 
 
 def format_duration(minutes: int) -> str:
@@ -280,19 +262,23 @@ def get_week_date_range(date: Optional[datetime] = None) -> tuple[datetime, date
     return week_start, week_end
 
 
-def batch_process(items: List[Any], batch_size: int = 100):
+def batch_process(items: Iterable[Any], batch_size: int = 100):
     """
     Process items in batches.
     
     Args:
-        items: List of items to process
+        items: Items to process (any iterable; generators are consumed lazily)
         batch_size: Size of each batch
     
     Yields:
-        Batches of items
+        Batches of items, as lists
     """
-    for i in range(0, len(items), batch_size):
-        yield items[i:i + batch_size]
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
 
 
 def calculate_completion_percentage(completed: int, total: int) -> float:
@@ -456,7 +442,6 @@ __all__ = [
     'generate_unique_token',
     'generate_share_token',
     'calculate_cache_key',
-    'get_or_set_cache',
     'invalidate_cache_pattern',
     'paginate_queryset',
     'sanitize_html',
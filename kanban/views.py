@@ -1,29 +1,51 @@
+import os
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import ValidationError
+from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.conf import settings
+from channels.db import database_sync_to_async
 from django.db import transaction
-from django.db.models import Q, Count
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db.models import Q, Count, Sum, Case, When, Value, CharField, F, Window
+from django.db.models.functions import RowNumber, TruncDate
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.utils.dateparse import parse_datetime
+from datetime import date, datetime, timedelta
 from .models import (
     Board, List, Card, Comment, UserProfile, Label, CardActivity, Goal, 
-    Notification, UserStatistics, Team, TeamMembership, TaskChecklist, 
-    PomodoroSession, AIAssistantSuggestion, ShareableLink
+    Notification, Team, TeamMembership, TaskChecklist, 
+    PomodoroSession, AIAssistantSuggestion, ShareableLink, BoardTombstone, BackgroundJob
 )
 from .serializers import (
-    BoardSerializer, BoardListSerializer, ListSerializer, 
+    BoardSerializer, BoardListSerializer, ListSerializer, ListSummarySerializer,
     CardSerializer, CommentSerializer, UserSerializer, UserProfileSerializer,
     UserRegistrationSerializer, UserLoginSerializer, LabelSerializer, CardActivitySerializer,
     GoalSerializer, GoalListSerializer, NotificationSerializer, TaskChecklistSerializer,
-    PomodoroSessionSerializer, TeamSerializer, TeamMembershipSerializer
+    PomodoroSessionSerializer, TeamSerializer, TeamMembershipSerializer, BackgroundJobSerializer,
+    eager_loading_options, requested_expansions, requested_fields
 )
 from .ai_assistant import get_ai_assistant
+from .duplication import copy_board, needs_background_copy
+from .export import FORMATS as EXPORT_FORMATS, ExportScope, export_response
+from .importer import ImportFormatError, import_board, read_source, save_import_file
+from .jobs import enqueue_job
+from .snapshots import get_board_snapshot, bump_board_version, bump_member_boards_version, bump_user_boards_version
+from .ranking import rank_at, append_rank
+from .search import search_cards
+from .realtime import broadcast_board_event, stream_group_events, user_group_name
+from .notifications import adjust_unread_count, get_unread_count
+from .middleware import get_user_from_ticket, issue_stream_ticket
+from .pagination import CreatedAtCursorPagination, RankCursorPagination, SinglePagePagination
+from .dashboard import get_dashboard_key
+from .caching import cached
+from .statistics import record_session_completed
 
 
 class AuthViewSet(viewsets.ViewSet):
@@ -80,6 +102,14 @@ class AuthViewSet(viewsets.ViewSet):
         except Exception:
             return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'])
+    def stream_ticket(self, request):
+        """Single-use ticket for opening a WebSocket or notification stream"""
+        return Response({
+            'ticket': issue_stream_ticket(request.user),
+            'expires_in': settings.STREAM_TICKET_SECONDS,
+        })
+    
     @action(detail=False, methods=['get'])
     def profile(self, request):
         """Get current user profile"""
@@ -113,6 +143,8 @@ class AuthViewSet(viewsets.ViewSet):
                 return Response(profile_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         user.save()
+        # Names and avatars are embedded in the snapshots of boards the user appears on
+        bump_member_boards_version(user)
         return Response(UserSerializer(user).data)
 
 
@@ -126,6 +158,15 @@ class LabelViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+    
+    def perform_update(self, serializer):
+        serializer.save()
+        # Labels are rendered on cards across all of the user's boards
+        bump_user_boards_version(self.request.user)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_user_boards_version(self.request.user)
 
 
 class BoardViewSet(viewsets.ModelViewSet):
@@ -138,50 +179,75 @@ class BoardViewSet(viewsets.ModelViewSet):
         return BoardSerializer
     
     def get_queryset(self):
-        return Board.objects.filter(owner=self.request.user, is_active=True)
+        queryset = Board.objects.filter(owner=self.request.user, is_active=True)
+        if self.action == 'list':
+            queryset = BoardListSerializer.setup_eager_loading(
+                queryset, **eager_loading_options(self.get_serializer_context())
+            )
+        return queryset
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the board tree from its versioned snapshot"""
+        board = self.get_object()
+        options = eager_loading_options(self.get_serializer_context())
+        
+        def build():
+            # Server clock cursor for the changes feed, taken before the tree is read
+            synced_at = timezone.now()
+            # Load the requested board tree in a fixed number of queries
+            queryset = BoardSerializer.setup_eager_loading(Board.objects.filter(pk=board.pk), **options)
+            data = self.get_serializer(queryset.get()).data
+            if 'version' in data:
+                # Sent with the version it pairs with (kept out of narrower ?fields= shapes)
+                data['synced_at'] = synced_at
+            return data
+        
+        # Each requested shape is cached as its own snapshot
+        variant = ';'.join(
+            f"{name}={','.join(sorted(options[name]))}" for name in ('fields', 'expand') if options[name]
+        )
+        return Response(get_board_snapshot(board, build, variant))
     
     def perform_create(self, serializer):
         board = serializer.save(owner=self.request.user)
         # Create default lists for new board
         board.create_default_lists()
     
-    @action(detail=True, methods=['post'])
-    def duplicate(self, request, pk=None):
-        """Duplicate a board with all its lists and cards"""
-        original_board = self.get_object()
-        
-        with transaction.atomic():
-            # Create new board
-            new_board = Board.objects.create(
-                title=f"{original_board.title} (Copy)",
-                description=original_board.description,
-                owner=request.user
+    def perform_update(self, serializer):
+        board = serializer.save()
+        bump_board_version(board.id)
+    
+    def _copy(self, source, title):
+        """Copy a board in the request, or queue a job when it is large"""
+        if needs_background_copy(source):
+            job = enqueue_job(self.request.user, 'board_copy', board_id=source.id, title=title)
+            return Response(
+                {'job': BackgroundJobSerializer(job).data},
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': reverse('job-detail', args=[job.id])}
             )
-            
-            # Duplicate lists and cards
-            for original_list in original_board.lists.all():
-                new_list = List.objects.create(
-                    title=original_list.title,
-                    board=new_board,
-                    position=original_list.position
-                )
-                
-                for original_card in original_list.cards.all():
-                    new_card = Card.objects.create(
-                        title=original_card.title,
-                        description=original_card.description,
-                        list=new_list,
-                        priority=original_card.priority,
-                        position=original_card.position,
-                        due_date=original_card.due_date,
-                        estimated_hours=original_card.estimated_hours
-                    )
-                    # Copy labels
-                    new_card.labels.set(original_card.labels.all())
         
+        new_board = copy_board(source, title, owner=self.request.user)
+        new_board = BoardSerializer.setup_eager_loading(
+            Board.objects.filter(pk=new_board.pk), **eager_loading_options(self.get_serializer_context())
+        ).get()
         serializer = self.get_serializer(new_board)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=True, methods=['post'])
+    def duplicate(self, request, pk=None):
+        """Duplicate a board with all its lists and cards"""
+        original_board = self.get_object()
+        return self._copy(original_board, f"{original_board.title} (Copy)")
+    
+    @action(detail=True, methods=['post'])
+    def use_template(self, request, pk=None):
+        """Create a new board from a template board"""
+        template = self.get_object()
+        if not template.is_template:
+            return Response({'error': 'Board is not a template'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._copy(template, request.data.get('title') or template.title)
+    
     @action(detail=True, methods=['get'])
     def timeline(self, request, pk=None):
         """Get timeline view of board activities"""
@@ -192,21 +258,26 @@ class BoardViewSet(viewsets.ModelViewSet):
         start_date = timezone.now() - timedelta(days=days)
         
         # Get cards with due dates in the specified period
-        cards_with_due_dates = Card.objects.filter(
-            list__board=board,
+        cards_with_due_dates = CardSerializer.setup_eager_loading(Card.objects.filter(
+            board=board,
             due_date__gte=start_date,
             due_date__lte=timezone.now() + timedelta(days=days)
-        ).order_by('due_date')
+        ).order_by('due_date'), **eager_loading_options(self.get_serializer_context()))
         
-        # Get recent activities
-        activities = CardActivity.objects.filter(
-            card__list__board=board,
-            created_at__gte=start_date
-        ).order_by('-created_at')
+        # First page of recent activities; later pages come from the activities feed
+        paginator = CreatedAtCursorPagination()
+        activities = paginator.paginate_queryset(
+            self._activities(board, start_date), request, view=self
+        )
+        paginator.base_url = request.build_absolute_uri(
+            f"{reverse('board-activities', args=[board.id])}?days={days}"
+        )
         
+        context = self.get_serializer_context()
         return Response({
-            'cards_timeline': CardSerializer(cards_with_due_dates, many=True).data,
+            'cards_timeline': CardSerializer(cards_with_due_dates, many=True, context=context).data,
             'recent_activities': CardActivitySerializer(activities, many=True).data,
+            'recent_activities_next': paginator.get_next_link(),
             'period': {
                 'start': start_date,
                 'end': timezone.now() + timedelta(days=days),
@@ -214,6 +285,86 @@ class BoardViewSet(viewsets.ModelViewSet):
             }
         })
     
+    def _activities(self, board, since=None):
+        activities = CardActivity.objects.filter(board=board).select_related('user__profile')
+        if since is not None:
+            activities = activities.filter(created_at__gte=since)
+        return activities
+    
+    @action(detail=True, methods=['get'])
+    def activities(self, request, pk=None):
+        """Activity feed of a board, newest first, paged by cursor"""
+        board = self.get_object()
+        days = request.query_params.get('days')
+        since = timezone.now() - timedelta(days=int(days)) if days else None
+        
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(self._activities(board, since), request, view=self)
+        return paginator.get_paginated_response(CardActivitySerializer(page, many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def changes(self, request, pk=None):
+        """
+        Get lists and cards changed since a previous sync, plus deletions.
+        
+        Pass the ``synced_at`` of the previous response as ``since`` and its
+        ``version`` as ``version``. Label changes are not reported here; they
+        are served by the labels endpoint.
+        """
+        board = self.get_object()
+        since = parse_datetime(request.query_params.get('since', ''))
+        if since is None:
+            return Response(
+                {'error': 'A valid ISO 8601 "since" timestamp is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        
+        # Capture the cursor before querying so concurrent writes are picked up next time
+        synced_at = timezone.now()
+        response = {
+            'board': board.id,
+            'version': board.version,
+            'synced_at': synced_at,
+            'full_refresh': False,
+            'lists': [],
+            'cards': [],
+            'deleted': {'lists': [], 'cards': []},
+        }
+        
+        # Nothing was written to the board since the client's version
+        if request.query_params.get('version') == str(board.version):
+            response['synced_at'] = since
+            return Response(response)
+        
+        # Deletions older than the retention window are gone; reload the whole board
+        retention = timedelta(days=settings.BOARD_TOMBSTONE_RETENTION_DAYS)
+        if since < synced_at - retention:
+            response['full_refresh'] = True
+            return Response(response)
+        
+        lists = board.lists.filter(updated_at__gte=since)
+        cards = CardSerializer.setup_eager_loading(
+            Card.objects.filter(board=board, updated_at__gte=since),
+            **eager_loading_options(self.get_serializer_context())
+        )
+        tombstones = board.tombstones.filter(deleted_at__gte=since).values_list('object_type', 'object_id')
+        
+        response['lists'] = ListSummarySerializer(lists, many=True).data
+        response['cards'] = CardSerializer(cards, many=True, context=self.get_serializer_context()).data
+        for object_type, object_id in tombstones:
+            response['deleted'][f'{object_type}s'].append(object_id)
+        if board.updated_at >= since:
+            response['board_fields'] = {
+                'title': board.title,
+                'description': board.description,
+                'background_color': board.background_color,
+                'updated_at': board.updated_at,
+            }
+        
+        return Response(response)
+    
     @action(detail=True, methods=['get'])
     def due_soon(self, request, pk=None):
         """Get cards that are due soon"""
@@ -223,21 +374,25 @@ class BoardViewSet(viewsets.ModelViewSet):
         due_soon_date = timezone.now() + timedelta(days=3)
         
         due_soon_cards = Card.objects.filter(
-            list__board=board,
+            board=board,
             due_date__lte=due_soon_date,
             due_date__gte=timezone.now(),
             completed=False
         ).order_by('due_date')
         
         overdue_cards = Card.objects.filter(
-            list__board=board,
+            board=board,
             due_date__lt=timezone.now(),
             completed=False
         ).order_by('due_date')
         
+        context = self.get_serializer_context()
+        options = eager_loading_options(context)
+        due_soon_cards = CardSerializer.setup_eager_loading(due_soon_cards, **options)
+        overdue_cards = CardSerializer.setup_eager_loading(overdue_cards, **options)
         return Response({
-            'due_soon': CardSerializer(due_soon_cards, many=True).data,
-            'overdue': CardSerializer(overdue_cards, many=True).data
+            'due_soon': CardSerializer(due_soon_cards, many=True, context=context).data,
+            'overdue': CardSerializer(overdue_cards, many=True, context=context).data
         })
 
 
@@ -247,17 +402,32 @@ class ListViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return List.objects.filter(board__owner=self.request.user)
+        return ListSerializer.setup_eager_loading(
+            List.objects.filter(owner=self.request.user), **eager_loading_options(self.get_serializer_context())
+        )
     
     def perform_create(self, serializer):
         board_id = self.request.data.get('board')
         try:
             board = Board.objects.get(id=board_id, owner=self.request.user)
-            # Set position to last
-            last_position = board.lists.count()
-            serializer.save(board=board, position=last_position)
+            # Place the new list last
+            list_obj = serializer.save(board=board, rank=append_rank(board.lists.all()))
         except Board.DoesNotExist:
             raise ValidationError("Board not found or you don't have permission")
+        bump_board_version(board.id)
+        broadcast_board_event(board.id, 'list.created', ListSummarySerializer(list_obj).data)
+    
+    def perform_update(self, serializer):
+        list_obj = serializer.save()
+        bump_board_version(list_obj.board_id)
+        broadcast_board_event(list_obj.board_id, 'list.updated', ListSummarySerializer(list_obj).data)
+    
+    def perform_destroy(self, instance):
+        list_id = instance.id
+        BoardTombstone.objects.create(board_id=instance.board_id, object_type='list', object_id=list_id)
+        instance.delete()
+        bump_board_version(instance.board_id)
+        broadcast_board_event(instance.board_id, 'list.deleted', {'id': list_id})
     
     @action(detail=True, methods=['post'])
     def reorder(self, request, pk=None):
@@ -267,19 +437,16 @@ class ListViewSet(viewsets.ModelViewSet):
         
         if new_position is not None:
             with transaction.atomic():
-                # Get all lists in the same board
-                lists = List.objects.filter(board=list_obj.board).order_by('position')
-                list_data = list(lists.values_list('id', flat=True))
-                
-                # Remove current list and insert at new position
-                list_data.remove(list_obj.id)
-                list_data.insert(new_position, list_obj.id)
+                # Rank between the new neighbours; only this list is written
+                list_obj.rank = rank_at(
+                    List.objects.filter(board_id=list_obj.board_id), new_position, exclude_id=list_obj.id
+                )
+                list_obj.save(update_fields=['rank', 'updated_at'])
                 
-                # Update positions
-                for position, list_id in enumerate(list_data):
-                    List.objects.filter(id=list_id).update(position=position)
+                bump_board_version(list_obj.board_id)
+                broadcast_board_event(list_obj.board_id, 'list.moved', ListSummarySerializer(list_obj).data)
             
-            return Response({'message': 'List reordered successfully'})
+            return Response({'message': 'List reordered successfully', 'rank': list_obj.rank})
         
         return Response({'error': 'Position is required'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -288,18 +455,24 @@ class CardViewSet(viewsets.ModelViewSet):
     """ViewSet for Card model"""
     serializer_class = CardSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    
+    @property
+    def paginator(self):
+        # Same response shape throughout; only the order the pages follow changes
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('search') or (params.getlist('board') and not params.get('list')):
+                # Relevance is capped at SEARCH_RESULT_LIMIT; boards are read whole in list order
+                self._paginator = SinglePagePagination()
+            elif params.get('list'):
+                self._paginator = RankCursorPagination()
+        return super().paginator
     
     def get_queryset(self):
-        queryset = Card.objects.filter(list__board__owner=self.request.user)
-        
-        # Search functionality
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(labels__name__icontains=search)
-            ).distinct()
+        queryset = CardSerializer.setup_eager_loading(
+            Card.objects.filter(owner=self.request.user), **eager_loading_options(self.get_serializer_context())
+        )
         
         # Filter by list
         list_id = self.request.query_params.get('list')
@@ -346,7 +519,7 @@ class CardViewSet(viewsets.ModelViewSet):
         # Filter by board
         boards = self.request.query_params.getlist('board')
         if boards:
-            queryset = queryset.filter(list__board__id__in=boards)
+            queryset = queryset.filter(board_id__in=boards)
         
         # Filter by date range
         created_from = self.request.query_params.get('created_from')
@@ -357,17 +530,31 @@ class CardViewSet(viewsets.ModelViewSet):
         if created_to:
             queryset = queryset.filter(created_at__lte=created_to)
         
-        return queryset.order_by('list__position', 'position')
+        # Full-text search, ranked by relevance
+        search = self.request.query_params.get('search')
+        if search:
+            return search_cards(queryset, self.request.user, search).order_by('-search_rank', '-updated_at')
+        
+        if boards and not list_id:
+            return queryset.order_by('list__rank', 'rank', 'id')
+        
+        # Ordered by the cursor paginator: rank within a list, newest first otherwise
+        return queryset
     
     def perform_create(self, serializer):
         list_id = self.request.data.get('list')
         try:
-            list_obj = List.objects.get(id=list_id, board__owner=self.request.user)
-            # Set position to last
-            last_position = list_obj.cards.count()
-            serializer.save(list=list_obj, position=last_position)
+            list_obj = List.objects.get(id=list_id, owner=self.request.user)
+            # Place the new card last
+            card = serializer.save(list=list_obj, rank=append_rank(list_obj.cards.all()))
         except List.DoesNotExist:
             raise ValidationError("List not found or you don't have permission")
+        # Broadcast the default shape regardless of this request's ?fields=/?expand=
+        broadcast_board_event(card.board_id, 'card.created', CardSerializer(card).data)
+    
+    def perform_update(self, serializer):
+        card = serializer.save()
+        broadcast_board_event(card.board_id, 'card.updated', CardSerializer(card).data)
     
     @action(detail=True, methods=['post'])
     def move(self, request, pk=None):
@@ -377,15 +564,18 @@ class CardViewSet(viewsets.ModelViewSet):
         new_position = request.data.get('position', 0)
         
         try:
-            new_list = List.objects.get(id=new_list_id, board__owner=request.user)
+            new_list = List.objects.get(id=new_list_id, owner=request.user)
             
             with transaction.atomic():
                 old_list = card.list
-                old_position = card.position
                 
+                # Rank between the new neighbours; only this card is written
+                card.rank = rank_at(new_list.cards.all(), new_position, exclude_id=card.id)
                 card.list = new_list
-                card.position = new_position
-                card.save()
+                card.save(update_fields=['list', 'rank', 'updated_at'])
+                if old_list.board_id != new_list.board_id:
+                    # The card's history follows it to the new board's feed
+                    CardActivity.objects.filter(card=card).update(board_id=card.board_id, owner_id=card.owner_id)
                 
                 # Create activity
                 CardActivity.objects.create(
@@ -395,38 +585,43 @@ class CardViewSet(viewsets.ModelViewSet):
                     description=f"Moved card from '{old_list.title}' to '{new_list.title}'"
                 )
                 
-                # Reorder cards in both lists
-                self._reorder_cards(old_list)
-                if old_list != new_list:
-                    self._reorder_cards(new_list)
+                bump_board_version(new_list.board_id)
+                if old_list.board_id != new_list.board_id:
+                    BoardTombstone.objects.create(board_id=old_list.board_id, object_type='card', object_id=card.id)
+                    bump_board_version(old_list.board_id)
+                
+                serializer = self.get_serializer(card)
+                broadcast_board_event(new_list.board_id, 'card.moved', CardSerializer(card).data)
+                if old_list.board_id != new_list.board_id:
+                    broadcast_board_event(old_list.board_id, 'card.deleted', {'id': card.id})
             
-            serializer = self.get_serializer(card)
             return Response(serializer.data)
             
         except List.DoesNotExist:
             return Response({'error': 'List not found'}, status=status.HTTP_400_BAD_REQUEST)
     
-    def _reorder_cards(self, list_obj):
-        """Helper method to reorder cards in a list"""
-        cards = list_obj.cards.order_by('position')
-        for index, card in enumerate(cards):
-            if card.position != index:
-                card.position = index
-                card.save(update_fields=['position'])
+    def perform_destroy(self, instance):
+        board_id = instance.board_id
+        card_id = instance.id
+        BoardTombstone.objects.create(board_id=board_id, object_type='card', object_id=card_id)
+        instance.delete()
+        bump_board_version(board_id)
+        broadcast_board_event(board_id, 'card.deleted', {'id': card_id})
 
 
 class CommentViewSet(viewsets.ModelViewSet):
     """ViewSet for Comment model"""
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
-        return Comment.objects.filter(card__list__board__owner=self.request.user)
+        return Comment.objects.filter(owner=self.request.user)
     
     def perform_create(self, serializer):
         card_id = self.request.data.get('card')
         try:
-            card = Card.objects.get(id=card_id, list__board__owner=self.request.user)
+            card = Card.objects.get(id=card_id, owner=self.request.user)
             comment = serializer.save(author=self.request.user, card=card)
             
             # Create activity
@@ -438,6 +633,21 @@ class CommentViewSet(viewsets.ModelViewSet):
             )
         except Card.DoesNotExist:
             raise ValidationError("Card not found or you don't have permission")
+        self._touch_card(card)
+    
+    def perform_update(self, serializer):
+        comment = serializer.save()
+        self._touch_card(comment.card)
+    
+    def perform_destroy(self, instance):
+        card = instance.card
+        instance.delete()
+        self._touch_card(card)
+    
+    def _touch_card(self, card):
+        """Report the card as changed to board snapshots and the changes feed"""
+        Card.objects.filter(id=card.id).update(updated_at=timezone.now())
+        bump_board_version(card.board_id)
 
 
 class GoalViewSet(viewsets.ModelViewSet):
@@ -450,7 +660,9 @@ class GoalViewSet(viewsets.ModelViewSet):
         return GoalSerializer
     
     def get_queryset(self):
-        return Goal.objects.filter(owner=self.request.user)
+        return self.get_serializer_class().setup_eager_loading(
+            Goal.objects.filter(owner=self.request.user), **eager_loading_options(self.get_serializer_context())
+        )
     
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
@@ -486,10 +698,12 @@ class GoalViewSet(viewsets.ModelViewSet):
         try:
             card = Card.objects.get(
                 id=card_id, 
-                list__board__owner=request.user
+                owner=request.user
             )
-            card.goal = goal
-            card.save()
+            # The goal counters are adjusted by the card's post_save handler
+            with transaction.atomic():
+                card.goal = goal
+                card.save()
             
             # Create activity
             CardActivity.objects.create(
@@ -498,6 +712,7 @@ class GoalViewSet(viewsets.ModelViewSet):
                 activity_type='goal_linked',
                 description=f"Linked to goal '{goal.title}'"
             )
+            bump_board_version(card.board_id)
             
             return Response({'message': 'Card linked to goal successfully'})
         except Card.DoesNotExist:
@@ -516,10 +731,12 @@ class GoalViewSet(viewsets.ModelViewSet):
             card = Card.objects.get(
                 id=card_id, 
                 goal=goal,
-                list__board__owner=request.user
+                owner=request.user
             )
-            card.goal = None
-            card.save()
+            with transaction.atomic():
+                card.goal = None
+                card.save()
+            bump_board_version(card.board_id)
             
             return Response({'message': 'Card unlinked from goal successfully'})
         except Card.DoesNotExist:
@@ -533,9 +750,13 @@ class NotificationViewSet(viewsets.ModelViewSet):
     """ViewSet for Notification model"""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        expand = requested_expansions({'request': self.request}, NotificationSerializer.EXPANDABLE)
+        return Notification.objects.filter(user=self.request.user).prefetch_related(
+            *NotificationSerializer.prefetch_lookups(expand)
+        )
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
@@ -550,14 +771,49 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read"""
-        self.get_queryset().update(is_read=True)
+        with transaction.atomic():
+            # Lower by the rows actually flipped: a notification created meanwhile stays counted
+            marked = self.get_queryset().filter(is_read=False).update(is_read=True)
+            adjust_unread_count(request.user.id, -marked)
         return Response({'message': 'All notifications marked as read'})
     
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread notifications"""
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({'unread_count': count        })
+        # Maintained counter; new values are also pushed over the notification stream
+        return Response({'unread_count': get_unread_count(request.user.id)})
+
+
+async def notification_stream(request):
+    """
+    Server-sent events fallback for the notification WebSocket.
+    
+    EventSource cannot send headers, so a single-use ticket from
+    ``POST /api/auth/stream_ticket/`` is passed as ``?ticket=``. Streams
+    ``unread_count`` and ``notification.created`` events.
+    """
+    ticket = request.GET.get('ticket')
+    user = await get_user_from_ticket(ticket) if ticket else None
+    if user is None or not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    unread_count = await database_sync_to_async(get_unread_count)(user.id)
+    events = stream_group_events(
+        user_group_name(user.id), initial=('unread_count', {'unread_count': unread_count})
+    )
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress of the user's background jobs"""
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return BackgroundJob.objects.filter(user=self.request.user)
 
 
 class TeamViewSet(viewsets.ModelViewSet):
@@ -647,6 +903,72 @@ class ImportExportViewSet(viewsets.ViewSet):
                 {'error': 'Board not found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+    
+    def _export_options(self, request):
+        # ?format= is taken by DRF's renderer negotiation
+        output = request.query_params.get('output', 'jsonl')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Choose one of: {', '.join(EXPORT_FORMATS)}"})
+        return output, request.query_params.get('compress') == 'gzip'
+    
+    @action(detail=False, methods=['get'])
+    def export_board(self, request):
+        """Stream a board as JSON Lines or CSV (?board_id=, ?output=jsonl|csv, ?compress=gzip)"""
+        output, compress = self._export_options(request)
+        board_id = request.query_params.get('board_id', '')
+        board = Board.objects.filter(id=board_id, owner=request.user).first() if board_id.isdigit() else None
+        if board is None:
+            return Response(
+                {'error': 'Board not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return export_response(
+            request, ExportScope(request.user, board), output, compress, f'board-{board.id}'
+        )
+    
+    @action(detail=False, methods=['get'])
+    def export_account(self, request):
+        """Stream every active board of the account (?output=jsonl|csv, ?compress=gzip)"""
+        output, compress = self._export_options(request)
+        return export_response(
+            request, ExportScope(request.user), output, compress, f'{request.user.username}-export'
+        )
+    
+    def _import(self, request, source):
+        """Import an uploaded file in the request, or queue a job when it is large"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        title = request.data.get('title', '')
+        if not title and source == 'csv':
+            title = os.path.splitext(upload.name)[0]
+        
+        if upload.size > settings.IMPORT_SYNC_LIMIT_BYTES:
+            job = enqueue_job(
+                request.user, 'board_import', source=source, path=save_import_file(upload), title=title
+            )
+            return Response(
+                {'job': BackgroundJobSerializer(job).data},
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': reverse('job-detail', args=[job.id])}
+            )
+        
+        try:
+            result = import_board(request.user, read_source(source, upload, title))
+        except ImportFormatError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def import_trello(self, request):
+        """Create a board from a Trello JSON export (multipart ``file``, optional ``title``)"""
+        return self._import(request, 'trello')
+    
+    @action(detail=False, methods=['post'])
+    def import_csv(self, request):
+        """Create a board from a CSV file in the export's card format (multipart ``file``, optional ``title``)"""
+        return self._import(request, 'csv')
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
@@ -666,7 +988,7 @@ class AIAssistantViewSet(viewsets.ViewSet):
         card_id = request.data.get('card_id')
         
         try:
-            card = Card.objects.get(id=card_id, list__board__owner=request.user)
+            card = Card.objects.get(id=card_id, owner=request.user)
             ai_assistant = get_ai_assistant()
             
             suggestions = await ai_assistant.suggest_task_breakdown(card)
@@ -783,14 +1105,14 @@ class TaskChecklistViewSet(viewsets.ModelViewSet):
         if card_id:
             return TaskChecklist.objects.filter(
                 card_id=card_id,
-                card__list__board__owner=self.request.user
+                card__owner=self.request.user
             )
         return TaskChecklist.objects.none()
     
     def perform_create(self, serializer):
         card_id = self.request.data.get('card')
         try:
-            card = Card.objects.get(id=card_id, list__board__owner=self.request.user)
+            card = Card.objects.get(id=card_id, owner=self.request.user)
             
             # Auto-assign position
             max_position = TaskChecklist.objects.filter(card=card).aggregate(
@@ -820,7 +1142,7 @@ class TaskChecklistViewSet(viewsets.ModelViewSet):
             try:
                 item = TaskChecklist.objects.get(
                     id=item_data['id'],
-                    card__list__board__owner=request.user
+                    card__owner=request.user
                 )
                 item.position = item_data['position']
                 item.save()
@@ -834,72 +1156,117 @@ class EisenhowerMatrixView(viewsets.ViewSet):
     """Eisenhower Matrix for task prioritization"""
     permission_classes = [IsAuthenticated]
     
+    QUADRANTS = ['urgent_important', 'not_urgent_important', 'urgent_not_important', 'not_urgent_not_important']
+    # Fields of each matrix card unless ?fields= asks for others
+    CARD_FIELDS = [
+        'id', 'title', 'list', 'priority', 'due_date', 'estimated_hours',
+        'labels', 'assignee', 'is_overdue', 'is_due_soon'
+    ]
+    QUADRANT_INFO = {
+        'urgent_important': {
+            'title': 'Do First',
+            'description': 'Urgent and important tasks that need immediate attention',
+            'color': 'red',
+            'action': 'Do immediately'
+        },
+        'not_urgent_important': {
+            'title': 'Schedule',
+            'description': 'Important but not urgent - plan and schedule these',
+            'color': 'blue',
+            'action': 'Schedule for later'
+        },
+        'urgent_not_important': {
+            'title': 'Delegate',
+            'description': 'Urgent but not important - consider delegating',
+            'color': 'yellow',
+            'action': 'Delegate if possible'
+        },
+        'not_urgent_not_important': {
+            'title': 'Eliminate',
+            'description': 'Neither urgent nor important - eliminate or minimize',
+            'color': 'gray',
+            'action': 'Eliminate or do last'
+        }
+    }
+    
+    @staticmethod
+    def quadrant_expression():
+        """CASE classifying an open card into its quadrant"""
+        # Urgent: due within 2 days (or overdue); important: high/urgent priority or linked to a goal
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        urgent = Q(due_date__lt=today + timedelta(days=3))
+        important = Q(priority__in=['high', 'urgent']) | Q(goal__isnull=False)
+        return Case(
+            When(urgent & important, then=Value('urgent_important')),
+            When(important, then=Value('not_urgent_important')),
+            When(urgent, then=Value('urgent_not_important')),
+            default=Value('not_urgent_not_important'),
+            output_field=CharField(),
+        )
+    
+    def _page_params(self, request):
+        try:
+            limit = int(request.query_params.get('limit', settings.EISENHOWER_QUADRANT_SIZE))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            raise ValidationError({'limit': 'limit and offset must be integers'})
+        return max(1, min(limit, settings.CURSOR_PAGE_SIZE_MAX)), max(0, offset)
+    
     @action(detail=False, methods=['get'])
     def matrix(self, request):
-        """Get tasks organized in Eisenhower Matrix"""
-        cards = Card.objects.filter(
-            list__board__owner=request.user,
-            completed=False
+        """
+        Get tasks organized in Eisenhower Matrix.
+        
+        Every quadrant holds its first ``?limit=`` cards (soonest due first) with its
+        total in ``counts`` and a ``next`` URL; ``?quadrant=<name>&offset=<n>`` pages
+        through a single quadrant.
+        """
+        limit, offset = self._page_params(request)
+        only = request.query_params.get('quadrant')
+        if only is not None and only not in self.QUADRANTS:
+            return Response({'error': 'Invalid quadrant'}, status=status.HTTP_400_BAD_REQUEST)
+        quadrants = [only] if only else self.QUADRANTS
+        
+        context = {'request': request}
+        context['fields'] = requested_fields(context) or self.CARD_FIELDS
+        open_cards = Card.objects.filter(owner=request.user, completed=False).annotate(
+            quadrant=self.quadrant_expression()
         )
+        if only:
+            open_cards = open_cards.filter(quadrant=only)
         
-        # Categorize tasks based on urgency and importance
-        matrix = {
-            'urgent_important': [],     # Do First (Quadrant 1)
-            'not_urgent_important': [], # Schedule (Quadrant 2)
-            'urgent_not_important': [], # Delegate (Quadrant 3)
-            'not_urgent_not_important': [] # Eliminate (Quadrant 4)
-        }
+        counts = dict.fromkeys(quadrants, 0)
+        counts.update(open_cards.order_by().values_list('quadrant').annotate(total=Count('id')))
         
-        for card in cards:
-            # Determine urgency (based on due date)
-            is_urgent = False
-            if card.due_date:
-                days_until_due = (card.due_date.date() - timezone.now().date()).days
-                is_urgent = days_until_due <= 2  # Due within 2 days
-            
-            # Determine importance (based on priority and goal linkage)
-            is_important = card.priority in ['high', 'urgent'] or card.goal is not None
-            
-            # Categorize
-            if is_urgent and is_important:
-                quadrant = 'urgent_important'
-            elif not is_urgent and is_important:
-                quadrant = 'not_urgent_important'
-            elif is_urgent and not is_important:
-                quadrant = 'urgent_not_important'
-            else:
-                quadrant = 'not_urgent_not_important'
-            
-            matrix[quadrant].append(CardSerializer(card).data)
+        # The first cards of every quadrant in one query, labels and assignees in one pass
+        cards = list(CardSerializer.setup_eager_loading(open_cards.annotate(
+            position=Window(
+                expression=RowNumber(),
+                partition_by=[F('quadrant')],
+                order_by=[F('due_date').asc(nulls_last=True), F('id').asc()],
+            )
+        ).filter(
+            position__gt=offset, position__lte=offset + limit
+        ).order_by('quadrant', 'position'), **eager_loading_options(context)))
+        
+        matrix = {quadrant: [] for quadrant in quadrants}
+        for card, data in zip(cards, CardSerializer(cards, many=True, context=context).data):
+            matrix[card.quadrant].append(data)
+        
+        base_url = request.build_absolute_uri(reverse('eisenhower-matrix'))
+        next_urls = {
+            quadrant: (
+                f"{base_url}?quadrant={quadrant}&offset={offset + limit}&limit={limit}"
+                if counts[quadrant] > offset + limit else None
+            )
+            for quadrant in quadrants
+        }
         
         return Response({
             'matrix': matrix,
-            'quadrant_info': {
-                'urgent_important': {
-                    'title': 'Do First',
-                    'description': 'Urgent and important tasks that need immediate attention',
-                    'color': 'red',
-                    'action': 'Do immediately'
-                },
-                'not_urgent_important': {
-                    'title': 'Schedule',
-                    'description': 'Important but not urgent - plan and schedule these',
-                    'color': 'blue',
-                    'action': 'Schedule for later'
-                },
-                'urgent_not_important': {
-                    'title': 'Delegate',
-                    'description': 'Urgent but not important - consider delegating',
-                    'color': 'yellow',
-                    'action': 'Delegate if possible'
-                },
-                'not_urgent_not_important': {
-                    'title': 'Eliminate',
-                    'description': 'Neither urgent nor important - eliminate or minimize',
-                    'color': 'gray',
-                    'action': 'Eliminate or do last'
-                }
-            }
+            'counts': counts,
+            'next': next_urls,
+            'quadrant_info': {quadrant: self.QUADRANT_INFO[quadrant] for quadrant in quadrants}
         })
     
     @action(detail=False, methods=['post'])
@@ -909,7 +1276,7 @@ class EisenhowerMatrixView(viewsets.ViewSet):
         quadrant = request.data.get('quadrant')
         
         try:
-            card = Card.objects.get(id=card_id, list__board__owner=request.user)
+            card = Card.objects.get(id=card_id, owner=request.user)
             
             # Update card based on target quadrant
             if quadrant == 'urgent_important':
@@ -928,7 +1295,10 @@ class EisenhowerMatrixView(viewsets.ViewSet):
                 card.priority = 'low'
                 card.due_date = None
             
-            card.save()
+            with transaction.atomic():
+                card.save()
+            bump_board_version(card.board_id)
+            broadcast_board_event(card.board_id, 'card.updated', CardSerializer(card).data)
             
             return Response({'message': 'Card moved successfully'})
             
@@ -958,7 +1328,10 @@ class PomodoroViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return PomodoroSession.objects.filter(user=self.request.user)
+        return PomodoroSessionSerializer.setup_eager_loading(
+            PomodoroSession.objects.filter(user=self.request.user),
+            **eager_loading_options(self.get_serializer_context())
+        )
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -967,108 +1340,149 @@ class PomodoroViewSet(viewsets.ModelViewSet):
     def complete_session(self, request, pk=None):
         """Mark Pomodoro session as completed"""
         session = self.get_object()
-        session.is_completed = True
-        session.completed_at = timezone.now()
-        session.save()
-        
-        # Update user statistics
-        today = timezone.now().date()
-        stats, created = UserStatistics.objects.get_or_create(
-            user=request.user,
-            date=today,
-            defaults={'pomodoro_sessions': 0}
-        )
-        stats.pomodoro_sessions += 1
-        if session.session_type == 'work':
-            stats.hours_worked += session.duration_minutes / 60
-        stats.save()
+        completed_at = timezone.now()
+        with transaction.atomic():
+            # Only the request that flips the flag counts the session, however many race
+            flipped = PomodoroSession.objects.filter(pk=session.pk, is_completed=False).update(
+                is_completed=True, completed_at=completed_at
+            )
+            if flipped == 1:
+                session.is_completed, session.completed_at = True, completed_at
+                record_session_completed(session)
         
         return Response({'message': 'Session completed'})
     
+    @staticmethod
+    def _period_stats(rows):
+        """Totals of a period from ``(session_type, sessions, minutes)`` rows"""
+        by_type = {
+            session_type: {'sessions': 0, 'minutes': 0} for session_type, _ in PomodoroSession.SESSION_TYPES
+        }
+        for session_type, sessions, minutes in rows:
+            by_type[session_type] = {'sessions': sessions, 'minutes': minutes or 0}
+        return {
+            'total_sessions': sum(totals['sessions'] for totals in by_type.values()),
+            'work_sessions': by_type['work']['sessions'],
+            'total_minutes': sum(totals['minutes'] for totals in by_type.values()),
+            'by_type': by_type,
+        }
+    
     @action(detail=False, methods=['get'])
     def get_stats(self, request):
-        """Get Pomodoro statistics"""
-        today = timezone.now().date()
-        week_ago = today - timedelta(days=7)
-        
-        # Today's sessions
-        today_sessions = self.get_queryset().filter(
-            started_at__date=today,
-            is_completed=True
-        )
+        """
+        Get Pomodoro statistics for today and the past week, per session type.
         
-        # This week's sessions
-        week_sessions = self.get_queryset().filter(
-            started_at__date__gte=week_ago,
-            is_completed=True
-        )
+        With ``?start=YYYY-MM-DD&end=YYYY-MM-DD`` the response also holds a
+        ``range`` with its totals and one bucket per day.
+        """
+        today_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today_start - timedelta(days=7)
+        completed = PomodoroSession.objects.filter(user=request.user, is_completed=True)
         
-        return Response({
-            'today': {
-                'total_sessions': today_sessions.count(),
-                'work_sessions': today_sessions.filter(session_type='work').count(),
-                'total_minutes': sum(s.duration_minutes for s in today_sessions)
-            },
-            'this_week': {
-                'total_sessions': week_sessions.count(),
-                'work_sessions': week_sessions.filter(session_type='work').count(),
-                'total_minutes': sum(s.duration_minutes for s in week_sessions)
+        # Both periods in one grouped pass over the past week's sessions
+        today = Q(started_at__gte=today_start)
+        rows = list(completed.filter(started_at__gte=week_start).order_by().values('session_type').annotate(
+            today_sessions=Count('id', filter=today),
+            today_minutes=Sum('duration_minutes', filter=today),
+            week_sessions=Count('id'),
+            week_minutes=Sum('duration_minutes'),
+        ))
+        response = {
+            'today': self._period_stats(
+                (row['session_type'], row['today_sessions'], row['today_minutes']) for row in rows
+            ),
+            'this_week': self._period_stats(
+                (row['session_type'], row['week_sessions'], row['week_minutes']) for row in rows
+            ),
+        }
+        
+        if 'start' in request.query_params or 'end' in request.query_params:
+            try:
+                start = date.fromisoformat(request.query_params.get('start', ''))
+                end = date.fromisoformat(request.query_params.get('end', ''))
+            except ValueError:
+                raise ValidationError({'start': 'start and end must be YYYY-MM-DD dates'})
+            if not 0 <= (end - start).days < settings.POMODORO_STATS_MAX_DAYS:
+                raise ValidationError({
+                    'end': f'end must be on or after start, within {settings.POMODORO_STATS_MAX_DAYS} days'
+                })
+            
+            daily = completed.filter(
+                started_at__date__gte=start, started_at__date__lte=end
+            ).annotate(day=TruncDate('started_at')).order_by().values('day', 'session_type').annotate(
+                sessions=Count('id'), minutes=Sum('duration_minutes')
+            )
+            days, totals = {}, {}
+            for row in daily:
+                days.setdefault(row['day'], []).append((row['session_type'], row['sessions'], row['minutes']))
+                sessions, minutes = totals.get(row['session_type'], (0, 0))
+                totals[row['session_type']] = (sessions + row['sessions'], minutes + (row['minutes'] or 0))
+            
+            response['range'] = {
+                'start': start,
+                'end': end,
+                **self._period_stats(
+                    (session_type, sessions, minutes) for session_type, (sessions, minutes) in totals.items()
+                ),
+                'daily': [
+                    {'date': day, **self._period_stats(days.get(day, []))}
+                    for day in (start + timedelta(days=offset) for offset in range((end - start).days + 1))
+                ],
             }
-        })
+        
+        return Response(response)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard_stats(request):
-    """Get dashboard statistics for the user"""
-    user = request.user
+@cached(lambda user: get_dashboard_key(user.id), timeout='DASHBOARD_CACHE_TIMEOUT')
+def dashboard_data(user):
+    """Dashboard statistics of a user, cached until one of their writes invalidates them"""
+    now = timezone.now()
     
-    # Basic stats
+    # All card figures in one pass over the owner's cards
+    card_stats = Card.objects.filter(owner=user).aggregate(
+        total_cards=Count('id'),
+        completed_cards=Count('id', filter=Q(completed=True)),
+        due_soon_cards=Count('id', filter=Q(
+            completed=False, due_date__gte=now, due_date__lte=now + timedelta(days=3)
+        )),
+        overdue_cards=Count('id', filter=Q(completed=False, due_date__lt=now)),
+    )
     total_boards = Board.objects.filter(owner=user, is_active=True).count()
-    total_cards = Card.objects.filter(list__board__owner=user).count()
-    completed_cards = Card.objects.filter(list__board__owner=user, completed=True).count()
-    
-    # Due soon cards
-    due_soon_cards = Card.objects.filter(
-        list__board__owner=user,
-        due_date__lte=timezone.now() + timedelta(days=3),
-        due_date__gte=timezone.now(),
-        completed=False
-    ).count()
-    
-    # Overdue cards
-    overdue_cards = Card.objects.filter(
-        list__board__owner=user,
-        due_date__lt=timezone.now(),
-        completed=False
-    ).count()
     
     # Pomodoro stats
-    today = timezone.now().date()
     today_pomodoros = PomodoroSession.objects.filter(
         user=user,
-        started_at__date=today,
+        started_at__date=now.date(),
         is_completed=True,
         session_type='work'
     ).count()
     
     # Recent activity
     recent_activities = CardActivity.objects.filter(
-        card__list__board__owner=user
-    ).order_by('-created_at')[:10]
+        owner=user
+    ).select_related('user__profile').order_by('-created_at')[:10]
     
-    return Response({
+    total_cards = card_stats['total_cards']
+    completed_cards = card_stats['completed_cards']
+    return {
         'stats': {
             'total_boards': total_boards,
             'total_cards': total_cards,
             'completed_cards': completed_cards,
             'completion_rate': round((completed_cards / total_cards * 100) if total_cards > 0 else 0, 1),
-            'due_soon_cards': due_soon_cards,
-            'overdue_cards': overdue_cards,
+            'due_soon_cards': card_stats['due_soon_cards'],
+            'overdue_cards': card_stats['overdue_cards'],
             'today_pomodoros': today_pomodoros
         },
         'recent_activities': CardActivitySerializer(recent_activities, many=True).data
-    })
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_stats(request):
+    """Get dashboard statistics for the user"""
+    return Response(dashboard_data(request.user))
 
 
 @api_view(['GET'])
@@ -1080,17 +1494,17 @@ def shared_board_view(request, token):
         board = Board.objects.get(share_token=token, is_shared=True)
         
         # Get board data with lists and cards
-        lists = List.objects.filter(board=board).order_by('position')
+        lists = List.objects.filter(board=board).order_by('rank')
         lists_data = []
         
         for list_obj in lists:
-            cards = Card.objects.filter(list=list_obj).order_by('position')
+            cards = CardSerializer.setup_eager_loading(Card.objects.filter(list=list_obj).order_by('rank'))
             cards_data = CardSerializer(cards, many=True).data
             
             lists_data.append({
                 'id': list_obj.id,
                 'title': list_obj.title,
-                'position': list_obj.position,
+                'rank': list_obj.rank,
                 'cards': cards_data
             })
         
@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kanban_project.settings')
 
-application = get_asgi_application()
+# Initialize Django before importing consumers that touch the ORM
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+
+from kanban.middleware import StreamTicketAuthMiddleware  # noqa: E402
+from kanban.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': StreamTicketAuthMiddleware(URLRouter(websocket_urlpatterns)),
+})
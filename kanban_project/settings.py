@@ -38,6 +38,7 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1,0.0.0.0').s
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver so WebSockets work in development
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -159,6 +160,13 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20
 }
 
+# Largest ?page_size= accepted by the cursor-paginated feeds
+CURSOR_PAGE_SIZE_MAX = config('CURSOR_PAGE_SIZE_MAX', default=100, cast=int)
+# Cards returned per Eisenhower matrix quadrant (?limit= up to CURSOR_PAGE_SIZE_MAX)
+EISENHOWER_QUADRANT_SIZE = config('EISENHOWER_QUADRANT_SIZE', default=25, cast=int)
+# Longest ?start=&end= range (in days) of the Pomodoro statistics
+POMODORO_STATS_MAX_DAYS = config('POMODORO_STATS_MAX_DAYS', default=366, cast=int)
+
 # JWT Configuration
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -229,9 +237,87 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@kanban.local')
 
+# Email outbox (send_outbox worker): emails per batch/connection, retry backoff;
+# a claimed email not recorded within EMAIL_SEND_LEASE_SECONDS is picked up again
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=100, cast=int)
+EMAIL_OUTBOX_POLL_SECONDS = config('EMAIL_OUTBOX_POLL_SECONDS', default=10, cast=int)
+EMAIL_MAX_ATTEMPTS = config('EMAIL_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_RETRY_BASE_SECONDS = config('EMAIL_RETRY_BASE_SECONDS', default=60, cast=int)
+EMAIL_RETRY_MAX_SECONDS = config('EMAIL_RETRY_MAX_SECONDS', default=3600, cast=int)
+EMAIL_SEND_LEASE_SECONDS = config('EMAIL_SEND_LEASE_SECONDS', default=600, cast=int)
+
+# Background jobs (run_jobs worker): poll interval and progress write interval in seconds
+JOB_POLL_SECONDS = config('JOB_POLL_SECONDS', default=5, cast=int)
+JOB_PROGRESS_INTERVAL = config('JOB_PROGRESS_INTERVAL', default=1, cast=float)
+
+# Board duplication: boards with more cards are copied by the job worker; cards per bulk insert
+BOARD_COPY_SYNC_LIMIT = config('BOARD_COPY_SYNC_LIMIT', default=500, cast=int)
+BOARD_COPY_BATCH_SIZE = config('BOARD_COPY_BATCH_SIZE', default=500, cast=int)
+
+# Streaming export: rows fetched per database round trip, bytes per response chunk
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+EXPORT_BLOCK_BYTES = config('EXPORT_BLOCK_BYTES', default=65536, cast=int)
+
+# Board import: larger uploads are imported by the job worker; cards per bulk insert; row errors kept
+IMPORT_SYNC_LIMIT_BYTES = config('IMPORT_SYNC_LIMIT_BYTES', default=1048576, cast=int)
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=500, cast=int)
+IMPORT_MAX_ERRORS = config('IMPORT_MAX_ERRORS', default=100, cast=int)
+
 # Redis Configuration (for Channels/WebSockets)
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 
+# Cache Configuration
+# Use django.core.cache.backends.redis.RedisCache with CACHE_LOCATION=REDIS_URL
+# to share cached board snapshots between workers
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='kanban-cache'),
+    }
+}
+BOARD_SNAPSHOT_TIMEOUT = config('BOARD_SNAPSHOT_TIMEOUT', default=3600, cast=int)
+
+# Read-through cache (kanban.caching): expired values are served for CACHE_STALE_SECONDS
+# while one worker recomputes; None results are kept CACHE_NEGATIVE_TIMEOUT seconds; the
+# recompute lock expires after CACHE_LOCK_SECONDS and other workers wait up to
+# CACHE_LOCK_WAIT_SECONDS for its result; CACHE_EARLY_EXPIRY_BETA > 1 refreshes earlier, 0 never
+CACHE_STALE_SECONDS = config('CACHE_STALE_SECONDS', default=30, cast=int)
+CACHE_NEGATIVE_TIMEOUT = config('CACHE_NEGATIVE_TIMEOUT', default=30, cast=int)
+CACHE_LOCK_SECONDS = config('CACHE_LOCK_SECONDS', default=10, cast=int)
+CACHE_LOCK_WAIT_SECONDS = config('CACHE_LOCK_WAIT_SECONDS', default=2, cast=float)
+CACHE_EARLY_EXPIRY_BETA = config('CACHE_EARLY_EXPIRY_BETA', default=1.0, cast=float)
+
+# Deleted lists/cards are reported by the board changes feed for this long;
+# clients that synced earlier than that must reload the full board
+BOARD_TOMBSTONE_RETENTION_DAYS = config('BOARD_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# List/card rank keys longer than this are respaced by the rebalance_ranks command
+RANK_REBALANCE_LENGTH = config('RANK_REBALANCE_LENGTH', default=12, cast=int)
+
+# Maximum number of ranked matches returned by card search
+SEARCH_RESULT_LIMIT = config('SEARCH_RESULT_LIMIT', default=200, cast=int)
+
+# Per-user dashboard statistics are cached for this many seconds (card writes invalidate)
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=60, cast=int)
+
+# Due-date reminders (run_reminders worker): "due soon" fires this many hours
+# before the deadline; deadlines this far ahead are kept in memory and card
+# changes are polled every REMINDER_POLL_SECONDS, re-reading the last
+# REMINDER_SCAN_OVERLAP_SECONDS so saves that committed late are not missed
+REMINDER_DUE_SOON_HOURS = config('REMINDER_DUE_SOON_HOURS', default=24, cast=int)
+REMINDER_HORIZON_HOURS = config('REMINDER_HORIZON_HOURS', default=48, cast=int)
+REMINDER_CATCHUP_HOURS = config('REMINDER_CATCHUP_HOURS', default=24, cast=int)
+REMINDER_POLL_SECONDS = config('REMINDER_POLL_SECONDS', default=30, cast=int)
+REMINDER_SCAN_OVERLAP_SECONDS = config('REMINDER_SCAN_OVERLAP_SECONDS', default=120, cast=int)
+
+# Identical (user, type, card) notifications within this many seconds are
+# coalesced; buffered notifications are written in batches of this size
+NOTIFICATION_DEDUPE_SECONDS = config('NOTIFICATION_DEDUPE_SECONDS', default=300, cast=int)
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=500, cast=int)
+
+# Daily statistics rows per flush of a buffered statistics_batch
+STATISTICS_BATCH_SIZE = config('STATISTICS_BATCH_SIZE', default=500, cast=int)
+
 # AI Assistant Configuration
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 
@@ -246,14 +332,20 @@ X_FRAME_OPTIONS = config('X_FRAME_OPTIONS', default='DENY')
 
 # Channels Configuration (WebSockets)
 ASGI_APPLICATION = 'kanban_project.asgi.application'
+# Board events are fanned out to every server process through Redis. For a
+# single process without Redis use channels.layers.InMemoryChannelLayer
+CHANNEL_LAYER_BACKEND = config('CHANNEL_LAYER_BACKEND', default='channels_redis.core.RedisChannelLayer')
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            'hosts': [REDIS_URL],
-        },
+        'BACKEND': CHANNEL_LAYER_BACKEND,
     },
 }
+if CHANNEL_LAYER_BACKEND == 'channels_redis.core.RedisChannelLayer':
+    CHANNEL_LAYERS['default']['CONFIG'] = {
+        'hosts': [REDIS_URL],
+    }
+# Lifetime of the single-use tickets that authenticate WebSocket and SSE connections
+STREAM_TICKET_SECONDS = config('STREAM_TICKET_SECONDS', default=30, cast=int)
 
 # Logging Configuration
 LOGGING = {